@@ -0,0 +1,105 @@
+"""
+Batch Planlama Kıyaslaması
+==========================
+Sentetik bir derlem (kısa başlıklar + uzun paragraflar, karışık sırada)
+üzerinde sabit sayılı batch'ler ile token bütçeli uzunluk gruplarını
+karşılaştırır.
+
+  • Dolgu verimliliği (model gerekmez): gerçek token / dolgu dahil token
+  • Parça/sn (sentence-transformers kuruluysa): eski model.encode(batch_size=32)
+    çağrısı ile encode_batched karşılaştırması
+
+Kullanım:
+    python scripts/bench_batching.py                 # 4000 parçalık derlem
+    python scripts/bench_batching.py --n 20000 --no-model
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from ppt_to_vectors import (  # noqa: E402
+    EMBED_TOKEN_BUDGET,
+    MODEL_NAME,
+    _token_lengths,
+    encode_batched,
+    plan_batches,
+)
+
+_KELIMELER = ("kişisel veri işleme şartları açık rıza veri sorumlusu aydınlatma yükümlülüğü "
+              "yurt dışına aktarım özel nitelikli kurul karar idari para cezası ilgili kişi "
+              "başvuru hakkı silme yok etme anonim hale getirme güvenlik tedbirleri").split()
+
+
+def synthetic_corpus(n: int, seed: int = 42):
+    """Slayt benzeri karışık uzunlukta metinler: %60 başlık, %40 paragraf."""
+    rnd = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        if rnd.random() < 0.6:
+            texts.append(" ".join(rnd.choices(_KELIMELER, k=rnd.randint(3, 6))))
+        else:
+            texts.append(" ".join(rnd.choices(_KELIMELER, k=rnd.randint(50, 80))))
+    return texts
+
+
+def padding_stats(lengths, batches):
+    """(gerçek token, dolgu dahil token) çiftini döndürür."""
+    gercek = sum(lengths)
+    dolgulu = sum(len(b) * max(lengths[i] for i in b) for b in batches)
+    return gercek, dolgulu
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch planlama kıyaslaması")
+    parser.add_argument("--n", type=int, default=4000, help="Sentetik parça sayısı")
+    parser.add_argument("--token-budget", type=int, default=EMBED_TOKEN_BUDGET)
+    parser.add_argument("--no-model", action="store_true", help="Yalnızca dolgu istatistiği")
+    args = parser.parse_args()
+
+    texts = synthetic_corpus(args.n)
+    lengths = _token_lengths(texts, max_len=128)
+
+    sabit = [list(range(i, min(i + 32, len(texts)))) for i in range(0, len(texts), 32)]
+    sirali = sorted(range(len(texts)), key=lambda i: -lengths[i])
+    sabit_sirali = [sirali[i:i + 32] for i in range(0, len(sirali), 32)]
+    butceli = plan_batches(lengths, args.token_budget)
+
+    print(f"\nSentetik derlem: {len(texts)} parça, {sum(lengths)} token (tahmini)\n")
+    print(f"{'Plan':<32}{'Batch':>8}{'Dolgulu token':>16}{'Verim':>9}")
+    for ad, plan in (("Sabit 32, parça sırası", sabit),
+                     ("Sabit 32, uzunluk sıralı", sabit_sirali),
+                     (f"Token bütçesi {args.token_budget}", butceli)):
+        gercek, dolgulu = padding_stats(lengths, plan)
+        print(f"{ad:<32}{len(plan):>8}{dolgulu:>16}{gercek / dolgulu:>9.1%}")
+
+    if args.no_model:
+        return
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        print("\nsentence-transformers kurulu değil; parça/sn ölçümü atlandı.")
+        return
+
+    model = SentenceTransformer(MODEL_NAME)
+    model.encode(texts[:64], batch_size=32)   # ısınma
+
+    t0 = time.perf_counter()
+    model.encode(texts, batch_size=32, normalize_embeddings=True, show_progress_bar=False)
+    once = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    encode_batched(model, texts, token_budget=args.token_budget)
+    sonra = time.perf_counter() - t0
+
+    print(f"\nÖnce  (encode, batch_size=32) : {len(texts) / once:8.1f} parça/sn")
+    print(f"Sonra (encode_batched)        : {len(texts) / sonra:8.1f} parça/sn"
+          f"  (×{once / sonra:.2f})\n")
+
+
+if __name__ == "__main__":
+    main()
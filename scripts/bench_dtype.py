@@ -0,0 +1,85 @@
+"""
+Vektör Saklama Tipi Kıyaslaması
+===============================
+float32 / float16 / int8 (boyut başına ölçekli) saklamayı aynı vektörler
+üzerinde karşılaştırır:
+
+  • Boyut        : vectors.npy bayt sayısı
+  • Recall@k     : float32 tam aramanın ilk k sonucuyla örtüşme
+  • Süre         : sorgu başına tam tarama süresi (ms); tek sorgu (rank) ve
+                   tüm sorgular tek çarpımda (rank_batch) ayrı ölçülür
+
+Vektörler output/vectors/vectors.npy'den okunur; dosya yoksa ya da --n
+verilirse sentetik (düşük ranklı + gürültü, normalize) vektörler üretilir.
+Sorgular rastgele seçilen satırlara küçük gürültü eklenerek oluşturulur.
+
+Kullanım:
+    python scripts/bench_dtype.py                  # mevcut vectors.npy
+    python scripts/bench_dtype.py --n 200000       # sentetik 200k × 384
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import numpy as np  # noqa: E402
+
+from ppt_to_vectors import CIKTILAR_DIR  # noqa: E402
+from vector_dtype import STORE_DTYPES, quantize, wrap  # noqa: E402
+
+
+def synthetic_vectors(n: int, d: int = 384, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal((n, 32)) @ rng.standard_normal((32, d)) + 0.3 * rng.standard_normal((n, d))
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float32)
+
+
+def top_k(scores, k):
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vektör saklama tipi kıyaslaması")
+    parser.add_argument("--n", type=int, default=0, help="Sentetik vektör sayısı (0 = vectors.npy)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    vec_path = CIKTILAR_DIR / "vectors.npy"
+    if args.n or not vec_path.exists():
+        x = synthetic_vectors(args.n or 50000)
+        kaynak = f"sentetik {x.shape[0]}×{x.shape[1]}"
+    else:
+        x = np.load(str(vec_path)).astype(np.float32)
+        kaynak = str(vec_path)
+
+    rng = np.random.default_rng(1)
+    q = x[rng.choice(len(x), size=min(args.queries, len(x)), replace=False)]
+    q = q + 0.05 * rng.standard_normal(q.shape).astype(np.float32)
+    q /= np.linalg.norm(q, axis=1, keepdims=True)
+    k = min(args.top_k, len(x))
+    dogru = [set(top_k(x @ v, k)) for v in q]
+
+    print(f"\nVektörler: {kaynak}, {len(q)} sorgu, recall@{k}\n")
+    print(f"{'Tip':<10}{'Boyut (MB)':>12}{'Recall':>10}{'ms/sorgu':>12}{'toplu ms/sorgu':>16}")
+    for tip in STORE_DTYPES:
+        ham, meta = quantize(x, tip)
+        emb = wrap(ham, meta)
+        (emb @ q[0])    # ısınma
+        t0 = time.perf_counter()
+        sonuc = [set(top_k(emb @ v, k)) for v in q]
+        sure = (time.perf_counter() - t0) / len(q) * 1000
+        t0 = time.perf_counter()
+        emb @ q.T
+        toplu = (time.perf_counter() - t0) / len(q) * 1000
+        recall = np.mean([len(a & b) / k for a, b in zip(sonuc, dogru)])
+        print(f"{tip:<10}{ham.nbytes / 1e6:>12.1f}{recall:>10.3f}{sure:>12.2f}{toplu:>16.3f}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
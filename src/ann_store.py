@@ -0,0 +1,150 @@
+"""
+Yaklaşık Arama İndeksi Deposu
+=============================
+IVF / HNSW / PQ gibi indekslerin ortak disk biçimi: output/vectors altında
+index_<tür>/ klasörü; her dizi ayrı bir .npy dosyası, skalar ayarlar
+meta.json'da. Diziler np.load(mmap_mode="r") ile bellek eşlemeli açılabilir,
+böylece büyük indeksler RAM'e kopyalanmadan sorgulanır.
+
+meta.json, indeksin hangi vectors.npy'den kurulduğunu gösteren bir parmak
+izi taşır; vektörler değişmişse indeks bayat sayılır ve arama tam (exact)
+yönteme döner. Parmak izi tüm satırların sha256 özetidir; bellek eşlemeli
+vectors.npy için sonuç dosyanın yanında (vectors.npy.parmak_izi.json)
+dosya boyu / değişme zamanıyla birlikte saklanır, dosya değişmedikçe her
+aramada yeniden okunmaz. vectors.npy belleğe okunduğunda (load_index,
+mmap=False) iz dosyadan bir kez alınıp salt okunur diziye remember_fingerprint
+ile bağlanır; indeks okuyucuları matrisi yeniden özetlemez.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import shutil
+import weakref
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+META_NAME = "meta.json"
+PARMAK_IZI_EKI = ".parmak_izi.json"
+_OZET_BLOK = 16 * 1024 * 1024   # özete tek seferde verilen en fazla bayt
+
+# id(dizi) → (zayıf referans, parmak izi); dizi silinince kayıt da düşer
+_BILINEN: Dict[int, Tuple[weakref.ref, str]] = {}
+
+
+def index_dir(out_dir: Path, tur: str) -> Path:
+    return out_dir / f"index_{tur}"
+
+
+def _array_digest(raw) -> str:
+    """Şekil + tip + tüm satırların bloklar halinde akışlı sha256 özeti."""
+    import numpy as np
+
+    h = hashlib.sha256(repr((tuple(raw.shape), raw.dtype.str)).encode("ascii"))
+    satir_bayt = max(int(np.prod(raw.shape[1:], dtype=np.int64)) * raw.dtype.itemsize, 1)
+    blok = max(_OZET_BLOK // satir_bayt, 1)
+    for b in range(0, raw.shape[0], blok):
+        h.update(np.ascontiguousarray(raw[b:b + blok]).data)
+    return h.hexdigest()
+
+
+def _file_fingerprint(raw, path: Path) -> str:
+    """
+    Bellek eşlemeli dosyanın özetini önbellekten okur ya da hesaplayıp yazar.
+    Önbellek, dosyanın boyu / inode / değişme zamanı aynıysa ve dosya
+    önbellekle aynı zaman diliminde yazılmamışsa (git'in "racy" kuralı)
+    geçerlidir; aksi halde dosya baştan özetlenir.
+    """
+    st = path.stat()
+    anahtar = [st.st_size, st.st_ino, st.st_mtime_ns]
+    onbellek = path.with_name(path.name + PARMAK_IZI_EKI)
+    try:
+        with open(str(onbellek), "r", encoding="utf-8") as f:
+            kayit = json.load(f)
+        if kayit.get("anahtar") == anahtar and st.st_mtime_ns < onbellek.stat().st_mtime_ns:
+            return kayit["parmak_izi"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    iz = _array_digest(raw)
+    try:
+        with open(str(onbellek), "w", encoding="utf-8") as f:
+            json.dump({"anahtar": anahtar, "parmak_izi": iz}, f)
+    except OSError as e:
+        logger.debug(f"Parmak izi önbelleği yazılamadı: {e}")
+    return iz
+
+
+def remember_fingerprint(embeddings, fingerprint: str):
+    """
+    Dosyadan belleğe okunmuş dizinin (zaten hesaplanmış) izini kaydeder;
+    vector_fingerprint bu dizi için yeniden özet çıkarmaz. Dizi salt okunur
+    yapılır, böylece kayıtlı iz içerikten sapamaz.
+    """
+    raw = getattr(embeddings, "raw", embeddings)
+    raw.flags.writeable = False
+    anahtar = id(raw)
+    _BILINEN[anahtar] = (weakref.ref(raw, lambda _, k=anahtar: _BILINEN.pop(k, None)), fingerprint)
+
+
+def vector_fingerprint(embeddings) -> str:
+    """
+    Vektör matrisinin (ScaledVectors ise saklanan ham dizinin) tüm satırları
+    üzerinden sha256 parmak izi. Aynı içerik bellekte ya da bellek eşlemeli
+    dosyada aynı izi verir; dosyanın tamamını eşleyen dizilerde sonuç önbelleğe
+    alınır, remember_fingerprint ile kaydedilmiş dizilerde kayıtlı iz döner.
+    """
+    raw = getattr(embeddings, "raw", embeddings)
+    kayit = _BILINEN.get(id(raw))
+    if kayit is not None and kayit[0]() is raw and not raw.flags.writeable:
+        return kayit[1]
+    filename = getattr(raw, "filename", None)
+    if filename and isinstance(getattr(raw, "base", None), mmap.mmap):
+        return _file_fingerprint(raw, Path(filename))
+    return _array_digest(raw)
+
+
+def write_index(path: Path, arrays: Dict, meta: Dict):
+    """Dizileri ve meta.json'u geçici klasöre yazar, sonra yerine taşır."""
+    import numpy as np
+
+    tmp = path.with_name(path.name + ".tmp")
+    if tmp.exists():
+        shutil.rmtree(str(tmp))
+    tmp.mkdir(parents=True)
+    for ad, dizi in arrays.items():
+        np.save(str(tmp / f"{ad}.npy"), dizi)
+    with open(str(tmp / META_NAME), "w", encoding="utf-8") as f:
+        json.dump({**meta, "diziler": sorted(arrays)}, f, ensure_ascii=False, indent=2)
+
+    if path.exists():
+        shutil.rmtree(str(path))
+    os.replace(str(tmp), str(path))
+
+
+def read_index(path: Path, fingerprint: Optional[str] = None,
+               mmap: bool = True) -> Optional[Dict]:
+    """
+    İndeksi {"meta": ..., <dizi adı>: ndarray} olarak yükler.
+    Klasör yoksa ya da parmak izi uyuşmuyorsa (bayat indeks) None döner.
+    """
+    import numpy as np
+
+    meta_path = path / META_NAME
+    if not meta_path.exists():
+        return None
+    with open(str(meta_path), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if fingerprint is not None and meta.get("parmak_izi") != fingerprint:
+        logger.warning(f"{path.name} vectors.npy ile uyuşmuyor (bayat); "
+                       f"--build-index ile yeniden kurun.")
+        return None
+
+    index: Dict = {"meta": meta}
+    for ad in meta["diziler"]:
+        index[ad] = np.load(str(path / f"{ad}.npy"), mmap_mode="r" if mmap else None)
+    return index
@@ -0,0 +1,21 @@
+"""
+KVKK Madde Atıfları
+===================
+Metinde geçen "Madde 12", "m. 9" gibi KVKK madde atıflarını bulur. KVKK
+raporu (kvkk_rapor) ve metadata filtre indeksi (filter_index) aynı kuralı
+buradan kullanır; madde sayımları birbirini tutar.
+"""
+
+import re
+from typing import List
+
+MADDE_PATTERN = re.compile(
+    r"(?:madde|m\.)\s*(\d+)[^\d]",
+    re.IGNORECASE | re.UNICODE
+)
+
+
+def mentioned_articles(metin: str) -> List[int]:
+    """Metinde atıf yapılan KVKK madde numaraları (1–30), ilk geçiş sırasıyla."""
+    return list(dict.fromkeys(
+        num for num in map(int, MADDE_PATTERN.findall(metin)) if 1 <= num <= 30))
@@ -0,0 +1,124 @@
+"""
+İkili (Binary) Özet Ön Filtresi
+===============================
+Normalize vektörlerin her boyutu işaretine göre tek bite indirgenir ve
+paketlenir: 384 boyut → 48 bayt. Sorguda tüm özetler Hamming mesafesiyle
+(XOR + popcount, vektörize) taranır; yalnızca en yakın `rescore` aday
+vectors.npy'deki tam vektörlerle iç çarpım üzerinden yeniden puanlanır.
+
+İki rastgele yönlü vektör için Hamming/d ≈ açı/π olduğundan rescore=0 iken
+skor cos(π · h / d) tahminidir.
+
+Disk biçimi (ann_store): ids (n,) int64, bits (n, ⌈d/8⌉) uint8.
+"""
+
+import logging
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESCORE = 200
+_SCAN_BLOCK = 262144            # Hamming taramasının satır bloğu
+
+# numpy < 2.0 için bayt başına bit sayısı tablosu
+_POPCOUNT8 = None
+
+
+def pack(vectors):
+    """(n, d) vektörleri işaret bitlerine çevirip (n, ⌈d/8⌉) uint8 olarak paketler."""
+    import numpy as np
+
+    return np.packbits(np.asarray(vectors) > 0, axis=1)
+
+
+def _words(x):
+    """Satır uzunluğu uygunsa paketli baytları 8 baytlık kelimeler olarak görür."""
+    import numpy as np
+
+    if x.shape[-1] % 8 == 0 and x.flags["C_CONTIGUOUS"]:
+        return x.view(np.uint64)
+    return x
+
+
+def _popcount(x):
+    """Her satırın bit sayısı (n,) int32; kısa satırlarda sütun sütun toplanır."""
+    import numpy as np
+
+    global _POPCOUNT8
+    if hasattr(np, "bitwise_count"):
+        sayim = np.bitwise_count(x)
+    else:
+        if _POPCOUNT8 is None:
+            _POPCOUNT8 = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(
+                axis=1, dtype=np.uint8)
+        sayim = _POPCOUNT8[x.view(np.uint8)]
+    # (n, 6) gibi dar bir matriste sum(axis=1) yerine sütun toplamı belirgin biçimde hızlı
+    out = sayim[:, 0].astype(np.int32)
+    for j in range(1, sayim.shape[1]):
+        out += sayim[:, j]
+    return out
+
+
+def hamming(bits, q_bits):
+    """Her paketli satırın sorgu özetine Hamming mesafesi (n,) int32."""
+    import numpy as np
+
+    q = _words(np.ascontiguousarray(q_bits)[None, :])
+    out = np.empty(len(bits), dtype=np.int32)
+    for b in range(0, len(bits), _SCAN_BLOCK):
+        blok = _words(np.ascontiguousarray(bits[b:b + _SCAN_BLOCK]))
+        out[b:b + len(blok)] = _popcount(np.bitwise_xor(blok, q))
+    return out
+
+
+def build(vectors, rows) -> Tuple[Dict, Dict]:
+    """vectors[rows] için işaret özetlerini üretir."""
+    import numpy as np
+
+    rows = np.asarray(rows, dtype=np.int64)
+    bits = pack(vectors[rows])
+    logger.info(f"Binary: parça başına {bits.shape[1]} bayt")
+    return {"ids": rows, "bits": bits}, {"tur": "binary", "boyut": int(vectors.shape[1])}
+
+
+def update(index: Dict, vectors, eski_to_yeni, tekil_satirlar) -> Tuple[Dict, Dict]:
+    """Artımlı güncelleme: satırları yeniden numaralar, yeni tekil satırları ekler."""
+    import numpy as np
+
+    tekil = np.asarray(tekil_satirlar, dtype=np.int64)
+    ids = np.asarray(eski_to_yeni, dtype=np.int64)[np.asarray(index["ids"])]
+    keep = (ids >= 0) & np.isin(ids, tekil)
+    eklenecek = np.setdiff1d(tekil, ids[keep])
+    bits = np.concatenate([np.asarray(index["bits"])[keep], pack(vectors[eklenecek])])
+    logger.info(f"Binary: {int((~keep).sum())} satır çıkarıldı, {len(eklenecek)} satır eklendi")
+    return ({"ids": np.concatenate([ids[keep], eklenecek]), "bits": bits},
+            {"tur": "binary", "boyut": int(vectors.shape[1])})
+
+
+def search(index: Dict, vectors, q, k: int, rescore: int = DEFAULT_RESCORE):
+    """
+    Tek bir normalize sorgu için en iyi k (satır, skor) çiftini döndürür.
+    Hamming'e göre en yakın max(rescore, k) aday tam iç çarpımla yeniden
+    puanlanır; rescore=0 ise açı tahmininden türetilen skorlar döner.
+    """
+    import numpy as np
+
+    q = np.asarray(q, dtype=np.float32).ravel()
+    ids = np.asarray(index["ids"])
+    if len(ids) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    h = hamming(index["bits"], pack(q[None, :])[0])
+
+    n_aday = min(max(rescore, k), len(h))
+    aday = np.argpartition(h, n_aday - 1)[:n_aday]
+    if rescore > 0:
+        satir = np.sort(ids[aday])                  # vectors.npy'de ileri yönlü okuma
+        skor = np.asarray(vectors[satir], dtype=np.float32) @ q
+    else:
+        satir = ids[aday]
+        skor = np.cos(np.pi * h[aday] / index["meta"]["boyut"]).astype(np.float32)
+
+    k = min(k, len(satir))
+    en_iyi = np.argpartition(-skor, k - 1)[:k]
+    en_iyi = en_iyi[np.argsort(-skor[en_iyi], kind="stable")]
+    return satir[en_iyi], skor[en_iyi]
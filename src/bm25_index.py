@@ -0,0 +1,124 @@
+"""
+Sözcüksel (BM25) Ters İndeks
+============================
+Gömme araması "7499/33" ya da "Madde 12" gibi birebir yasal atıfları
+kaçırabilir. Bu modül tekil parçalar üzerinde kalıcı bir ters indeks kurar
+ve sorguları BM25 ile puanlar; model yüklemeden çalışır.
+
+Türkçe belirteçleme:
+  • Büyük/küçük harf: I → ı, İ → i (str.lower() bunları yanlış çevirir)
+  • Kesme işaretinden sonrası (ek) atılır: "KVKK'nın" → kvkk
+  • Sayısal atıflar tek terimdir: "7499/33" → 7499/33 (+ 7499, 33)
+  • Basit ek budama: harf terimleri ilk 5 karaktere kısaltılır
+    (Türkçe için bilinen etkili bir yaklaşım; "verilerin" / "veriler" → veril)
+
+Disk biçimi (ann_store, index_bm25/): terms (V,) unicode, sıralı;
+offsets (V+1,) int64 terim başına kayıt aralığı; docs (P,) int32 ve tf (P,)
+uint16 kayıtlar (docs, ids içindeki sıradır); doc_len (n,) int32 terim
+sayıları; ids (n,) int64 indekslenen vectors.npy satırları.
+"""
+
+import logging
+import math
+import re
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+K1 = 1.2
+B = 0.75
+STEM_LEN = 5
+
+_TOKEN_RE = re.compile(r"\d+(?:[/.]\d+)+|\w+")
+_KESME_RE = re.compile(r"(\w)['’]\w+")
+
+
+def fold(metin: str) -> str:
+    """Türkçe kurallarıyla küçük harfe çevirir (I → ı, İ → i)."""
+    return metin.replace("I", "ı").replace("İ", "i").lower()
+
+
+def tokenize(metin: str) -> List[str]:
+    """Metni BM25 terimlerine ayırır (bkz. modül açıklaması)."""
+    terimler: List[str] = []
+    for t in _TOKEN_RE.findall(_KESME_RE.sub(r"\1", fold(metin))):
+        if t[0].isdigit():
+            terimler.append(t)
+            if not t.isdigit():
+                terimler.extend(re.split(r"[/.]", t))
+        else:
+            terimler.append(t[:STEM_LEN])
+    return terimler
+
+
+def build(chunks, rows) -> Tuple[Dict, Dict]:
+    """chunks[rows] metinleri için ters indeksi kurar."""
+    import numpy as np
+
+    rows = np.asarray(rows, dtype=np.int64)
+    sayimlar: Dict[str, Dict[int, int]] = {}
+    doc_len = np.zeros(len(rows), dtype=np.int32)
+    for j, satir in enumerate(rows.tolist()):
+        terimler = tokenize(chunks[satir]["metin"])
+        doc_len[j] = len(terimler)
+        for t in terimler:
+            d = sayimlar.setdefault(t, {})
+            d[j] = d.get(j, 0) + 1
+
+    terms = sorted(sayimlar)
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum([len(sayimlar[t]) for t in terms], out=offsets[1:])
+    docs = np.empty(offsets[-1], dtype=np.int32)
+    tf = np.empty(offsets[-1], dtype=np.uint16)
+    for i, t in enumerate(terms):
+        d = sayimlar[t]
+        docs[offsets[i]:offsets[i + 1]] = list(d)
+        tf[offsets[i]:offsets[i + 1]] = np.minimum(list(d.values()), 65535)
+
+    logger.info(f"BM25: {len(rows)} parça, {len(terms)} terim, {len(docs)} kayıt")
+    arrays = {"terms": np.array(terms, dtype=str) if terms else np.empty(0, dtype="<U1"),
+              "offsets": offsets, "docs": docs, "tf": tf, "doc_len": doc_len, "ids": rows}
+    ort = float(doc_len.mean()) if len(rows) else 0.0
+    return arrays, {"tur": "bm25", "ortalama_uzunluk": ort, "k1": K1, "b": B}
+
+
+def scores(index: Dict, sorgu: str):
+    """Her indekslenen parça için BM25 skoru (n,) float32; sıra index["ids"] ile aynı."""
+    import numpy as np
+
+    terms, offsets = index["terms"], index["offsets"]
+    doc_len = np.asarray(index["doc_len"], dtype=np.float32)
+    meta = index["meta"]
+    n = len(doc_len)
+    skor = np.zeros(n, dtype=np.float32)
+    if n == 0:
+        return skor
+    norm = meta["k1"] * (1 - meta["b"] + meta["b"] * doc_len / max(meta["ortalama_uzunluk"], 1e-9))
+    for t in dict.fromkeys(tokenize(sorgu)):
+        i = int(np.searchsorted(terms, t))
+        if i >= len(terms) or terms[i] != t:
+            continue
+        bas, son = int(offsets[i]), int(offsets[i + 1])
+        df = son - bas
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        docs = np.asarray(index["docs"][bas:son])
+        tf = np.asarray(index["tf"][bas:son], dtype=np.float32)
+        skor[docs] += idf * tf * (meta["k1"] + 1) / (tf + norm[docs])
+    return skor
+
+
+def search(index: Dict, sorgu: str, k: int, izin=None):
+    """
+    En iyi k (satır, skor) çifti; hiçbir terimi eşleşmeyen parçalar dönmez.
+    izin verilirse ((n,) bool, sıra index["ids"] ile aynı) yalnızca izinli parçalar döner.
+    """
+    import numpy as np
+
+    skor = scores(index, sorgu)
+    aday = np.flatnonzero((skor > 0) if izin is None else (skor > 0) & izin)
+    k = min(k, len(aday))
+    if k == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    en_iyi = aday[np.argpartition(-skor[aday], k - 1)[:k]]
+    en_iyi = en_iyi[np.argsort(-skor[en_iyi], kind="stable")]
+    return np.asarray(index["ids"])[en_iyi], skor[en_iyi]
@@ -0,0 +1,150 @@
+"""
+Sütunlu Parça Metadata'sı
+=========================
+metadata.json'daki parça listesinin bellek eşlemeli, sütunlu kopyası.
+JSON'un tamamını ayrıştırmak yerine her alan ayrı bir .npy dizisidir;
+yükleme dosya sayısı kadar np.load'dur ve bir parçanın metnine O(1)
+erişilir (ofset dizisiyle blob'dan dilim).
+
+Klasör düzeni (output/vectors/columns/, ann_store biçimi):
+  id            (n,)   int64
+  dosya         (n,)   int32   meta["dosyalar"] tablosundaki sıra
+  slayt_no      (n,)   int32
+  parca_no      (n,)   int32
+  ortak_vektor  (n,)   int64
+  metin_ofset   (n+1,) int64   metin blob'undaki bayt sınırları
+  metin         (B,)   uint8   tüm metinler art arda, UTF-8
+  meta.json     model, vektor_boyutu, vektor_tipi, olcek, toplam_parca,
+                dosyalar, vectors.npy parmak izi
+
+metadata.json dışa aktarım olarak yazılmaya devam eder; sütunlar yoksa ya da
+vectors.npy ile uyuşmuyorsa okuyucular JSON'a döner.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+COLUMNS_DIR = "columns"
+
+
+def columns_dir(out_dir: Path) -> Path:
+    return out_dir / COLUMNS_DIR
+
+
+def write_columns(chunks: List[Dict], out_dir: Path, meta: Dict, fingerprint: str):
+    """
+    Parça listesini sütunlara çevirip columns/ klasörüne yazar.
+    meta: metadata.json'daki "chunks" dışındaki alanlar.
+    """
+    import numpy as np
+    from ann_store import write_index
+
+    dosyalar = sorted({c["dosya"] for c in chunks})
+    kod = {d: i for i, d in enumerate(dosyalar)}
+    metinler = [c["metin"].encode("utf-8") for c in chunks]
+    ofset = np.zeros(len(chunks) + 1, dtype=np.int64)
+    np.cumsum([len(m) for m in metinler], out=ofset[1:])
+
+    arrays = {
+        "id": np.array([c["id"] for c in chunks], dtype=np.int64),
+        "dosya": np.array([kod[c["dosya"]] for c in chunks], dtype=np.int32),
+        "slayt_no": np.array([c["slayt_no"] for c in chunks], dtype=np.int32),
+        "parca_no": np.array([c["parca_no"] for c in chunks], dtype=np.int32),
+        "ortak_vektor": np.array([c.get("ortak_vektor", c["id"]) for c in chunks], dtype=np.int64),
+        "metin_ofset": ofset,
+        "metin": np.frombuffer(b"".join(metinler), dtype=np.uint8),
+    }
+    write_index(columns_dir(out_dir), arrays,
+                {**meta, "dosyalar": dosyalar, "parmak_izi": fingerprint})
+
+
+class ChunkColumns:
+    """
+    Sütunlu parçaların salt okunur liste görünümü: chunks[i] metadata.json'daki
+    kayıtla aynı sözlüğü üretir, böylece mevcut arama kodu değişmeden çalışır.
+    Toplu işlemler için sütunlara (ör. .slayt_no) ve text(i)'ye doğrudan erişilebilir.
+    """
+
+    def __init__(self, index: Dict):
+        self.meta = index["meta"]
+        self.dosyalar: List[str] = self.meta["dosyalar"]
+        self.id = index["id"]
+        self.dosya = index["dosya"]
+        self.slayt_no = index["slayt_no"]
+        self.parca_no = index["parca_no"]
+        self.ortak_vektor = index["ortak_vektor"]
+        self._ofset = index["metin_ofset"]
+        self._metin = index["metin"]
+        self._gruplar: Optional[Dict[int, List[int]]] = None
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def text(self, i: int) -> str:
+        bas, son = int(self._ofset[i]), int(self._ofset[i + 1])
+        return self._metin[bas:son].tobytes().decode("utf-8")
+
+    def _kayit(self, i: int) -> Dict:
+        return {
+            "id": int(self.id[i]),
+            "dosya": self.dosyalar[self.dosya[i]],
+            "slayt_no": int(self.slayt_no[i]),
+            "parca_no": int(self.parca_no[i]),
+            "metin": self.text(i),
+            "ortak_vektor": int(self.ortak_vektor[i]),
+        }
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._kayit(i) for i in range(*key.indices(len(self)))]
+        i = int(key)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(key)
+        return self._kayit(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._kayit(i)
+
+    def duplicate_groups(self) -> Dict[int, List[int]]:
+        """
+        ortak_vektor → satırlar; metinler çözülmeden sütundan hesaplanır.
+        Görünüm salt okunur olduğundan sonuç ilk çağrıdan sonra saklanır.
+        """
+        import numpy as np
+
+        if self._gruplar is None:
+            ortak = np.asarray(self.ortak_vektor)
+            sira = np.argsort(ortak, kind="stable")
+            sinir = np.flatnonzero(np.diff(ortak[sira])) + 1
+            self._gruplar = {int(ortak[g[0]]): g.tolist()
+                             for g in np.split(sira, sinir) if len(g)}
+        return self._gruplar
+
+
+def open_columns(out_dir: Path, fingerprint: Optional[str] = None,
+                 mmap: bool = True) -> Optional[ChunkColumns]:
+    """
+    Sütunları açar. fingerprint verilmezse vectors.npy'den hesaplanır;
+    sütunlar yoksa ya da bayatsa None döner (çağıran metadata.json'a döner).
+    """
+    import numpy as np
+    from ann_store import read_index, vector_fingerprint
+
+    if not (columns_dir(out_dir) / "meta.json").exists():
+        return None
+    if fingerprint is None:
+        vec_path = out_dir / "vectors.npy"
+        if not vec_path.exists():
+            return None
+        fingerprint = vector_fingerprint(np.load(str(vec_path), mmap_mode="r"))
+    index = read_index(columns_dir(out_dir), mmap=mmap)
+    if index["meta"].get("parmak_izi") != fingerprint:
+        logger.warning("Sütunlu metadata vectors.npy ile uyuşmuyor (bayat); metadata.json okunuyor.")
+        return None
+    return ChunkColumns(index)
@@ -0,0 +1,167 @@
+"""
+SQLite Parça Veritabanı (FTS5)
+==============================
+Parçaları, slaytları ve değişiklik notasyonlarını indeksli tablolarda,
+parça metinlerini ise bir FTS5 tam metin indeksinde tutar. Böylece
+"X destesinde 7499/33 geçen parçalar" gibi sorgular her şeyi Python
+sözlüklerine yüklemeden milisaniyeler içinde yanıtlanır.
+
+Tablolar (output/vectors/chunks.sqlite):
+  chunks       id, dosya, slayt_no, parca_no, ortak_vektor, metin
+  slides       dosya, slayt_no, parca_sayisi, ilk_parca, son_parca
+  annotations  kvkk_rapor.extract_ppt_change_annotations kayıtları
+  chunks_fts   metin üzerinde içeriksiz FTS5 (rowid = chunks.id)
+
+save() veritabanı varsa (ya da --db istendiyse) chunks/slides tablolarını,
+kvkk_rapor ise annotations tablosunu yeniden yazar. Harici servis gerekmez.
+
+Türkçe karakterler: FTS5 "unicode61 remove_diacritics 2" İ/ş/ğ/ü/ö/ç'yi
+ASCII karşılığına indirir, ancak noktasız ı'yı i'ye çevirmez ("IŞIK" → isik,
+"ışık" → ısık). Bu yüzden hem indekslenen metinde hem sorguda ı → i yapılır.
+Deste filtresi (dosya) diğer arka uçlarla aynı kuralla eşleşir (bkz.
+filter_index.match_decks).
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from bm25_index import fold as _tr_fold
+
+logger = logging.getLogger(__name__)
+
+DB_NAME = "chunks.sqlite"
+_TERIM_RE = re.compile(r"\w+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY, dosya TEXT NOT NULL, slayt_no INTEGER NOT NULL,
+    parca_no INTEGER NOT NULL, ortak_vektor INTEGER NOT NULL, metin TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS ix_chunks_slayt ON chunks (dosya, slayt_no);
+CREATE INDEX IF NOT EXISTS ix_chunks_ortak ON chunks (ortak_vektor);
+CREATE TABLE IF NOT EXISTS slides (
+    dosya TEXT NOT NULL, slayt_no INTEGER NOT NULL, parca_sayisi INTEGER NOT NULL,
+    ilk_parca INTEGER NOT NULL, son_parca INTEGER NOT NULL,
+    PRIMARY KEY (dosya, slayt_no));
+CREATE TABLE IF NOT EXISTS annotations (
+    id INTEGER PRIMARY KEY, tip TEXT NOT NULL, tarih TEXT, kanun_no TEXT, madde_ref TEXT,
+    kaynak_txt TEXT NOT NULL, slayt_no INTEGER, baglantilar TEXT, notasyon TEXT,
+    satir TEXT, onceki_satir TEXT, sonraki_satir TEXT);
+CREATE INDEX IF NOT EXISTS ix_annotations_kanun ON annotations (kanun_no, madde_ref);
+CREATE INDEX IF NOT EXISTS ix_annotations_slayt ON annotations (kaynak_txt, slayt_no);
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+    metin, content='', tokenize='unicode61 remove_diacritics 2');
+"""
+
+
+def fold(metin: str) -> str:
+    """Türkçe küçük harf katlaması + FTS5 tokenizer'ının atladığı ı → i."""
+    return _tr_fold(metin).replace("ı", "i")
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def write_chunks(path: Path, chunks: Iterable[Dict]):
+    """chunks, slides ve chunks_fts tablolarını verilen parçalarla yeniden yazar."""
+    conn = connect(path)
+    try:
+        with conn:
+            conn.execute("DELETE FROM chunks")
+            conn.execute("DELETE FROM slides")
+            conn.execute("INSERT INTO chunks_fts (chunks_fts) VALUES ('delete-all')")
+            satirlar = [(c["id"], c["dosya"], c["slayt_no"], c["parca_no"],
+                         c.get("ortak_vektor", c["id"]), c["metin"]) for c in chunks]
+            conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?)", satirlar)
+            conn.executemany("INSERT INTO chunks_fts (rowid, metin) VALUES (?, ?)",
+                             [(s[0], fold(s[5])) for s in satirlar])
+            conn.execute(
+                "INSERT INTO slides SELECT dosya, slayt_no, COUNT(*), MIN(id), MAX(id) "
+                "FROM chunks GROUP BY dosya, slayt_no")
+        logger.info(f"SQLite: {len(satirlar)} parça → {path}")
+    finally:
+        conn.close()
+
+
+def write_annotations(path: Path, annotations: List[Dict]):
+    """annotations tablosunu extract_ppt_change_annotations çıktısıyla yeniden yazar."""
+    alanlar = ("tip", "tarih", "kanun_no", "madde_ref", "kaynak_txt", "slayt_no",
+               "baglantilar", "notasyon", "satir", "onceki_satir", "sonraki_satir")
+    conn = connect(path)
+    try:
+        with conn:
+            conn.execute("DELETE FROM annotations")
+            conn.executemany(
+                f"INSERT INTO annotations ({', '.join(alanlar)}) "
+                f"VALUES ({', '.join('?' * len(alanlar))})",
+                [tuple(json.dumps(a[k], ensure_ascii=False) if k == "baglantilar" else a.get(k)
+                       for k in alanlar) for a in annotations])
+        logger.info(f"SQLite: {len(annotations)} notasyon → {path}")
+    finally:
+        conn.close()
+
+
+def fts_query(sorgu: str) -> str:
+    """
+    Kullanıcı sorgusunu güvenli bir FTS5 ifadesine çevirir: boşlukla ayrılan
+    her terim, içindeki kelimelerden oluşan bir öbek olur ("7499/33" →
+    "7499 33"); terimler VE ile birleşir, sonu * ile biten terim önek araması yapar.
+    """
+    parcalar = []
+    for terim in sorgu.split():
+        kelimeler = _TERIM_RE.findall(fold(terim))
+        if kelimeler:
+            parcalar.append('"' + " ".join(kelimeler) + '"' + ("*" if terim.endswith("*") else ""))
+    return " ".join(parcalar)
+
+
+def search(path: Path, sorgu: str, top_k: int = 10, dosya: Optional[str] = None) -> List[Dict]:
+    """
+    FTS5 (bm25) ile sözcüksel arama. dosya verilirse yalnızca adı bu metni
+    içeren destelerde aranır (bkz. filter_index.match_decks). Skor büyüdükçe eşleşme iyileşir. Sonuçlar
+    rank() biçimindedir: birebir kopyalar tek sonuçta, "konumlar" ile toplanır.
+    """
+    ifade = fts_query(sorgu)
+    if not ifade:
+        return []
+    sql = ("SELECT c.id, c.dosya, c.slayt_no, c.parca_no, c.metin, -bm25(chunks_fts) "
+           "FROM chunks_fts JOIN chunks c ON c.id = chunks_fts.rowid "
+           "WHERE chunks_fts MATCH ? AND c.ortak_vektor = c.id")
+    params: List = [ifade]
+
+    conn = sqlite3.connect(str(path))
+    try:
+        t0 = time.perf_counter()
+        if dosya:
+            from filter_index import match_decks
+
+            dosyalar = [d for (d,) in conn.execute("SELECT DISTINCT dosya FROM chunks ORDER BY dosya")]
+            desteler = [dosyalar[i] for i in match_decks(dosyalar, dosya)]
+            if not desteler:
+                return []
+            # Kopyalardan biri bu destelerdeyse de eşleşir
+            sql += (f" AND c.id IN (SELECT ortak_vektor FROM chunks "
+                    f"WHERE dosya IN ({', '.join('?' * len(desteler))}))")
+            params.extend(desteler)
+        sql += " ORDER BY bm25(chunks_fts) LIMIT ?"
+        params.append(top_k)
+        rows = conn.execute(sql, params).fetchall()
+        konumlar: Dict[int, List] = {}
+        if rows:
+            for ortak, d, n in conn.execute(
+                    f"SELECT ortak_vektor, dosya, slayt_no FROM chunks WHERE ortak_vektor IN "
+                    f"({', '.join('?' * len(rows))}) ORDER BY id", [r[0] for r in rows]):
+                konumlar.setdefault(ortak, []).append((d, n))
+        logger.info(f"SQLite FTS5 araması: {(time.perf_counter() - t0) * 1000:.1f} ms")
+    finally:
+        conn.close()
+    return [{"idx": r[0], "skor": r[5], "konumlar": konumlar[r[0]], "dosya": r[1],
+             "slayt_no": r[2], "parca_no": r[3], "metin": r[4]} for r in rows]
@@ -0,0 +1,111 @@
+"""
+Gömme (Embedding) Önbelleği
+===========================
+Chunk vektörlerini (model_adı, sha256(metin)) anahtarıyla yerel bir SQLite
+dosyasında saklar. Böylece değişmeyen slayt metinleri ve desteler arasında
+tekrar eden kalıp slaytlar her çalıştırmada yeniden kodlanmaz.
+
+Önbellek boyutu kayıt sayısıyla sınırlıdır; sınır aşıldığında en uzun
+süredir erişilmeyen (LRU) kayıtlar silinir. Harici servis gerekmez.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 200_000   # 384 boyutta ≈ 300 MB
+_SQL_BATCH = 500                # tek sorgudaki en fazla parametre sayısı
+
+
+def text_key(metin: str) -> str:
+    """Bir chunk metninin önbellek anahtarı: UTF-8 sha256 özeti."""
+    return hashlib.sha256(metin.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """(model, metin özeti) → float32 vektör eşlemesi tutan LRU disk önbelleği."""
+
+    def __init__(self, path: Path, max_entries: int = DEFAULT_MAX_ENTRIES):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, anahtar TEXT NOT NULL,"
+            " boyut INTEGER NOT NULL, vektor BLOB NOT NULL,"
+            " erisim INTEGER NOT NULL,"
+            " PRIMARY KEY (model, anahtar))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_erisim ON embeddings (erisim)")
+        self._conn.commit()
+
+    def get_many(self, model_name: str, keys: Iterable[str]) -> Dict:
+        """Bulunan anahtarlar için {anahtar: np.ndarray} döndürür, erişim zamanını tazeler."""
+        import numpy as np
+
+        wanted = list(dict.fromkeys(keys))
+        found: Dict = {}
+        for i in range(0, len(wanted), _SQL_BATCH):
+            part = wanted[i:i + _SQL_BATCH]
+            rows = self._conn.execute(
+                f"SELECT anahtar, vektor FROM embeddings WHERE model = ? "
+                f"AND anahtar IN ({','.join('?' * len(part))})",
+                [model_name, *part],
+            ).fetchall()
+            for anahtar, blob in rows:
+                found[anahtar] = np.frombuffer(blob, dtype=np.float32)
+
+        if found:
+            now = time.time_ns()
+            self._conn.executemany(
+                "UPDATE embeddings SET erisim = ? WHERE model = ? AND anahtar = ?",
+                [(now, model_name, k) for k in found],
+            )
+            self._conn.commit()
+        self.hits += len(found)
+        self.misses += len(wanted) - len(found)
+        return found
+
+    def put_many(self, model_name: str, keys: List[str], vectors) -> None:
+        """Vektörleri önbelleğe yazar, ardından boyut sınırını uygular."""
+        import numpy as np
+
+        now = time.time_ns()
+        rows = [
+            (model_name, k, int(v.shape[0]), np.asarray(v, dtype=np.float32).tobytes(), now)
+            for k, v in zip(keys, vectors)
+        ]
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (model, anahtar, boyut, vektor, erisim) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        self._evict()
+        self._conn.commit()
+
+    def _evict(self) -> None:
+        """Kayıt sayısı sınırı aşıldıysa en eski erişilenleri siler (LRU)."""
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        fazla = count - self.max_entries
+        if fazla > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN ("
+                " SELECT rowid FROM embeddings ORDER BY erisim LIMIT ?)",
+                (fazla,),
+            )
+            logger.info(f"Gömme önbelleği: {fazla} eski kayıt silindi (sınır {self.max_entries})")
+
+    def __len__(self) -> int:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        return count
+
+    def close(self) -> None:
+        self._conn.close()
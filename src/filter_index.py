@@ -0,0 +1,120 @@
+"""
+Metadata Filtre İndeksi (Bitmap)
+================================
+Aramayı desteye, slayt aralığına ya da atıf yapılan KVKK maddesine göre
+daraltmak için save() sırasında önceden hesaplanan bit eşlemleri. Filtre
+sıralamadan önce uygulanır: tam aramada yalnızca aday satırlar puanlanır,
+yaklaşık indekslerde (IVF/HNSW/PQ/binary) ve BM25'te sonuçlar aday
+gruplarıyla sınırlanır.
+
+Disk biçimi (ann_store, index_filtre/):
+  dosya_bits  (D, ⌈n/8⌉) uint8   deste başına satır bit eşlemi (np.packbits)
+  madde_no    (A,)       int32   metinde geçen madde numaraları (sıralı)
+  madde_bits  (A, ⌈n/8⌉) uint8   madde başına satır bit eşlemi
+  slayt_no    (n,)       int32
+  ortak       (n,)       int64   ortak_vektor (kopyalar → ilk kopya)
+meta.json: dosyalar (dosya_bits satır sırası), satir, parmak_izi
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from article_refs import mentioned_articles
+from bm25_index import fold
+
+logger = logging.getLogger(__name__)
+
+
+def articles(metin: str) -> List[int]:
+    """
+    Metinde atıf yapılan madde numaraları; KVKK raporuyla aynı kural
+    (article_refs.mentioned_articles) kullanılır, sayımlar birbirini tutar.
+    """
+    return sorted(mentioned_articles(metin))
+
+
+def match_decks(dosyalar: List[str], dosya: str) -> List[int]:
+    """
+    Adında dosya metni geçen destelerin sırası (Türkçe harf duyarsız).
+    --dosya her arka uçta (bit eşlemi, BM25, SQLite, --similar-to) bu kuralla eşleşir.
+    """
+    aranan = fold(dosya)
+    return [i for i, d in enumerate(dosyalar) if aranan in fold(d)]
+
+
+def _pack_rows(satir_listeleri: List[List[int]], n: int):
+    """Her satır listesini (n,) bit eşlemine çevirip (len, ⌈n/8⌉) uint8 olarak paketler."""
+    import numpy as np
+
+    bits = np.zeros((len(satir_listeleri), (n + 7) // 8), dtype=np.uint8)
+    maske = np.zeros(n, dtype=bool)
+    for j, satirlar in enumerate(satir_listeleri):
+        maske[:] = False
+        maske[satirlar] = True
+        bits[j] = np.packbits(maske)
+    return bits
+
+
+def build(chunks) -> Tuple[Dict, Dict]:
+    """Parça listesinden deste / madde bit eşlemlerini ve sütunları üretir."""
+    import numpy as np
+
+    n = len(chunks)
+    slayt = np.zeros(n, dtype=np.int32)
+    ortak = np.zeros(n, dtype=np.int64)
+    dosya_satir: Dict[str, List[int]] = {}
+    madde_satir: Dict[int, List[int]] = {}
+    for i, c in enumerate(chunks):
+        slayt[i] = c["slayt_no"]
+        ortak[i] = c.get("ortak_vektor", c["id"])
+        dosya_satir.setdefault(c["dosya"], []).append(i)
+        for m in articles(c["metin"]):
+            madde_satir.setdefault(m, []).append(i)
+
+    dosyalar = sorted(dosya_satir)
+    madde_no = sorted(madde_satir)
+    logger.info(f"Filtre indeksi: {len(dosyalar)} deste, {len(madde_no)} madde bit eşlemi")
+    arrays = {"dosya_bits": _pack_rows([dosya_satir[d] for d in dosyalar], n),
+              "madde_no": np.array(madde_no, dtype=np.int32),
+              "madde_bits": _pack_rows([madde_satir[m] for m in madde_no], n),
+              "slayt_no": slayt, "ortak": ortak}
+    return arrays, {"tur": "filtre", "dosyalar": dosyalar, "satir": n}
+
+
+def _union(bits, secilen, n: int):
+    """Seçilen bit eşlemlerinin birleşimi (n,) bool; seçim boşsa tümü False."""
+    import numpy as np
+
+    if len(secilen) == 0:
+        return np.zeros(n, dtype=bool)
+    return np.unpackbits(np.bitwise_or.reduce(bits[secilen], axis=0), count=n).astype(bool)
+
+
+def select(index: Dict, dosya: Optional[str] = None, slayt: Optional[Tuple[int, int]] = None,
+           madde: Optional[List[int]] = None) -> Optional[Dict]:
+    """
+    Filtrelerin kesişimini hesaplar. Filtre yoksa None; aksi halde
+    {"satirlar": aday satırlar (sıralı), "temsil": (n,) satır → grubun ilk
+    aday üyesi, grupta aday yoksa -1} döndürür. dosya, deste adında geçen
+    bir metindir (bkz. match_decks); madde listesindekilerden biri yeterlidir.
+    """
+    import numpy as np
+
+    if dosya is None and slayt is None and not madde:
+        return None
+    n = index["meta"]["satir"]
+    maske = np.ones(n, dtype=bool)
+    if dosya is not None:
+        maske &= _union(index["dosya_bits"], match_decks(index["meta"]["dosyalar"], dosya), n)
+    if slayt is not None:
+        slayt_no = np.asarray(index["slayt_no"])
+        maske &= (slayt_no >= slayt[0]) & (slayt_no <= slayt[1])
+    if madde:
+        maske &= _union(index["madde_bits"], np.flatnonzero(np.isin(index["madde_no"], madde)), n)
+
+    satirlar = np.flatnonzero(maske)
+    temsil = np.full(n, n, dtype=np.int64)
+    np.minimum.at(temsil, np.asarray(index["ortak"])[satirlar], satirlar)
+    temsil[temsil == n] = -1
+    logger.info(f"Filtre: {len(satirlar)}/{n} aday satır")
+    return {"satirlar": satirlar, "temsil": temsil}
@@ -0,0 +1,297 @@
+"""
+HNSW (Hierarchical Navigable Small World) Graf İndeksi
+======================================================
+Sorgu maliyeti parça sayısıyla doğrusal değil, yaklaşık logaritmik büyür:
+üst katmanlarda açgözlü iniş, en alt katmanda ef_search genişliğinde
+ışın (beam) araması yapılır.
+
+Disk biçimi (ann_store, tamamı sabit boyutlu diziler → mmap ile açılabilir):
+  ids      (n,)      int64  düğüm → vectors.npy satırı
+  levels   (n,)      int8   düğümün en üst katmanı
+  nbr0     (n, M0)   int32  katman 0 komşuları (-1 = boş)
+  up_off   (n,)      int64  üst katman komşularının nbr_up'taki ilk satırı (-1 = yok)
+  nbr_up   (R, M)    int32  katman l ≥ 1 komşuları: nbr_up[up_off[i] + l - 1]
+
+Vektörler kopyalanmaz; mesafeler vectors.npy satırlarından (iç çarpım) hesaplanır.
+update() silinen desteleri graftan çıkarıp komşulukları onarır ve yeni
+satırları mevcut grafa ekler; tam yeniden kurulum gerekmez.
+"""
+
+import heapq
+import logging
+import math
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_M = 16
+DEFAULT_EF_CONSTRUCTION = 100
+DEFAULT_EF_SEARCH = 64
+
+
+# ── Bellek içi (değiştirilebilir) graf ──────────────────────────────────────
+
+class _Graph:
+    """Kurulum/ekleme sırasında kullanılan liste tabanlı graf."""
+
+    def __init__(self, vectors, M: int, ef_construction: int, seed: int = 0):
+        import numpy as np
+
+        self.V = vectors                    # düğüm sırasıyla (n, d) float32
+        self.M, self.M0 = M, 2 * M
+        self.ef_construction = ef_construction
+        self.mL = 1.0 / math.log(M)
+        self.rng = np.random.default_rng(seed)
+        self.links: List[List[List[int]]] = []   # links[düğüm][katman] → komşular
+        self.entry = -1
+        self.max_level = -1
+
+    def _sims(self, q, nodes):
+        import numpy as np
+
+        return self.V[np.asarray(nodes, dtype=np.int64)] @ q
+
+    def _search_layer(self, q, giris: List[int], ef: int, layer: int) -> List[Tuple[float, int]]:
+        """Katmanda ışın araması; (benzerlik, düğüm) listesini azalan sırada döndürür."""
+        gorulen = set(giris)
+        s = self._sims(q, giris)
+        aday = [(-float(x), n) for x, n in zip(s, giris)]      # en benzer önce (min-heap)
+        sonuc = [(float(x), n) for x, n in zip(s, giris)]      # en az benzer önce
+        heapq.heapify(aday)
+        heapq.heapify(sonuc)
+        while sonuc and len(sonuc) > ef:
+            heapq.heappop(sonuc)
+        while aday:
+            eksi_sim, n = heapq.heappop(aday)
+            if -eksi_sim < sonuc[0][0] and len(sonuc) >= ef:
+                break
+            komsu = [m for m in self.links[n][layer] if m not in gorulen]
+            if not komsu:
+                continue
+            gorulen.update(komsu)
+            for sim, m in zip(self._sims(q, komsu).tolist(), komsu):
+                if len(sonuc) < ef or sim > sonuc[0][0]:
+                    heapq.heappush(aday, (-sim, m))
+                    heapq.heappush(sonuc, (sim, m))
+                    if len(sonuc) > ef:
+                        heapq.heappop(sonuc)
+        return sorted(sonuc, reverse=True)
+
+    def _select(self, q_sims: List[Tuple[float, int]], m: int) -> List[int]:
+        """
+        Komşu seçim sezgiseli: bir aday, seçilmiş komşulardan herhangi birine
+        sorgudan daha yakınsa atlanır (grafın farklı yönlere dallanması için).
+        """
+        if len(q_sims) <= m:
+            return [n for _, n in q_sims]
+        nodes = [n for _, n in q_sims]
+        G = self.V[nodes] @ self.V[nodes].T
+        secilen: List[int] = []
+        for i, (sim, n) in enumerate(q_sims):
+            if all(G[i, j] < sim for j in secilen):
+                secilen.append(i)
+                if len(secilen) == m:
+                    break
+        if len(secilen) < m:    # boş kalan yerleri en yakın atlananlarla doldur
+            secilen += [i for i in range(len(nodes)) if i not in secilen][:m - len(secilen)]
+        return [nodes[i] for i in secilen]
+
+    def insert(self, node: int):
+        q = self.V[node]
+        level = int(-math.log(1.0 - self.rng.random()) * self.mL)
+        self.links.append([[] for _ in range(level + 1)])
+        if self.entry < 0:
+            self.entry, self.max_level = node, level
+            return
+
+        ep = [self.entry]
+        for layer in range(self.max_level, level, -1):
+            ep = [self._search_layer(q, ep, 1, layer)[0][1]]
+        for layer in range(min(level, self.max_level), -1, -1):
+            W = self._search_layer(q, ep, self.ef_construction, layer)
+            m_max = self.M0 if layer == 0 else self.M
+            komsular = self._select(W, self.M)
+            self.links[node][layer] = komsular
+            for n in komsular:
+                liste = self.links[n][layer]
+                liste.append(node)
+                if len(liste) > m_max:
+                    s = self._sims(self.V[n], liste).tolist()
+                    self.links[n][layer] = self._select(
+                        sorted(zip(s, liste), reverse=True), m_max)
+            ep = [n for _, n in W]
+        if level > self.max_level:
+            self.entry, self.max_level = node, level
+
+
+def _freeze(g: _Graph, ids) -> Dict:
+    import numpy as np
+
+    n = len(g.links)
+    levels = np.array([len(l) - 1 for l in g.links], dtype=np.int8)
+    nbr0 = np.full((n, g.M0), -1, dtype=np.int32)
+    up_off = np.full(n, -1, dtype=np.int64)
+    satirlar = []
+    for i, katmanlar in enumerate(g.links):
+        nbr0[i, :len(katmanlar[0])] = katmanlar[0]
+        if len(katmanlar) > 1:
+            up_off[i] = len(satirlar)
+            satirlar.extend(katmanlar[1:])
+    nbr_up = np.full((max(len(satirlar), 1), g.M), -1, dtype=np.int32)
+    for r, komsu in enumerate(satirlar):
+        nbr_up[r, :len(komsu)] = komsu
+    return {"ids": np.asarray(ids, dtype=np.int64), "levels": levels, "nbr0": nbr0,
+            "up_off": up_off, "nbr_up": nbr_up}
+
+
+def _thaw(index: Dict, keep, V, seed: int) -> _Graph:
+    """
+    Disk dizilerinden yalnızca keep=True düğümleri içeren liste grafı kurar.
+    Silinen komşuları kaybeden düğümlerin bağlantıları, kalan komşularının
+    komşuları arasından yeniden seçilerek onarılır.
+    """
+    import numpy as np
+
+    meta = index["meta"]
+    g = _Graph(V, meta["M"], meta["ef_construction"], seed=seed)
+    yeni_no = np.cumsum(keep) - 1
+    nbr0, up_off, nbr_up = np.asarray(index["nbr0"]), index["up_off"], np.asarray(index["nbr_up"])
+
+    eksik = []                              # (düğüm, katman): komşu kaybetti
+    for i in np.flatnonzero(keep).tolist():
+        katmanlar = []
+        for l in range(int(index["levels"][i]) + 1):
+            satir = nbr0[i] if l == 0 else nbr_up[up_off[i] + l - 1]
+            satir = satir[satir >= 0]
+            kalan = yeni_no[satir[keep[satir]]].tolist()
+            if len(kalan) < len(satir):
+                eksik.append((len(g.links), l))
+            katmanlar.append(kalan)
+        g.links.append(katmanlar)
+
+    if not g.links:
+        return g
+    levels = [len(k) - 1 for k in g.links]
+    if keep[meta["entry"]]:
+        g.entry, g.max_level = int(yeni_no[meta["entry"]]), meta["max_level"]
+    else:
+        g.entry = int(np.argmax(levels))
+        g.max_level = levels[g.entry]
+
+    for n, l in eksik:
+        aday = set(g.links[n][l])
+        for m in g.links[n][l]:
+            aday.update(g.links[m][l])
+        aday.discard(n)
+        if not aday:                        # yalnız kaldı → girişten arayarak bağla
+            aday = {m for _, m in g._search_layer(g.V[n], [g.entry], g.ef_construction, 0)
+                    if m != n and len(g.links[m]) > l}
+        if aday:
+            aday = list(aday)
+            s = g._sims(g.V[n], aday).tolist()
+            g.links[n][l] = g._select(sorted(zip(s, aday), reverse=True),
+                                      g.M0 if l == 0 else g.M)
+    return g
+
+
+def _meta(g: _Graph) -> Dict:
+    return {"tur": "hnsw", "M": g.M, "ef_construction": g.ef_construction,
+            "entry": int(g.entry), "max_level": int(g.max_level)}
+
+
+# ── Genel arayüz (ppt_to_vectors.build_ann_index / rank) ────────────────────
+
+def build(vectors, rows, M: int = DEFAULT_M, ef_construction: int = DEFAULT_EF_CONSTRUCTION,
+          seed: int = 0) -> Tuple[Dict, Dict]:
+    """vectors[rows] üzerinde HNSW grafı kurar; (diziler, meta) döndürür."""
+    import numpy as np
+
+    rows = np.asarray(rows, dtype=np.int64)
+    g = _Graph(np.asarray(vectors[rows], dtype=np.float32), M, ef_construction, seed=seed)
+    adim = max(1, len(rows) // 10)
+    for i in range(len(rows)):
+        g.insert(i)
+        if (i + 1) % adim == 0:
+            logger.info(f"  HNSW: {i + 1}/{len(rows)} düğüm")
+    return _freeze(g, rows), _meta(g)
+
+
+def update(index: Dict, vectors, eski_to_yeni, tekil_satirlar, seed: int = 0) -> Tuple[Dict, Dict]:
+    """
+    Artımlı güncelleme: düğümlerin satırlarını eski_to_yeni (eski satır →
+    yeni satır, silinen = -1) ile yeniden numaralar, artık tekil olmayan
+    düğümleri çıkarıp komşuluklarını onarır ve yeni tekil satırları mevcut
+    grafa ekler. Tam yeniden kurulum gerekmez.
+    """
+    import numpy as np
+
+    eski_to_yeni = np.asarray(eski_to_yeni, dtype=np.int64)
+    tekil = np.asarray(tekil_satirlar, dtype=np.int64)
+    ids = eski_to_yeni[np.asarray(index["ids"])]
+    keep = (ids >= 0) & np.isin(ids, tekil)
+    ids = ids[keep]
+
+    eklenecek = np.setdiff1d(tekil, ids)
+    V = np.asarray(vectors[np.concatenate([ids, eklenecek])], dtype=np.float32)
+    g = _thaw(index, keep, V, seed=seed + len(keep))
+    for i in range(len(ids), len(ids) + len(eklenecek)):
+        g.insert(i)
+
+    logger.info(f"HNSW: {int((~keep).sum())} düğüm çıkarıldı, {len(eklenecek)} düğüm eklendi")
+    return _freeze(g, np.concatenate([ids, eklenecek])), _meta(g)
+
+
+def search(index: Dict, vectors, q, k: int, ef_search: int = DEFAULT_EF_SEARCH):
+    """
+    Tek bir normalize sorgu vektörü için en iyi k (satır, skor) çiftini
+    azalan skorla döndürür. ef_search büyüdükçe recall artar, süre uzar.
+    """
+    import numpy as np
+
+    q = np.asarray(q, dtype=np.float32).ravel()
+    meta = index["meta"]
+    ids, nbr0, up_off, nbr_up = index["ids"], index["nbr0"], index["up_off"], index["nbr_up"]
+    if len(ids) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    def sims(nodes):
+        return np.asarray(vectors[ids[nodes]], dtype=np.float32) @ q
+
+    # Üst katmanlar: açgözlü iniş
+    ep = meta["entry"]
+    ep_sim = float(sims(np.array([ep]))[0])
+    for layer in range(meta["max_level"], 0, -1):
+        degisti = True
+        while degisti:
+            degisti = False
+            komsu = nbr_up[up_off[ep] + layer - 1]
+            komsu = komsu[komsu >= 0]
+            if len(komsu):
+                s = sims(komsu)
+                j = int(np.argmax(s))
+                if s[j] > ep_sim:
+                    ep, ep_sim, degisti = int(komsu[j]), float(s[j]), True
+
+    # Katman 0: ef genişliğinde ışın araması
+    ef = max(ef_search, k)
+    gorulen = {ep}
+    aday = [(-ep_sim, ep)]
+    sonuc = [(ep_sim, ep)]
+    while aday:
+        eksi_sim, n = heapq.heappop(aday)
+        if -eksi_sim < sonuc[0][0] and len(sonuc) >= ef:
+            break
+        komsu = [m for m in nbr0[n].tolist() if m >= 0 and m not in gorulen]
+        if not komsu:
+            continue
+        gorulen.update(komsu)
+        for sim, m in zip(sims(np.array(komsu)).tolist(), komsu):
+            if len(sonuc) < ef or sim > sonuc[0][0]:
+                heapq.heappush(aday, (-sim, m))
+                heapq.heappush(sonuc, (sim, m))
+                if len(sonuc) > ef:
+                    heapq.heappop(sonuc)
+
+    en_iyi = sorted(sonuc, reverse=True)[:k]
+    return (np.array([ids[n] for _, n in en_iyi], dtype=np.int64),
+            np.array([s for s, _ in en_iyi], dtype=np.float32))
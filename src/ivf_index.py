@@ -0,0 +1,142 @@
+"""
+IVF (Inverted File) Yaklaşık Arama İndeksi
+==========================================
+Normalize vektörler saf NumPy ile küresel k-means'e göre n_lists kümeye
+ayrılır. Sorguda yalnızca sorguya en yakın nprobe kümenin üyeleri
+puanlanır; tarama maliyeti ≈ N × nprobe / n_lists olur.
+
+Disk biçimi (ann_store): centroids (L, d) float32, offsets (L + 1) int64,
+ids (n,) int64 — küme l'nin satırları ids[offsets[l]:offsets[l + 1]].
+Vektörlerin kendisi kopyalanmaz; puanlama vectors.npy satırlarından yapılır.
+Artımlı güncellemede (update) yeni satırlar mevcut merkezlere atanır.
+"""
+
+import logging
+import math
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NPROBE = 8
+_TRAIN_PER_LIST = 256           # küme başına en fazla eğitim örneği
+_ASSIGN_BLOCK = 65536           # atama matris çarpımının satır bloğu
+
+
+def default_n_lists(n: int) -> int:
+    """Yaygın kural: ≈ 4·√n küme."""
+    return max(1, min(n, int(4 * math.sqrt(n))))
+
+
+def assign(vectors, centroids):
+    """Her vektörü en yüksek iç çarpımlı merkeze atar (bloklu)."""
+    import numpy as np
+
+    out = np.empty(len(vectors), dtype=np.int64)
+    for b in range(0, len(vectors), _ASSIGN_BLOCK):
+        out[b:b + _ASSIGN_BLOCK] = np.argmax(
+            np.asarray(vectors[b:b + _ASSIGN_BLOCK], dtype=np.float32) @ centroids.T, axis=1)
+    return out
+
+
+def kmeans(vectors, k: int, iters: int = 20, seed: int = 0):
+    """
+    Küresel k-means: merkezler her adımda birim uzunluğa normalize edilir,
+    benzerlik iç çarpımdır. Boş kalan kümeler rastgele bir örnekle yeniden
+    başlatılır. (k, d) float32 merkez matrisi döner.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    x = np.asarray(vectors, dtype=np.float32)
+    centroids = x[rng.choice(len(x), size=k, replace=False)].copy()
+    for _ in range(iters):
+        etiket = assign(x, centroids)
+        yeni = np.zeros_like(centroids)
+        np.add.at(yeni, etiket, x)
+        bos = np.bincount(etiket, minlength=k) == 0
+        if bos.any():
+            yeni[bos] = x[rng.choice(len(x), size=int(bos.sum()), replace=False)]
+        yeni /= np.maximum(np.linalg.norm(yeni, axis=1, keepdims=True), 1e-12)
+        if np.allclose(yeni, centroids, atol=1e-6):
+            break
+        centroids = yeni
+    return centroids
+
+
+def build(vectors, rows, n_lists: int = 0, iters: int = 20, seed: int = 0) -> Tuple[Dict, Dict]:
+    """
+    vectors[rows] üzerinde IVF indeksi kurar.
+    (diziler, meta) döndürür; ann_store.write_index ile kaydedilir.
+    """
+    import numpy as np
+
+    rows = np.asarray(rows, dtype=np.int64)
+    n_lists = min(n_lists or default_n_lists(len(rows)), len(rows))
+    x = np.asarray(vectors[rows], dtype=np.float32)
+
+    rng = np.random.default_rng(seed)
+    egitim = x
+    if len(x) > n_lists * _TRAIN_PER_LIST:
+        egitim = x[np.sort(rng.choice(len(x), size=n_lists * _TRAIN_PER_LIST, replace=False))]
+    logger.info(f"IVF: {len(egitim)} örnekle {n_lists} küme eğitiliyor...")
+    centroids = kmeans(egitim, n_lists, iters=iters, seed=seed)
+
+    etiket = assign(x, centroids)
+    sira = np.argsort(etiket, kind="stable")      # küme içinde satır sırası korunur
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(etiket, minlength=n_lists))])
+    boyut = np.diff(offsets)
+    logger.info(f"IVF: küme boyutu ort. {boyut.mean():.1f}, en büyük {boyut.max()}")
+
+    arrays = {"centroids": centroids, "offsets": offsets.astype(np.int64), "ids": rows[sira]}
+    return arrays, {"tur": "ivf", "n_lists": int(n_lists)}
+
+
+def search(index: Dict, vectors, q, k: int, nprobe: int = DEFAULT_NPROBE):
+    """
+    Tek bir normalize sorgu vektörü için en iyi k (satır, skor) çiftini
+    azalan skorla döndürür. nprobe ≥ n_lists ise sonuç tam aramayla aynıdır.
+    """
+    import numpy as np
+
+    q = np.asarray(q, dtype=np.float32).ravel()
+    centroids, offsets, ids = index["centroids"], index["offsets"], index["ids"]
+    nprobe = min(max(nprobe, 1), len(centroids))
+
+    c_skor = centroids @ q
+    probe = np.argpartition(-c_skor, nprobe - 1)[:nprobe]
+    aday = np.concatenate([ids[offsets[l]:offsets[l + 1]] for l in probe])
+    if len(aday) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    aday.sort()                                   # vectors.npy'de ileri yönlü okuma
+    skor = np.asarray(vectors[aday], dtype=np.float32) @ q
+
+    k = min(k, len(aday))
+    en_iyi = np.argpartition(-skor, k - 1)[:k]
+    en_iyi = en_iyi[np.argsort(-skor[en_iyi], kind="stable")]
+    return aday[en_iyi], skor[en_iyi]
+
+
+def update(index: Dict, vectors, eski_to_yeni, tekil_satirlar) -> Tuple[Dict, Dict]:
+    """
+    Artımlı güncelleme: kümeler yeniden eğitilmez. Satırlar eski_to_yeni
+    (eski satır → yeni satır, silinen = -1) ile yeniden numaralanır, artık
+    tekil olmayanlar çıkarılır, yeni tekil satırlar en yakın merkeze atanır.
+    """
+    import numpy as np
+
+    centroids = np.asarray(index["centroids"])
+    offsets = np.asarray(index["offsets"])
+    tekil = np.asarray(tekil_satirlar, dtype=np.int64)
+    ids = np.asarray(eski_to_yeni, dtype=np.int64)[np.asarray(index["ids"])]
+    etiket = np.repeat(np.arange(len(centroids)), np.diff(offsets))
+    keep = (ids >= 0) & np.isin(ids, tekil)
+    ids, etiket = ids[keep], etiket[keep]
+
+    eklenecek = np.setdiff1d(tekil, ids)
+    ids = np.concatenate([ids, eklenecek])
+    etiket = np.concatenate([etiket, assign(vectors[eklenecek], centroids)])
+    sira = np.lexsort((ids, etiket))
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(etiket, minlength=len(centroids)))])
+    logger.info(f"IVF: {int((~keep).sum())} satır çıkarıldı, {len(eklenecek)} satır eklendi")
+    return ({"centroids": centroids, "offsets": offsets.astype(np.int64), "ids": ids[sira]},
+            {"tur": "ivf", "n_lists": int(len(centroids))})
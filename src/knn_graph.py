@@ -0,0 +1,107 @@
+"""
+Parça Komşuluk (kNN) Grafı
+==========================
+Her tekil parçanın en benzer k parçası bir kez hesaplanıp saklanır; arama
+çıktısındaki ve KVKK raporundaki "ilgili slaytlar" bağlantıları sorgu
+başına matris çarpımı gerektirmez.
+
+Hesap, embeddings @ embeddings.T çarpımının (row_block × col_block)
+karolarıyla yapılır; her satır bloğu için yalnızca (satır, 2k) boyutlu
+bir aday tamponu tutulur. N×N matris hiçbir zaman oluşmaz, bellek
+kullanımı row_block × col_block ile sınırlıdır.
+
+Disk biçimi (ann_store, index_knn/):
+  ids        (m,)    int32     tekil vectors.npy satırları (graf satır sırası)
+  neighbors  (m, k)  int32     komşu vectors.npy satırları, skora göre azalan
+  scores     (m, k)  float16   komşu iç çarpımları
+  konum      (n,)    int32     parça satırı → graf satırı (kopyalar ilk kopyanınkini kullanır)
+"""
+
+import logging
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_K = 10
+_ROW_BLOCK = 2048
+_COL_BLOCK = 8192               # karo: 2048 × 8192 float32 = 64 MB
+
+
+def build(vectors, ortak, k: int = DEFAULT_K, row_block: int = _ROW_BLOCK,
+          col_block: int = _COL_BLOCK) -> Tuple[Dict, Dict]:
+    """
+    ortak: (n,) parça satırı → ilk kopyanın satırı. Tekil satırlar arasında
+    her satırın kendisi hariç en yakın k komşusunu bloklu çarpımla bulur.
+    """
+    import numpy as np
+
+    ortak = np.asarray(ortak, dtype=np.int64)
+    rows = np.unique(ortak)
+    m = len(rows)
+    k = max(0, min(k, m - 1))
+    neighbors = np.empty((m, k), dtype=np.int32)
+    scores = np.empty((m, k), dtype=np.float16)
+
+    for rb in range(0, m if k else 0, row_block):
+        a = np.asarray(vectors[rows[rb:rb + row_block]], dtype=np.float32)
+        r = len(a)
+        en_iyi_s = np.full((r, k), -np.inf, dtype=np.float32)
+        en_iyi_i = np.zeros((r, k), dtype=np.int64)
+        for cb in range(0, m, col_block):
+            b = np.asarray(vectors[rows[cb:cb + col_block]], dtype=np.float32)
+            s = a @ b.T
+            # Karo köşegeni kesiyorsa satırın kendisiyle eşleşmesini çıkar
+            ortak_bas, ortak_son = max(rb, cb), min(rb + r, cb + len(b))
+            if ortak_bas < ortak_son:
+                j = np.arange(ortak_bas, ortak_son)
+                s[j - rb, j - cb] = -np.inf
+            if s.shape[1] > k:
+                part = np.argpartition(-s, k - 1, axis=1)[:, :k]
+            else:
+                part = np.broadcast_to(np.arange(s.shape[1]), (r, s.shape[1]))
+            aday_s = np.concatenate([en_iyi_s, np.take_along_axis(s, part, axis=1)], axis=1)
+            aday_i = np.concatenate([en_iyi_i, part + cb], axis=1)
+            sec = np.argpartition(-aday_s, k - 1, axis=1)[:, :k]
+            en_iyi_s = np.take_along_axis(aday_s, sec, axis=1)
+            en_iyi_i = np.take_along_axis(aday_i, sec, axis=1)
+        sira = np.argsort(-en_iyi_s, axis=1, kind="stable")
+        neighbors[rb:rb + r] = rows[np.take_along_axis(en_iyi_i, sira, axis=1)]
+        scores[rb:rb + r] = np.take_along_axis(en_iyi_s, sira, axis=1)
+        logger.debug(f"kNN: {rb + r}/{m} satır")
+
+    konum = np.searchsorted(rows, ortak).astype(np.int32)
+    logger.info(f"kNN grafı: {m} tekil parça × {k} komşu")
+    return ({"ids": rows.astype(np.int32), "neighbors": neighbors, "scores": scores,
+             "konum": konum},
+            {"tur": "knn", "k": int(k)})
+
+
+def neighbors_of(graph: Dict, row: int):
+    """Parça satırının komşuları: (vectors.npy satırları int64, skorlar float32)."""
+    import numpy as np
+
+    g = int(graph["konum"][row])
+    return (np.asarray(graph["neighbors"][g], dtype=np.int64),
+            np.asarray(graph["scores"][g], dtype=np.float32))
+
+
+def related_slides(graph: Dict, chunks: List[Dict], row: int,
+                   n: int = 3) -> List[Tuple[str, int, float]]:
+    """
+    Parçanın komşularından, parçanın kendi slaydı dışındaki ilk n farklı
+    slaydı (dosya, slayt_no, skor) olarak döndürür.
+    """
+    kendi = (chunks[row]["dosya"], chunks[row]["slayt_no"])
+    gorulen = {kendi}
+    sonuc: List[Tuple[str, int, float]] = []
+    komsu, skor = neighbors_of(graph, row)
+    for j, s in zip(komsu.tolist(), skor.tolist()):
+        c = chunks[j]
+        slayt = (c["dosya"], c["slayt_no"])
+        if slayt in gorulen:
+            continue
+        gorulen.add(slayt)
+        sonuc.append((c["dosya"], c["slayt_no"], round(s, 4)))
+        if len(sonuc) >= n:
+            break
+    return sonuc
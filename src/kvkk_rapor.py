@@ -194,17 +194,43 @@ KVKK_DEGISIKLIKLER = [
 # ═══════════════════════════════════════════════════════════════════
 
 def load_metadata() -> Dict:
+    """
+    Metadata'yı yükler. Sütunlu kopya (vectors/columns/) güncelse JSON
+    ayrıştırılmaz; "chunks" metinleri istendikçe çözen bir liste görünümüdür.
+    """
     meta_path = VEKTORLER_DIR / "metadata.json"
     if not meta_path.exists():
         logger.error(f"metadata.json bulunamadı: {meta_path}")
         logger.error("Önce 'CALISTIR.bat' ile vektörleştirme yapın.")
         sys.exit(1)
+    from chunk_columns import open_columns
+    kolonlar = open_columns(VEKTORLER_DIR)
+    if kolonlar is not None:
+        logger.info(f"Metadata yüklendi (sütunlu): {len(kolonlar)} parça")
+        return {**kolonlar.meta, "chunks": kolonlar}
     with open(meta_path, "r", encoding="utf-8") as f:
         data = json.load(f)
     logger.info(f"Metadata yüklendi: {data['toplam_parca']} parça")
     return data
 
 
+def load_related_graph(meta: Dict) -> Optional[Dict]:
+    """
+    ppt_to_vectors --build-index knn ile kurulan "ilgili slaytlar" grafını
+    yükler; graf yoksa ya da vectors.npy ile uyuşmuyorsa None.
+    """
+    import numpy as np
+    from ann_store import META_NAME, index_dir, read_index, vector_fingerprint
+    from vector_dtype import wrap
+
+    graf_dir = index_dir(VEKTORLER_DIR, "knn")
+    vec_path = VEKTORLER_DIR / "vectors.npy"
+    if not (graf_dir / META_NAME).exists() or not vec_path.exists():
+        return None
+    embeddings = wrap(np.load(str(vec_path), mmap_mode="r"), meta)
+    return read_index(graf_dir, vector_fingerprint(embeddings))
+
+
 def load_txt_files() -> Dict[str, str]:
     """Her TXT dosyasını tam metin olarak yükler."""
     txt_files = {}
@@ -238,11 +264,13 @@ _FIKRA_BENT_RE = re.compile(
 )
 
 
-def extract_ppt_change_annotations(txt_dir: Path) -> List[Dict]:
+def extract_ppt_change_annotations(txt_dir: Path, db_path: Optional[Path] = None) -> List[Dict]:
     """
     TXT çıktı dosyalarını satır satır tarar.
     Türk hukuk notasyonu ile işaretlenmiş değişiklik, mülga ve ek içeren
     her satırı tespit eder ve yapılandırılmış bir liste olarak döndürür.
+    db_path mevcut bir parça veritabanıysa (ppt_to_vectors --db) kayıtlar
+    annotations tablosuna da yazılır.
 
     Döndürülen her kayıt:
     {
@@ -318,6 +346,9 @@ def extract_ppt_change_annotations(txt_dir: Path) -> List[Dict]:
                 })
 
     logger.info(f"   → {len(results)} adet PPT değişiklik notasyonu tespit edildi")
+    if db_path is not None and db_path.exists():
+        from chunk_db import write_annotations
+        write_annotations(db_path, results)
     return results
 
 
@@ -327,10 +358,6 @@ def extract_ppt_change_annotations(txt_dir: Path) -> List[Dict]:
 # 4 · MADDE REFERANS ÇIKARICI
 # ═══════════════════════════════════════════════════════════════════
 
-MADDE_PATTERN = re.compile(
-    r"(?:madde|m\.)\s*(\d+)[^\d]",
-    re.IGNORECASE | re.UNICODE
-)
 FIKRA_PATTERN = re.compile(
     r"(?:fıkra|f\.)\s*(\d+)",
     re.IGNORECASE | re.UNICODE
@@ -350,27 +377,26 @@ YENI_HAL_PATTERN = re.compile(
 
 
 def extract_article_mentions(chunks: List[Dict]) -> Dict[int, List[Dict]]:
-    """Her KVKK maddesinin hangi slaytlarda geçtiğini çıkarır."""
+    """Her KVKK maddesinin hangi slaytlarda geçtiğini çıkarır (bkz. article_refs)."""
+    from article_refs import mentioned_articles
+
     madde_map: Dict[int, List[Dict]] = defaultdict(list)
 
-    for chunk in chunks:
+    for idx, chunk in enumerate(chunks):
         metin = chunk["metin"]
-        found_maddeler = set()
-        for m in MADDE_PATTERN.finditer(metin):
-            num = int(m.group(1))
-            if 1 <= num <= 30 and num not in found_maddeler:
-                found_maddeler.add(num)
-                has_change_signal = bool(DEGISIKLIK_PATTERN.search(metin))
-                eski_hal = ESKI_YENI_PATTERN.search(metin)
-                yeni_hal = YENI_HAL_PATTERN.search(metin)
-                madde_map[num].append({
-                    "dosya": chunk["dosya"],
-                    "slayt_no": chunk["slayt_no"],
-                    "metin_ozeti": metin[:250] + ("…" if len(metin) > 250 else ""),
-                    "degisiklik_sinyali": has_change_signal,
-                    "eski_hal_metni": eski_hal.group(0).strip() if eski_hal else None,
-                    "yeni_hal_metni": yeni_hal.group(0).strip() if yeni_hal else None,
-                })
+        for num in mentioned_articles(metin):
+            has_change_signal = bool(DEGISIKLIK_PATTERN.search(metin))
+            eski_hal = ESKI_YENI_PATTERN.search(metin)
+            yeni_hal = YENI_HAL_PATTERN.search(metin)
+            madde_map[num].append({
+                "idx": idx,
+                "dosya": chunk["dosya"],
+                "slayt_no": chunk["slayt_no"],
+                "metin_ozeti": metin[:250] + ("…" if len(metin) > 250 else ""),
+                "degisiklik_sinyali": has_change_signal,
+                "eski_hal_metni": eski_hal.group(0).strip() if eski_hal else None,
+                "yeni_hal_metni": yeni_hal.group(0).strip() if yeni_hal else None,
+            })
 
     return dict(madde_map)
 
@@ -480,12 +506,17 @@ def _render_madde_card(madde_no: int, madde: Dict, refs: List[Dict], stats: Dict
     for ref in refs[:5]:
         dosya_kisa = ref["dosya"].replace(" KVKK Sertifika Programı.pptx", "").replace("- ", "")
         deg_icon = "🔄" if ref["degisiklik_sinyali"] else "📋"
+        ilgili = ""
+        if ref.get("ilgili"):
+            ilgili = "<br><small class=\"text-primary\">↔ İlgili: " + ", ".join(
+                f"{d.replace(' KVKK Sertifika Programı.pptx', '').replace('- ', '')} s.{n}"
+                for d, n, _ in ref["ilgili"]) + "</small>"
         ref_rows += f"""
         <tr class="{'table-warning' if ref['degisiklik_sinyali'] else ''}">
             <td>{deg_icon}</td>
             <td><span class="badge bg-secondary">{dosya_kisa}</span></td>
             <td class="text-center">{ref['slayt_no']}</td>
-            <td><small class="text-muted">{ref['metin_ozeti']}</small></td>
+            <td><small class="text-muted">{ref['metin_ozeti']}</small>{ilgili}</td>
         </tr>"""
     if len(refs) > 5:
         ref_rows += f'<tr><td colspan="4" class="text-center text-muted"><em>… ve {len(refs)-5} slayt daha</em></td></tr>'
@@ -1021,6 +1052,13 @@ def main():
     logger.info("2/6 · KVKK madde referansları çıkarılıyor…")
     madde_map = extract_article_mentions(chunks)
     logger.info(f"   → {len(madde_map)} farklı madde tespit edildi")
+    graf = load_related_graph(meta)
+    if graf is not None:
+        from knn_graph import related_slides
+        for refs in madde_map.values():
+            for ref in refs:
+                ref["ilgili"] = related_slides(graf, chunks, ref["idx"])
+        logger.info("   → İlgili slaytlar kNN grafından eklendi")
 
     # 3) İstatistikler
     logger.info("3/6 · İstatistikler hesaplanıyor…")
@@ -1037,7 +1075,8 @@ def main():
 
     # 5) PPT dosyalarından değişiklik notasyonlarını çıkar
     logger.info("5/6 · PPT dosyalarından değişiklik notasyonları çıkarılıyor…")
-    ppt_annotations = extract_ppt_change_annotations(TXT_DIR)
+    from chunk_db import DB_NAME
+    ppt_annotations = extract_ppt_change_annotations(TXT_DIR, VEKTORLER_DIR / DB_NAME)
     by_tip = {}
     for ann in ppt_annotations:
         by_tip[ann["tip"]] = by_tip.get(ann["tip"], 0) + 1
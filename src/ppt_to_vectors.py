@@ -6,10 +6,38 @@ semantik vektörlere (embeddings) dönüştürür.
 
 Kullanım:
     python ppt_to_vectors.py --all                   # Tam işlem: çıkar + vektörleştir
+    python ppt_to_vectors.py --all --jobs 8          # Çıkarmayı 8 işlemle paralel yap
+    python ppt_to_vectors.py --all --engine xml      # python-pptx yerine doğrudan XML okuyucu
+    python ppt_to_vectors.py --all --full            # Manifesti yok say, her şeyi baştan işle
+    python ppt_to_vectors.py --vectorize --embed-workers 8  # 8 model kopyasıyla CPU'da kodla
     python ppt_to_vectors.py --extract               # Sadece metin çıkar
     python ppt_to_vectors.py --vectorize             # Sadece vektörleştir
     python ppt_to_vectors.py --txt                   # TXT dosyalarına aktar
     python ppt_to_vectors.py --search "KVKK nedir?"  # Semantik arama yap
+    python ppt_to_vectors.py --search "KVKK yaptırımlar" --top-k 10  # İlk 10 sonuç
+    python ppt_to_vectors.py --serve                 # Modeli sıcak tutan arama sunucusu
+    python ppt_to_vectors.py --search-file sorular.txt  # Toplu arama → sorular_sonuclar.jsonl
+    python ppt_to_vectors.py --all --store-dtype int8  # vectors.npy'yi int8 + ölçekle sakla
+    python ppt_to_vectors.py --shard-size 65536      # Parçalı (mmap) depo: bellek derlemden bağımsız
+    python ppt_to_vectors.py --db                    # SQLite + FTS5 parça veritabanı oluştur
+    python ppt_to_vectors.py --db-search "7499/33" --dosya VERBİS  # Modelsiz sözcüksel arama
+    python ppt_to_vectors.py --search "7499/33 açık rıza" --mode hybrid  # BM25 + gömme (RRF)
+    python ppt_to_vectors.py --search "Madde 12" --mode bm25  # Yalnızca BM25, model yüklenmez
+    python ppt_to_vectors.py --search "süre" --dosya VERBİS --slayt-range 10-40 --madde 9
+    python ppt_to_vectors.py --search "açık rıza istisnaları" --rerank 50  # cross-encoder
+    python ppt_to_vectors.py --similar-to "VERBİS.pptx:17"  # Bu slayda benzeyenler, modelsiz
+    python ppt_to_vectors.py --build-index knn       # "İlgili slaytlar" için kNN grafı
+    python ppt_to_vectors.py --build-index ivf       # IVF yaklaşık arama indeksi kur
+    python ppt_to_vectors.py --all --build-index ivf  # Dönüştür + IVF indeksi kur
+    python ppt_to_vectors.py --search "rıza" --index ivf --nprobe 16
+    python ppt_to_vectors.py --build-index hnsw      # HNSW graf indeksi (artımlı güncellenir)
+    python ppt_to_vectors.py --build-index pq --pq-m 32  # Sıkıştırılmış PQ indeksi (32 bayt/parça)
+    python ppt_to_vectors.py --build-index binary    # 48 baytlık işaret özeti ön filtresi
+    python ppt_to_vectors.py --index binary --recall-report  # Tam aramaya göre recall/süre
+    python ppt_to_vectors.py --search "rıza" --index hnsw --ef-search 128
+    python ppt_to_vectors.py --search "rıza" --index route --route-decks 4 --route-slides 32
+    python ppt_to_vectors.py --search "rıza" --index pq --rescore 100
+    python ppt_to_vectors.py --index binary --rescore 300 --recall-report  # recall ölçümü
 """
 
 __version__ = "1.2.0"
@@ -17,12 +45,14 @@ __version__ = "1.2.0"
 import os
 import sys
 import io
+import re
 import json
 import argparse
 import logging
 import time
+from functools import partial
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, List, Dict, Tuple, Optional
 
 # Windows konsolunda UTF-8 karakterleri düzgün yazdır
 if sys.stdout.encoding and sys.stdout.encoding.lower() not in ("utf-8", "utf8"):
@@ -46,10 +76,47 @@ TXT_CIKTILAR_DIR = BASE_DIR / "output" / "txt"        # düz metin çıktıları
 # Türkçe dahil 50+ dil destekleyen hafif ama etkili model
 MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
 
+# Dinamik batch: batch başına (parça sayısı × en uzun parçanın token sayısı) üst sınırı
+EMBED_TOKEN_BUDGET = 8192
+EMBED_MAX_BATCH = 256       # token bütçesinden bağımsız en büyük batch
+
+# Yaklaşık arama indeksleri (--build-index / --index) ve sorgu anı ayarları
+ANN_TYPES = ("ivf", "hnsw", "pq", "binary")
+# Deste/slayt yönlendirmesi save() ile her seferinde yeniden kurulur (artımlı güncellenmez)
+SEARCH_INDEXES = ANN_TYPES + ("route",)
+ANN_KNOBS = {"ivf": ("nprobe",), "hnsw": ("ef_search",), "pq": ("rescore",),
+             "binary": ("rescore",), "route": ("route_decks", "route_slides")}
+
+# Arama modları: gömme, BM25 ters indeksi ya da ikisinin RRF birleşimi
+SEARCH_MODES = ("dense", "bm25", "hybrid")
+RRF_K = 60                  # RRF: skor = Σ 1 / (RRF_K + sıra)
+HYBRID_CANDIDATES = 100     # hibrit modda her listeden alınan aday sayısı
+
+# İki aşamalı arama (--rerank): ilk aşamanın en iyi N adayı yerel önbellekteki
+# çok dilli cross-encoder ile yeniden puanlanır; maliyet derlemden bağımsızdır
+RERANK_MODEL = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+RERANK_CANDIDATES = 50
+
+# Filtreli aramada aday satır sayısı bu sınırın altındaysa yaklaşık indeks
+# yerine adaylar doğrudan (tam) puanlanır; üstündeyse indeks fazladan aday ister
+FILTER_EXACT_MAX = 50_000
+
+# İlgili slaytlar: önceden hesaplanan kNN grafından sonuç başına gösterilen slayt sayısı
+RELATED_SLIDES = 3
+
+# Toplu arama: tek skor bloğundaki en fazla eleman (sorgu × parça, ≈256 MB float32)
+SCORE_BLOCK_ELEMS = 64 * 1024 * 1024
+
+# Yerel gömme önbelleği (output/vectors altında SQLite dosyası)
+EMBED_CACHE_NAME = "embedding_cache.sqlite"
+
 # ── CHUNK AYARLARI ───────────────────────────────────────────────────────────
 CHUNK_MAX_CHARS = 500       # Bir parçanın maksimum karakter uzunluğu
 MIN_CHUNK_CHARS = 20        # Bu uzunluktan kısa parçalar atlanır
 
+# Çıkarma hedefi: (dosya yolu, slayt başına metin satırları) alan çağrılabilir
+SlideSink = Callable[[Path, List[List[str]]], None]
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 1) PPTX METİN ÇIKARMA
@@ -89,22 +156,33 @@ def _shape_texts(shape) -> List[str]:
     return texts
 
 
-def extract_pptx(file_path: Path) -> List[Dict]:
-    """Bir PPTX dosyasından slayt bazında metin çıkarır."""
-    from pptx import Presentation
+# Çıkarma motorları: "pptx" → python-pptx nesne modeli,
+#                    "xml"  → slayt XML'lerini zip'ten doğrudan okuyan akış okuyucu
+ENGINES = ("pptx", "xml")
 
-    try:
-        prs = Presentation(str(file_path))
-    except Exception as exc:
-        logger.error(f"  ✗ Dosya okunamadı: {file_path.name} → {exc}")
-        return []
 
-    slides: List[Dict] = []
-    for slide_idx, slide in enumerate(prs.slides, start=1):
+def _read_slide_texts(file_path: Path, engine: str = "pptx") -> List[List[str]]:
+    """Her slayt için metin satırı listesini (boş slaytlar dahil) döndürür."""
+    if engine == "xml":
+        from pptx_xml import read_slide_texts
+        return read_slide_texts(file_path)
+
+    from pptx import Presentation
+
+    prs = Presentation(str(file_path))
+    result: List[List[str]] = []
+    for slide in prs.slides:
         all_texts: List[str] = []
         for shape in slide.shapes:
             all_texts.extend(_shape_texts(shape))
+        result.append(all_texts)
+    return result
 
+
+def _slide_records(file_path: Path, slide_texts: List[List[str]]) -> List[Dict]:
+    """Slayt metin satırlarından {"dosya","slayt_no","metin"} kayıtları üretir."""
+    slides: List[Dict] = []
+    for slide_idx, all_texts in enumerate(slide_texts, start=1):
         full_text = "\n".join(all_texts)
         if full_text.strip():
             slides.append({
@@ -115,23 +193,103 @@ def extract_pptx(file_path: Path) -> List[Dict]:
     return slides
 
 
-def extract_all(kaynak_dir: Path) -> List[Dict]:
-    """Klasördeki tüm PPTX dosyalarından metin çıkarır."""
-    pptx_files = sorted(kaynak_dir.glob("*.pptx"))
+def _read_timed(file_path: Path, engine: str = "pptx") -> Tuple[Optional[List[List[str]]], float]:
+    """
+    Desteyi okur ve dosya başına duvar saati süresini döndürür.
+    Dosya okunamazsa metin listesi yerine None döner.
+    """
+    t0 = time.perf_counter()
+    try:
+        slide_texts: Optional[List[List[str]]] = _read_slide_texts(file_path, engine)
+    except Exception as exc:
+        logger.error(f"  ✗ Dosya okunamadı: {file_path.name} → {exc}")
+        slide_texts = None
+    return slide_texts, time.perf_counter() - t0
+
+
+def extract_pptx(file_path: Path, engine: str = "pptx") -> List[Dict]:
+    """Bir PPTX dosyasından slayt bazında metin çıkarır."""
+    slide_texts, _ = _read_timed(file_path, engine)
+    return _slide_records(file_path, slide_texts or [])
+
+
+# ── ÇIKTI HEDEFLERİ (Sink) ──────────────────────────────────────────────────
+# Her deste tek kez okunur; okunan slayt metinleri sırayla tüm hedeflere
+# dağıtılır. Hedef: sink(dosya_yolu, slayt_metinleri) imzalı bir çağrılabilir.
+
+def record_sink(hedef: List[Dict]) -> SlideSink:
+    """Slayt kayıtlarını verilen listeye ekleyen hedef (parça listesinin kaynağı)."""
+    def _sink(file_path: Path, slide_texts: List[List[str]]):
+        hedef.extend(_slide_records(file_path, slide_texts))
+    return _sink
+
+
+def txt_sink(txt_dir: Path) -> SlideSink:
+    """Her desteyi txt_dir altına ayrı bir .txt dosyası olarak yazan hedef."""
+    txt_dir.mkdir(parents=True, exist_ok=True)
+
+    def _sink(file_path: Path, slide_texts: List[List[str]]):
+        txt_path = _write_txt(file_path, slide_texts, txt_dir)
+        logger.info(f"    → {txt_path.name} ({len(slide_texts)} slayt)")
+    return _sink
+
+
+def extract_all(kaynak_dir: Path, jobs: int = 1, engine: str = "pptx",
+                files: Optional[List[Path]] = None,
+                sinks: Optional[List[SlideSink]] = None) -> List[Dict]:
+    """
+    Klasördeki tüm PPTX dosyalarından metin çıkarır.
+    jobs > 1 ise dosyalar bir işlem havuzunda paralel okunur; çıktı sırası
+    her durumda (dosya, slayt_no) sırasına göre deterministiktir.
+    engine: "pptx" (python-pptx) veya "xml" (doğrudan XML akış okuyucu).
+    files verilirse klasör taranmaz, yalnızca bu dosyalar işlenir.
+    sinks: her deste için (okunduğu sırayla) ayrıca çağrılacak hedefler,
+    ör. txt_sink(...) – böylece --all --txt her desteyi bir kez okur.
+    """
+    pptx_files = sorted(files) if files is not None else sorted(kaynak_dir.glob("*.pptx"))
     if not pptx_files:
         logger.warning(f"PPTX dosyası bulunamadı: {kaynak_dir}")
         return []
 
-    logger.info(f"{len(pptx_files)} PPTX dosyası bulundu.")
+    jobs = max(1, min(jobs, len(pptx_files)))
+    logger.info(f"{len(pptx_files)} PPTX dosyası bulundu."
+                + (f" ({jobs} paralel işlem)" if jobs > 1 else ""))
     all_slides: List[Dict] = []
-
-    for f in pptx_files:
-        logger.info(f"  → {f.name}")
-        slides = extract_pptx(f)
-        all_slides.extend(slides)
-        logger.info(f"    {len(slides)} slayt çıkarıldı")
-
-    logger.info(f"Toplam {len(all_slides)} slayt metni elde edildi.")
+    hedefler = [record_sink(all_slides)] + list(sinks or [])
+    sureler: List[Tuple[float, str]] = []
+
+    def _collect(results):
+        # executor.map girdi sırasını korur → sonuçlar dosya sırasıyla gelir
+        for f, (slide_texts, elapsed) in zip(pptx_files, results):
+            sureler.append((elapsed, f.name))
+            if slide_texts is None:
+                continue
+            n_once = len(all_slides)
+            hedefler[0](f, slide_texts)
+            logger.info(f"  → {f.name}: {len(all_slides) - n_once} slayt çıkarıldı "
+                        f"({elapsed:.2f}s)")
+            for sink in hedefler[1:]:
+                sink(f, slide_texts)
+
+    read = partial(_read_timed, engine=engine)
+    t0 = time.perf_counter()
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            _collect(executor.map(read, pptx_files))
+    else:
+        _collect(map(read, pptx_files))
+
+    all_slides.sort(key=lambda s: (s["dosya"], s["slayt_no"]))
+    logger.info(f"Toplam {len(all_slides)} slayt metni elde edildi "
+                f"({time.perf_counter() - t0:.1f}s).")
+
+    # En yavaş dosyalar – büyük gece çalıştırmalarında darboğazı göstermek için
+    if len(sureler) > 1:
+        en_yavas = sorted(sureler, reverse=True)[:5]
+        logger.info("En yavaş dosyalar: "
+                    + ", ".join(f"{name} ({sec:.2f}s)" for sec, name in en_yavas))
     return all_slides
 
 
@@ -201,56 +359,471 @@ def create_chunks(slides: List[Dict]) -> List[Dict]:
     return chunks
 
 
+# ── TEKRAR EDEN PARÇALAR (Dedup) ────────────────────────────────────────────
+# Aynı yasal paragraflar (ör. Madde 6 metni) onlarca destede tekrar eder.
+# Normalize metni aynı olan parçalar bir kez kodlanır; her kopya aynı vektörü
+# paylaşır ve metadata'daki "ortak_vektor" alanı (ilk kopyanın id'si) ile
+# aramada tüm konumlar birlikte raporlanır.
+
+def _dedup_key(metin: str) -> str:
+    """Tekrar tespiti için metni normalize eder (NFC + boşluk sadeleştirme)."""
+    import unicodedata
+    return " ".join(unicodedata.normalize("NFC", metin).split())
+
+
+def dedup_index(texts: List[str]) -> Tuple[List[int], List[int]]:
+    """
+    Tekil metinlerin ilk geçtiği konumları ve her metnin tekil listedeki
+    sırasını döndürür: texts[i] ≡ texts[uniq_idx[inverse[i]]].
+    """
+    first: Dict[str, int] = {}
+    uniq_idx: List[int] = []
+    inverse: List[int] = []
+    for i, text in enumerate(texts):
+        key = _dedup_key(text)
+        j = first.get(key)
+        if j is None:
+            j = first[key] = len(uniq_idx)
+            uniq_idx.append(i)
+        inverse.append(j)
+    return uniq_idx, inverse
+
+
+def mark_duplicates(chunks: List[Dict]) -> int:
+    """Her parçaya "ortak_vektor" (aynı metnin ilk parçasının id'si) yazar; tekil sayısını döndürür."""
+    uniq_idx, inverse = dedup_index([c["metin"] for c in chunks])
+    for c, j in zip(chunks, inverse):
+        c["ortak_vektor"] = chunks[uniq_idx[j]]["id"]
+    return len(uniq_idx)
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # 3) VEKTÖRLEŞTİRME  (Embedding)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def vectorize(chunks: List[Dict], model_name: str = MODEL_NAME):
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def _token_lengths(texts: List[str], tokenizer=None, max_len: Optional[int] = None) -> List[int]:
     """
-    Chunk metinlerini semantik vektörlere dönüştürür.
-    numpy ndarray (N, dim) döner.
+    Metinlerin token uzunlukları. Modelin tokenizer'ı verilmişse o kullanılır,
+    yoksa kelime/noktalama sayısından tahmin edilir (+2: [CLS]/[SEP]).
     """
-    import numpy as np
+    if tokenizer is not None:
+        ids = tokenizer(texts, add_special_tokens=True, truncation=max_len is not None,
+                        max_length=max_len)["input_ids"]
+        lengths = [len(x) for x in ids]
+    else:
+        lengths = [len(_TOKEN_RE.findall(t)) + 2 for t in texts]
+    if max_len:
+        lengths = [min(n, max_len) for n in lengths]
+    return lengths
+
+
+def plan_batches(lengths: List[int], token_budget: int = EMBED_TOKEN_BUDGET,
+                 max_batch: int = EMBED_MAX_BATCH) -> List[List[int]]:
+    """
+    Parçaları token uzunluğuna göre (uzundan kısaya) sıralar ve her batch'in
+    dolgu dahil maliyeti (parça sayısı × en uzun parça) token_budget'ı
+    aşmayacak şekilde gruplar. Sabit sayılı batch'lerde kısa bir başlığın
+    uzun bir paragrafın boyuna doldurulması böylece önlenir.
+    Dönen liste, orijinal sıradaki indekslerden oluşan batch'lerdir.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: (-lengths[i], i))
+    batches: List[List[int]] = []
+    cur: List[int] = []
+    cur_max = 0
+    for i in order:
+        new_max = max(cur_max, lengths[i])
+        if cur and (new_max * (len(cur) + 1) > token_budget or len(cur) >= max_batch):
+            batches.append(cur)
+            cur, new_max = [], lengths[i]
+        cur.append(i)
+        cur_max = new_max
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+# ── ÇOK İŞLEMLİ KODLAMA HAVUZU ──────────────────────────────────────────────
+# Her işçi kendi SentenceTransformer kopyasını yükler; torch iş parçacığı
+# sayısı (çekirdek / işçi) ile sınırlanır ki havuz CPU'yu aşırı yüklemesin.
+
+_WORKER_MODEL = None
+
+
+def _init_embed_worker(model_name: str, threads: int):
+    """Havuz işçisi başlatıcısı: iş parçacığı sınırını koyar ve modeli yükler."""
+    global _WORKER_MODEL
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+
+    import torch
     from sentence_transformers import SentenceTransformer
 
-    logger.info(f"Model yükleniyor: {model_name}")
-    t0 = time.time()
-    model = SentenceTransformer(model_name)
-    logger.info(f"Model hazır ({time.time() - t0:.1f}s)")
+    torch.set_num_threads(threads)
+    _WORKER_MODEL = SentenceTransformer(model_name, device="cpu")
 
-    texts = [c["metin"] for c in chunks]
-    logger.info(f"{len(texts)} parça vektörleştirilecek...")
 
-    embeddings = model.encode(
+def _encode_in_worker(texts: List[str]):
+    return _WORKER_MODEL.encode(
         texts,
-        show_progress_bar=True,
-        batch_size=32,
-        normalize_embeddings=True,   # cosine similarity için normalize
+        batch_size=len(texts),
+        show_progress_bar=False,
+        normalize_embeddings=True,
     )
 
-    logger.info(f"Vektör matrisi: {embeddings.shape}  (parça × boyut)")
-    return embeddings
+
+def _iter_batch_embeddings(model, texts: List[str], batches: List[List[int]],
+                           workers: int = 1, model_name: str = MODEL_NAME):
+    """(batch, vektörler) çiftlerini batch sırasıyla üretir; workers > 1 ise işlem havuzuyla."""
+    if workers <= 1:
+        for batch in batches:
+            yield batch, model.encode(
+                [texts[i] for i in batch],
+                batch_size=len(batch),
+                show_progress_bar=False,
+                normalize_embeddings=True,   # cosine similarity için normalize
+            )
+        return
+
+    with _embed_pool(workers, model_name) as executor:
+        # map sırayı korur; batch'ler boşalan işçiye dağıtılır
+        results = executor.map(_encode_in_worker, ([texts[i] for i in b] for b in batches))
+        yield from zip(batches, results)
+
+
+def _embed_pool(workers: int, model_name: str):
+    """Her işçisi kendi model kopyasını yükleyen spawn tabanlı işlem havuzu."""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    logger.info(f"Kodlama havuzu: {workers} işçi × {threads} iş parçacığı")
+    # torch ile fork güvenli değil → spawn
+    return ProcessPoolExecutor(max_workers=workers,
+                               mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_embed_worker,
+                               initargs=(model_name, threads))
+
+
+def _encode_misses(lookups, texts: List[str], workers: int = 1,
+                   model_name: str = MODEL_NAME):
+    """
+    (batch, önbellekten gelenler, ıskalar) üçlülerini sırayla tüketip
+    (batch, gelenler, ıskalar, ıska vektörleri) üretir. Model ya da işlem
+    havuzu ancak ilk ıskada açılır; havuzda en fazla 2 × workers batch
+    ileride bekler, böylece bellekte tutulan önbellek vektörleri sınırlı kalır.
+    """
+    from collections import deque
+
+    if workers <= 1:
+        model = None
+        for batch, found, miss in lookups:
+            emb = None
+            if miss:
+                if model is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    logger.info(f"Model yükleniyor: {model_name}")
+                    t0 = time.time()
+                    model = SentenceTransformer(model_name)
+                    logger.info(f"Model hazır ({time.time() - t0:.1f}s)")
+                _, emb = next(_iter_batch_embeddings(model, texts, [miss]))
+            yield batch, found, miss, emb
+        return
+
+    executor = None
+    bekleyen = deque()
+    try:
+        for batch, found, miss in lookups:
+            sonuc = None
+            if miss:
+                if executor is None:
+                    executor = _embed_pool(workers, model_name)
+                sonuc = executor.submit(_encode_in_worker, [texts[i] for i in miss])
+            bekleyen.append((batch, found, miss, sonuc))
+            if len(bekleyen) > 2 * workers:
+                batch, found, miss, sonuc = bekleyen.popleft()
+                yield batch, found, miss, sonuc and sonuc.result()
+        while bekleyen:
+            batch, found, miss, sonuc = bekleyen.popleft()
+            yield batch, found, miss, sonuc and sonuc.result()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def encode_batched(model, texts: List[str], token_budget: int = EMBED_TOKEN_BUDGET,
+                   workers: int = 1, model_name: str = MODEL_NAME):
+    """
+    Metinleri plan_batches ile oluşturulan uzunluk gruplarında kodlar ve
+    sonucu orijinal sıraya geri yerleştirir. (N, dim) float32 döner.
+    workers > 1 ise model bu işlemde yüklenmez (model=None olabilir);
+    batch'ler model kopyalarından oluşan bir işlem havuzunda kodlanır.
+    """
+    import numpy as np
+
+    lengths = _token_lengths(texts, getattr(model, "tokenizer", None),
+                             getattr(model, "max_seq_length", None))
+    batches = plan_batches(lengths, token_budget)
+    logger.info(f"{len(texts)} metin → {len(batches)} batch (token bütçesi {token_budget})")
+
+    out = None
+    t0 = time.time()
+    adim = max(1, len(batches) // 10)
+    for b, (batch, emb) in enumerate(
+            _iter_batch_embeddings(model, texts, batches, workers, model_name), start=1):
+        if out is None:
+            out = np.empty((len(texts), emb.shape[1]), dtype=np.float32)
+        out[batch] = emb
+        if b % adim == 0 or b == len(batches):
+            logger.info(f"  {b}/{len(batches)} batch")
+    logger.info(f"Kodlama hızı: {len(texts) / max(time.time() - t0, 1e-9):.1f} parça/sn")
+    return out
+
+
+# ── AKIŞLI YAZIM + KALDIĞI YERDEN DEVAM ─────────────────────────────────────
+# stream_path verildiğinde vektörler batch batch önceden ayrılmış, bellek
+# eşlemeli bir .npy dosyasına (<ad>.partial.npy) yazılır; her batch sonrası
+# <ad>.checkpoint.json tamamlanan batch sayısını kaydeder. Yarıda kesilen bir
+# çalıştırma aynı parça listesiyle yeniden başlatılınca kaldığı batch'ten devam
+# eder; bitince partial dosya hedef adına taşınır.
+
+def _stream_paths(stream_path: Path) -> Tuple[Path, Path]:
+    stem = stream_path.name[:-len(".npy")] if stream_path.name.endswith(".npy") else stream_path.name
+    return (stream_path.with_name(stem + ".partial.npy"),
+            stream_path.with_name(stem + ".checkpoint.json"))
+
+
+def _plan_id(model_name: str, texts: List[str], batches: List[List[int]],
+             inverse: List[int]) -> str:
+    """
+    Batch planının kimliği: model, tekil metinler, batch dizilimi ve satır →
+    tekil metin eşlemi (kopyaların yeri değişirse atlanan batch'lerin
+    satırları boş kalmasın diye).
+    """
+    import hashlib
+
+    import numpy as np
+
+    h = hashlib.sha256(model_name.encode("utf-8"))
+    for t in texts:
+        h.update(t.encode("utf-8") + b"\0")
+    h.update(json.dumps(batches, separators=(",", ":")).encode("ascii"))
+    h.update(np.asarray(inverse, dtype=np.int64).tobytes())
+    return h.hexdigest()
+
+
+def _write_checkpoint(ckpt_path: Path, state: Dict):
+    """Checkpoint'i atomik olarak yazar (yarım yazılmış dosya kalmaz)."""
+    tmp = ckpt_path.with_name(ckpt_path.name + ".tmp")
+    with open(str(tmp), "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(str(tmp), str(ckpt_path))
+
+
+def _resume_point(partial: Path, ckpt_path: Path, plan_id: str, n_rows: int) -> int:
+    """Geçerli bir checkpoint varsa tamamlanan batch sayısını, yoksa 0 döndürür."""
+    if not partial.exists() or not ckpt_path.exists():
+        return 0
+    try:
+        with open(str(ckpt_path), "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    if state.get("plan") != plan_id or state.get("satir") != n_rows:
+        logger.info("Checkpoint farklı bir parça listesine ait, baştan başlanıyor.")
+        return 0
+    return int(state.get("tamamlanan_batch", 0))
+
+
+def vectorize(chunks: List[Dict], model_name: str = MODEL_NAME,
+              cache_path: Optional[Path] = None, cache_max: int = 0,
+              token_budget: int = EMBED_TOKEN_BUDGET, workers: int = 1,
+              stream_path: Optional[Path] = None):
+    """
+    Chunk metinlerini semantik vektörlere dönüştürür.
+    numpy ndarray (N, dim) döner.
+
+    Normalize metni aynı olan parçalar tek kez kodlanır ve vektörleri tüm
+    kopyalara dağıtılır (bkz. dedup_index).
+
+    cache_path verilirse (model, sha256(metin)) anahtarlı disk önbelleği
+    kullanılır; yalnızca önbellekte olmayan metinler modele gönderilir.
+    Kodlama, token bütçeli uzunluk gruplarıyla yapılır (bkz. plan_batches);
+    workers > 1 ise gruplar çok işlemli model havuzuna dağıtılır.
+
+    stream_path verilirse vektörler batch batch bu .npy dosyasına akıtılır,
+    yarıda kalan çalıştırma checkpoint'ten devam eder ve dönüş değeri
+    dosyanın salt okunur bellek eşlemesidir (np.memmap).
+    """
+    import numpy as np
+
+    uniq_idx, inverse = dedup_index([c["metin"] for c in chunks])
+    texts = [chunks[i]["metin"] for i in uniq_idx]
+    logger.info(f"{len(chunks)} parça → {len(texts)} tekil metin vektörleştirilecek...")
+
+    # Tekil metin j'nin kopyalarının satırları: kopya_sirasi[bas[j]:bas[j + 1]]
+    inverse_arr = np.asarray(inverse, dtype=np.int64)
+    kopya_sirasi = np.argsort(inverse_arr, kind="stable")
+    kopya_sayisi = np.bincount(inverse_arr, minlength=len(texts))
+    bas = np.concatenate([[0], np.cumsum(kopya_sayisi)])
+
+    # Plan, önbellek/model durumundan bağımsız olsun diye tahmini uzunluklarla
+    # kurulur → yeniden başlatılan çalıştırma aynı planı üretir
+    batches = plan_batches(_token_lengths(texts), token_budget)
+    logger.info(f"{len(texts)} metin → {len(batches)} batch (token bütçesi {token_budget})")
+
+    target = None
+    start = 0
+    partial = ckpt_path = None
+    plan_id = ""
+    if stream_path is not None:
+        stream_path.parent.mkdir(parents=True, exist_ok=True)
+        partial, ckpt_path = _stream_paths(stream_path)
+        plan_id = _plan_id(model_name, texts, batches, inverse)
+        start = _resume_point(partial, ckpt_path, plan_id, len(chunks))
+        if start:
+            target = np.lib.format.open_memmap(str(partial), mode="r+")
+            logger.info(f"Checkpoint bulundu: {start}/{len(batches)} batch tamamlanmış, devam ediliyor.")
+
+    kalan = batches[start:]
+
+    cache = None
+    keys: List[str] = []
+    if cache_path is not None:
+        from embedding_cache import DEFAULT_MAX_ENTRIES, EmbeddingCache, text_key
+
+        cache = EmbeddingCache(cache_path, max_entries=cache_max or DEFAULT_MAX_ENTRIES)
+        keys = [text_key(t) for t in texts]
+
+    def _lookup(batch):
+        # Önbellek batch batch okunur: bellekte yalnızca işlenen batch'lerin vektörleri durur
+        found = cache.get_many(model_name, (keys[j] for j in batch)) if cache is not None else {}
+        return batch, found, ([j for j in batch if keys[j] not in found] if found else batch)
+
+    encoded = _encode_misses((_lookup(batch) for batch in kalan), texts, workers, model_name)
+
+    t0 = time.time()
+    adim = max(1, len(kalan) // 10)
+    for b, (batch, found, miss, emb) in enumerate(encoded, start=start + 1):
+        if miss and cache is not None:
+            cache.put_many(model_name, [keys[j] for j in miss], emb)
+
+        dim = emb.shape[1] if emb is not None else next(iter(found.values())).shape[0]
+        vecs = np.empty((len(batch), dim), dtype=np.float32)
+        for k, j in enumerate(batch):
+            if found and keys[j] in found:
+                vecs[k] = found[keys[j]]
+        if emb is not None:
+            pos = {j: k for k, j in enumerate(batch)}
+            vecs[[pos[j] for j in miss]] = emb
+
+        if target is None:
+            if partial is not None:
+                target = np.lib.format.open_memmap(str(partial), mode="w+",
+                                                   dtype=np.float32, shape=(len(chunks), dim))
+            else:
+                target = np.empty((len(chunks), dim), dtype=np.float32)
+
+        # Tekil vektörleri tüm kopyalara dağıt → satır i == parça i
+        rows = np.concatenate([kopya_sirasi[bas[j]:bas[j + 1]] for j in batch])
+        target[rows] = np.repeat(vecs, kopya_sayisi[batch], axis=0)
+
+        if ckpt_path is not None:
+            target.flush()
+            _write_checkpoint(ckpt_path, {"plan": plan_id, "satir": len(chunks),
+                                          "tamamlanan_batch": b, "toplam_batch": len(batches)})
+        if (b - start) % adim == 0 or b == len(batches):
+            logger.info(f"  {b}/{len(batches)} batch")
+
+    if kalan:
+        logger.info(f"Kodlama hızı: {sum(len(x) for x in kalan) / max(time.time() - t0, 1e-9):.1f} "
+                    f"tekil metin/sn")
+    if cache is not None:
+        logger.info(f"Gömme önbelleği: {cache.hits} isabet, {cache.misses} ıska "
+                    f"({len(cache)} kayıt)")
+        cache.close()
+
+    if target is None:
+        target = np.empty((len(chunks), 0), dtype=np.float32)
+    elif partial is not None:
+        # Tamamlandı → partial dosyayı hedefe taşı, checkpoint'i sil
+        target.flush()
+        del target
+        os.replace(str(partial), str(stream_path))
+        ckpt_path.unlink(missing_ok=True)
+        target = np.load(str(stream_path), mmap_mode="r")
+        logger.info(f"Vektörler akışla yazıldı → {stream_path}")
+
+    logger.info(f"Vektör matrisi: {target.shape}  (parça × boyut)")
+    return target
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 4) KAYDETME
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def save(embeddings, chunks: List[Dict], out_dir: Path):
-    """Vektörleri (.npy) ve metadata'yı (.json) diske kaydeder."""
+def write_extracted(chunks: List[Dict], out_dir: Path):
+    """Ara çıktı: extracted_chunks.json (sonraki --vectorize için)."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    ext_path = out_dir / "extracted_chunks.json"
+    with open(str(ext_path), "w", encoding="utf-8") as f:
+        json.dump(chunks, f, ensure_ascii=False, indent=2)
+    logger.info(f"Çıkarılan metinler → {ext_path}")
+
+
+def _is_backed_by(embeddings, path: Path) -> bool:
+    """embeddings, path dosyasının bellek eşlemesi mi?"""
+    filename = getattr(embeddings, "filename", None)
+    return bool(filename) and path.exists() and Path(filename).resolve() == path.resolve()
+
+
+def save(embeddings, chunks: List[Dict], out_dir: Path, dtype: str = "float32",
+         shard_rows: Optional[int] = None, db: Optional[bool] = None):
+    """
+    Vektörleri (.npy) ve metadata'yı (.json) diske kaydeder.
+    dtype "float16" veya "int8" ise vektörler dar tiple saklanır; tip ve
+    int8 ölçekleri metadata.json'a yazılır (bkz. vector_dtype).
+    shard_rows > 0 ise vectors.npy'yi satır aralıklarına bölen parçalı depo
+    manifesti yazılır (veri kopyalanmaz), 0 ise silinir; None ise mevcut
+    parçalı depo aynı parça boyuyla güncel tutulur (bkz. vector_store).
+    Parçalar ayrıca sütunlu biçimde (columns/) yazılır; metadata.json aynı
+    içeriğin dışa aktarımı olarak kalır (bkz. chunk_columns). db True ise ya da
+    None iken veritabanı zaten varsa SQLite/FTS5 parça tabloları yazılır (bkz. chunk_db).
+    """
     import numpy as np
+    from ann_store import vector_fingerprint
+    from chunk_columns import write_columns
+    from chunk_db import DB_NAME, write_chunks
+    from vector_dtype import quantize, wrap
+    from vector_store import has_shards, read_manifest, remove_shards, write_shards
 
     out_dir.mkdir(parents=True, exist_ok=True)
+    if not isinstance(chunks, list):
+        chunks = list(chunks)           # ChunkColumns görünümü: columns/ üzerine yazılacak
 
-    # Vektörler
+    # Vektörler (vectorize akışla zaten bu dosyaya yazdıysa tekrar yazılmaz)
     vec_path = out_dir / "vectors.npy"
-    np.save(str(vec_path), embeddings)
-    logger.info(f"Vektörler → {vec_path}")
-
-    # Metadata + chunk'lar
+    if dtype == "float32" and _is_backed_by(embeddings, vec_path):
+        saklanan, tip_meta = embeddings, {"vektor_tipi": "float32"}
+        logger.info(f"Vektörler → {vec_path} (akışla yazıldı)")
+    else:
+        saklanan, tip_meta = quantize(embeddings, dtype)
+        np.save(str(vec_path), saklanan)
+        logger.info(f"Vektörler → {vec_path} ({dtype}, {saklanan.nbytes / 1e6:.1f} MB)")
+        # İndeksler dosyadan okusun: parmak izi bir kez hesaplanıp önbelleğe alınır
+        saklanan = np.load(str(vec_path), mmap_mode="r")
+
+    # Metadata + chunk'lar (kopya parçalar ortak vektörü gösterir)
+    tekil = mark_duplicates(chunks)
+    if tekil < len(chunks):
+        logger.info(f"{len(chunks) - tekil} parça başka bir parçanın birebir kopyası")
     meta = {
         "model": MODEL_NAME,
         "vektor_boyutu": int(embeddings.shape[1]),
+        **tip_meta,
         "toplam_parca": len(chunks),
         "chunks": chunks,
     }
@@ -258,11 +831,57 @@ def save(embeddings, chunks: List[Dict], out_dir: Path):
     with open(str(meta_path), "w", encoding="utf-8") as f:
         json.dump(meta, f, ensure_ascii=False, indent=2)
     logger.info(f"Metadata → {meta_path}")
+    write_columns(chunks, out_dir, {k: v for k, v in meta.items() if k != "chunks"},
+                  vector_fingerprint(saklanan))
+    if db or (db is None and (out_dir / DB_NAME).exists()):
+        write_chunks(out_dir / DB_NAME, chunks)
+    build_bm25_index(out_dir, wrap(saklanan, tip_meta), chunks)
+    build_filter_index(out_dir, wrap(saklanan, tip_meta), chunks)
+    build_route_index(out_dir, wrap(saklanan, tip_meta), chunks)
+
+    if shard_rows is None and has_shards(out_dir):
+        shard_rows = read_manifest(out_dir)["parca_boyu"]
+    if shard_rows:
+        write_shards(saklanan, chunks, out_dir, tip_meta, shard_rows)
+    elif shard_rows == 0:
+        remove_shards(out_dir)
 
     # İnsan tarafından okunabilir özet
     _write_summary(embeddings, chunks, out_dir)
 
 
+def build_shards(out_dir: Path, shard_rows: int):
+    """
+    Mevcut vectors.npy için parçalı depo manifestini (yeniden) yazar; 0 ise
+    siler. Sütunlu metadata yoksa ya da bayatsa önce o yazılır.
+    """
+    from ann_store import vector_fingerprint
+    from chunk_columns import write_columns
+    from vector_store import remove_shards, write_shards
+
+    if not shard_rows:
+        remove_shards(out_dir)
+        return
+    embeddings, chunks = load_index(out_dir, mmap=True)
+    saklanan = getattr(embeddings, "raw", embeddings)
+    meta = getattr(chunks, "meta", None)
+    if meta is None:
+        meta_path = out_dir / "metadata.json"
+        with open(str(meta_path), "r", encoding="utf-8") as f:
+            meta = {k: v for k, v in json.load(f).items() if k != "chunks"}
+        write_columns(chunks, out_dir, meta, vector_fingerprint(saklanan))
+    tip_meta = {k: v for k, v in meta.items() if k in ("vektor_tipi", "olcek")}
+    write_shards(saklanan, chunks, out_dir, tip_meta or {"vektor_tipi": "float32"}, shard_rows)
+
+
+def build_db(out_dir: Path):
+    """Mevcut parçalardan SQLite/FTS5 veritabanını (yeniden) yazar."""
+    from chunk_db import DB_NAME, write_chunks
+
+    _, chunks = load_index(out_dir, mmap=True)
+    write_chunks(out_dir / DB_NAME, chunks)
+
+
 def _write_summary(embeddings, chunks: List[Dict], out_dir: Path):
     """Özet rapor dosyası oluşturur."""
     dosyalar = sorted(set(c["dosya"] for c in chunks))
@@ -284,6 +903,7 @@ def _write_summary(embeddings, chunks: List[Dict], out_dir: Path):
         f.write("Çıktı dosyaları:\n")
         f.write("  vectors.npy   – numpy vektör matrisi\n")
         f.write("  metadata.json – metin parçaları ve metadata\n")
+        f.write("  columns/      – aynı metadata, sütunlu ve bellek eşlemeli\n")
         f.write("  ozet_rapor.txt – bu rapor\n")
 
     logger.info(f"Özet rapor → {summary_path}")
@@ -293,10 +913,53 @@ def _write_summary(embeddings, chunks: List[Dict], out_dir: Path):
 # 5) SEMANTİK ARAMA
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def search(query: str, out_dir: Path, top_k: int = 5, model_name: str = MODEL_NAME):
-    """Vektör deposunda cosine similarity ile semantik arama yapar."""
+def _duplicate_groups(chunks: List[Dict]) -> Dict[int, List[int]]:
+    """ortak_vektor → o vektörü paylaşan parça satırları."""
+    if hasattr(chunks, "duplicate_groups"):     # sütunlu metadata: metinler çözülmez
+        return chunks.duplicate_groups()
+    gruplar: Dict[int, List[int]] = {}
+    for i, c in enumerate(chunks):
+        gruplar.setdefault(c.get("ortak_vektor", c["id"]), []).append(i)
+    return gruplar
+
+
+def _group_hits(order, scores, chunks: List[Dict], top_k: int) -> List[Dict]:
+    """
+    Skora göre sıralı satırlardan ilk top_k sonucu seçer. Ortak vektörü
+    paylaşan kopyalar tek sonuçta toplanır; "konumlar" tüm (dosya, slayt_no)
+    çiftlerini içerir.
+    """
+    gruplar = _duplicate_groups(chunks)
+
+    hits: List[Dict] = []
+    gorulen = set()
+    for idx in order:
+        idx = int(idx)
+        grup = chunks[idx].get("ortak_vektor", chunks[idx]["id"])
+        if grup in gorulen:
+            continue
+        gorulen.add(grup)
+        uyeler = [idx] + [j for j in gruplar[grup] if j != idx]
+        hits.append({
+            "idx": idx,
+            "skor": float(scores[idx]),
+            "konumlar": [(chunks[j]["dosya"], chunks[j]["slayt_no"]) for j in uyeler],
+        })
+        if len(hits) >= top_k:
+            break
+    return hits
+
+
+def load_index(out_dir: Path, mmap: bool = False):
+    """
+    vectors.npy ve parça listesini (embeddings, chunks) olarak yükler.
+    mmap=True ise vektörler bellek eşlemeli açılır (yaklaşık indekslerle yalnızca
+    aday satırlar diskten okunur). Güncel sütunlu metadata (columns/) varsa
+    chunks bir ChunkColumns görünümüdür ve metadata.json hiç ayrıştırılmaz.
+    Parmak izi bir kez, dosya önbelleğinden alınır; belleğe okunan matris
+    salt okunurdur ve indeks okuyucuları izi yeniden hesaplamaz.
+    """
     import numpy as np
-    from sentence_transformers import SentenceTransformer
 
     vec_path = out_dir / "vectors.npy"
     meta_path = out_dir / "metadata.json"
@@ -305,87 +968,976 @@ def search(query: str, out_dir: Path, top_k: int = 5, model_name: str = MODEL_NA
         logger.error("Vektör dosyaları bulunamadı. Önce --all ile dönüştürme yapın.")
         sys.exit(1)
 
-    embeddings = np.load(str(vec_path))
+    from ann_store import remember_fingerprint, vector_fingerprint
+    from chunk_columns import open_columns
+    from vector_dtype import wrap
+
+    embeddings = np.load(str(vec_path), mmap_mode="r")
+    iz = vector_fingerprint(embeddings)
+    if not mmap:
+        embeddings = np.array(embeddings)
+        remember_fingerprint(embeddings, iz)
+    kolonlar = open_columns(out_dir, iz, mmap=mmap)
+    if kolonlar is not None:
+        return wrap(embeddings, kolonlar.meta), kolonlar
     with open(str(meta_path), "r", encoding="utf-8") as f:
         metadata = json.load(f)
-    chunks = metadata["chunks"]
+    # float16/int8 saklanan vektörler aramada float32 gibi görünür
+    return wrap(embeddings, metadata), metadata["chunks"]
+
+
+def rank(embeddings, chunks: List[Dict], q_vec, top_k: int,
+         ann: Optional[Dict] = None, knobs: Optional[Dict] = None,
+         filtre: Optional[Dict] = None) -> List[Dict]:
+    """
+    Normalize sorgu vektörüne göre en benzer top_k sonucu döndürür.
+    Her sonuç, yazdırma için gereken alanları taşır (dosya, slayt_no, metin).
+
+    ann verilirse (bkz. load_ann_index) tam tarama yerine yaklaşık indeks
+    kullanılır; knobs indeks türüne özgü ayarlardır (ör. {"nprobe": 16}).
+    filtre verilirse (bkz. select_rows) yalnızca aday satırlar sonuç olabilir.
+    """
+    if filtre is not None:
+        hits = _rank_filtered(embeddings, chunks, q_vec, top_k, ann, knobs, filtre)
+    elif ann is not None:
+        rows, skor = _ann_module(ann["meta"]["tur"]).search(
+            ann, embeddings, q_vec, top_k, **(knobs or {}))
+        rows = rows.tolist()
+        hits = _group_hits(rows, dict(zip(rows, skor.tolist())), chunks, top_k)
+    else:
+        # Cosine similarity  (normalize vektörler → dot product)
+        scores = (embeddings @ q_vec.T).flatten()
+        order = scores.argsort()[::-1]
+        hits = _group_hits(order, scores, chunks, top_k)
+    for hit in hits:
+        c = chunks[hit["idx"]]
+        hit.update(dosya=c["dosya"], slayt_no=c["slayt_no"], metin=c["metin"])
+    return hits
+
+
+def _rank_filtered(embeddings, chunks: List[Dict], q_vec, top_k: int,
+                   ann: Optional[Dict], knobs: Optional[Dict], filtre: Dict) -> List[Dict]:
+    """
+    Filtreli sıralama. Az aday varsa (ya da indeks yoksa) yalnızca aday satırlar
+    puanlanır. Çok aday varsa yaklaşık indeksten seçicilikle orantılı fazladan
+    sonuç istenir; yeterli aday kalmazsa istek büyütülür. İndeks tekil satırlar
+    üzerinedir; her sonuç grubun ilk aday üyesine taşınır.
+    """
+    import numpy as np
+
+    satirlar, temsil = filtre["satirlar"], filtre["temsil"]
+    if len(satirlar) == 0:
+        return []
+    if ann is None or len(satirlar) <= FILTER_EXACT_MAX:
+        scores = np.asarray(embeddings[satirlar] @ q_vec.T, dtype=np.float32).ravel()
+        order = satirlar[np.argsort(-scores, kind="stable")]
+        return _group_hits(order, dict(zip(satirlar.tolist(), scores.tolist())), chunks, top_k)
+
+    modul = _ann_module(ann["meta"]["tur"])
+    n_ann = len(ann["ids"])
+    k = min(n_ann, int(top_k * len(temsil) / len(satirlar) * 2) + top_k)
+    while True:
+        rows, skor = modul.search(ann, embeddings, q_vec, k, **(knobs or {}))
+        uye = temsil[np.asarray(rows, dtype=np.int64)]
+        keep = uye >= 0
+        if int(keep.sum()) >= top_k or k >= n_ann or len(rows) < k:   # yeterli / indeks tükendi
+            break
+        k = min(n_ann, k * 4)
+    uye = uye[keep].tolist()
+    return _group_hits(uye, dict(zip(uye, skor[keep].tolist())), chunks, top_k)
+
+
+def top_k_rows(scores, k: int):
+    """
+    Skor matrisinin her satırı için en büyük k değerin sütun indekslerini
+    azalan sırada döndürür. Tam sıralama yerine argpartition kullanılır.
+    """
+    import numpy as np
+
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    sira = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(part, sira, axis=1)
+
+
+def rank_batch(embeddings, chunks: List[Dict], q_vecs, top_k: int) -> List[List[Dict]]:
+    """
+    Birden çok normalize sorgu vektörünü tek matris çarpımıyla puanlar ve her
+    sorgu için rank() ile aynı biçimde sonuç listesi döndürür.
 
+    Yalnızca tekil vektörler (kopyaların ilki) puanlanır; böylece satır başına
+    ilk top_k, kopyalar toplandıktan sonra da tam top_k sonuç verir. Matris
+    kopyalanmaz: tüm satırlar (float16/int8'de ScaledVectors ile blok blok)
+    puanlanır, tekil sütunlar skor bloğundan seçilir.
+    """
+    import numpy as np
+
+    gruplar = _duplicate_groups(chunks)
+    tekil = np.fromiter(gruplar.keys(), dtype=np.int64, count=len(gruplar))
+    kopya_var = len(tekil) < len(chunks)
+
+    # Skor matrisi (sorgu × parça) bellek sınırını aşarsa sorgular bloklanır
+    blok = max(1, SCORE_BLOCK_ELEMS // max(len(chunks), 1))
+    sonuclar: List[List[Dict]] = []
+    for b in range(0, len(q_vecs), blok):
+        scores = (embeddings @ q_vecs[b:b + blok].T).T
+        if kopya_var:
+            scores = scores[:, tekil]
+        for satir, secim in zip(scores, top_k_rows(scores, top_k)):
+            hits = []
+            for j in secim:
+                idx = int(tekil[j])
+                c = chunks[idx]
+                hits.append({
+                    "idx": idx,
+                    "skor": float(satir[j]),
+                    "konumlar": [(chunks[m]["dosya"], chunks[m]["slayt_no"]) for m in gruplar[idx]],
+                    "dosya": c["dosya"], "slayt_no": c["slayt_no"], "metin": c["metin"],
+                })
+            sonuclar.append(hits)
+    return sonuclar
+
+
+def read_queries(path: Path) -> List[str]:
+    """Sorgu dosyasını okur: satır başına bir sorgu; boş ve # ile başlayan satırlar atlanır."""
+    with open(str(path), "r", encoding="utf-8-sig") as f:
+        return [s for s in (line.strip() for line in f) if s and not s.startswith("#")]
+
+
+def search_file(query_path: Path, out_dir: Path, top_k: int = 5,
+                model_name: str = MODEL_NAME, out_path: Optional[Path] = None) -> Path:
+    """
+    Sorgu dosyasındaki tüm sorguları toplu olarak arar ve sonuçları JSONL
+    olarak yazar (satır başına {"sorgu", "sonuclar"}). Yazılan yolu döndürür.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    queries = read_queries(query_path)
+    if not queries:
+        logger.error(f"Sorgu dosyasında sorgu yok: {query_path}")
+        sys.exit(1)
+    out_path = out_path or query_path.with_name(query_path.stem + "_sonuclar.jsonl")
+
+    embeddings, chunks = load_index(out_dir)
     model = SentenceTransformer(model_name)
-    q_vec = model.encode([query], normalize_embeddings=True)
 
-    # Cosine similarity  (normalize vektörler → dot product)
-    scores = (embeddings @ q_vec.T).flatten()
-    top_idx = scores.argsort()[::-1][:top_k]
+    t0 = time.perf_counter()
+    q_vecs = encode_batched(model, queries)
+    t1 = time.perf_counter()
+    sonuclar = rank_batch(embeddings, chunks, q_vecs, top_k)
+    t2 = time.perf_counter()
+    logger.info(f"{len(queries)} sorgu: kodlama {t1 - t0:.2f}s, puanlama {t2 - t1:.3f}s "
+                f"({len(chunks)} parça)")
 
+    with open(str(out_path), "w", encoding="utf-8") as f:
+        for sorgu, hits in zip(queries, sonuclar):
+            f.write(json.dumps({"sorgu": sorgu, "sonuclar": hits}, ensure_ascii=False) + "\n")
+    logger.info(f"Toplu arama sonuçları → {out_path}")
+    return out_path
+
+
+def print_hits(query: str, hits: List[Dict]):
+    """Arama sonuçlarını konsola yazdırır."""
     print()
     print("=" * 60)
     print(f"  ARAMA: \"{query}\"")
     print("=" * 60)
 
-    for rank, idx in enumerate(top_idx, start=1):
-        c = chunks[idx]
-        score = scores[idx]
-        print(f"\n  #{rank}  Benzerlik: {score:.4f}")
-        print(f"  Dosya : {c['dosya']}  |  Slayt: {c['slayt_no']}")
+    for rank_no, hit in enumerate(hits, start=1):
+        print(f"\n  #{rank_no}  Benzerlik: {hit['skor']:.4f}")
+        print(f"  Dosya : {hit['dosya']}  |  Slayt: {hit['slayt_no']}")
+        diger = hit["konumlar"][1:]
+        if diger:
+            konum = ", ".join(f"{d} s.{n}" for d, n in diger[:5])
+            if len(diger) > 5:
+                konum += f" … (+{len(diger) - 5})"
+            print(f"  Aynı metin {len(diger)} konumda daha: {konum}")
+        if hit.get("ilgili"):
+            print("  İlgili slaytlar: " + ", ".join(f"{d} s.{n}" for d, n, _ in hit["ilgili"]))
         print(f"  ─────────────────────────────────────────────")
         # Metni 300 karakterle sınırla
-        preview = c["metin"][:300]
-        if len(c["metin"]) > 300:
+        preview = hit["metin"][:300]
+        if len(hit["metin"]) > 300:
             preview += " …"
         print(f"  {preview}")
 
     print("\n" + "=" * 60 + "\n")
 
 
+# ── YAKLAŞIK ARAMA İNDEKSLERİ ───────────────────────────────────────────────
+# Her tür <tür>_index modülünde build()/search() olarak uygulanır ve
+# output/vectors/index_<tür>/ altında saklanır (bkz. ann_store). İndeks
+# yalnızca tekil vektörler üzerine kurulur; kopyalar sonuçta toplanır.
+
+def _ann_module(tur: str):
+    import importlib
+
+    return importlib.import_module(f"{tur}_index")
+
+
+def build_ann_index(tur: str, out_dir: Path, **params) -> Path:
+    """
+    vectors.npy'den verilen türde yaklaşık arama indeksi kurar ve kaydeder.
+    PQ'da m (--pq-m) 0 (otomatik) ya da pq_index.valid_m(boyut) değerlerinden biri olmalıdır.
+    """
+    from ann_store import index_dir, vector_fingerprint, write_index
+
+    embeddings, chunks = load_index(out_dir, mmap=True)
+    if tur == "pq":
+        from pq_index import valid_m
+
+        m, dim = params.get("m", 0), embeddings.shape[1]
+        if m != 0 and m not in valid_m(dim):
+            logger.error(f"--pq-m {m} geçersiz: 0 (otomatik) ya da vektör boyutunu ({dim}) bölen "
+                         f"8–64 arası bir kod boyu olmalı: {', '.join(map(str, valid_m(dim)))}.")
+            sys.exit(1)
+    rows = list(_duplicate_groups(chunks))
+    t0 = time.time()
+    arrays, meta = _ann_module(tur).build(embeddings, rows, **params)
+    meta.update(model=MODEL_NAME, satir=len(chunks), tekil=len(rows),
+                parmak_izi=vector_fingerprint(embeddings))
+    path = index_dir(out_dir, tur)
+    write_index(path, arrays, meta)
+    logger.info(f"{tur.upper()} indeksi kuruldu ({time.time() - t0:.1f}s) → {path}")
+    return path
+
+
+def build_route_index(out_dir: Path, embeddings=None, chunks: Optional[List[Dict]] = None) -> Path:
+    """
+    Deste ve slayt merkez vektörlerini kurar (bkz. route_index); save() her
+    kayıtta çağırır. embeddings verilmezse diskten okunur.
+    """
+    import route_index
+    from ann_store import index_dir, vector_fingerprint, write_index
+
+    if embeddings is None:
+        embeddings, chunks = load_index(out_dir, mmap=True)
+    arrays, meta = route_index.build(embeddings, chunks)
+    meta.update(model=MODEL_NAME, satir=len(chunks), tekil=len(_duplicate_groups(chunks)),
+                parmak_izi=vector_fingerprint(embeddings))
+    path = index_dir(out_dir, "route")
+    write_index(path, arrays, meta)
+    return path
+
+
+def load_ann_index(tur: str, out_dir: Path, embeddings) -> Optional[Dict]:
+    """
+    Kayıtlı indeksi yükler. İndeks yoksa veya vectors.npy değişmişse None
+    döner; çağıran tam aramaya geri döner.
+    """
+    from ann_store import index_dir, read_index, vector_fingerprint
+
+    ann = read_index(index_dir(out_dir, tur), vector_fingerprint(embeddings))
+    if ann is None:
+        logger.warning(f"{tur.upper()} indeksi kullanılamıyor; tam arama yapılıyor.")
+    return ann
+
+
+def refresh_ann_indexes(out_dir: Path, old_emb, embeddings, chunks: List[Dict], eski_to_yeni):
+    """
+    Artımlı güncelleme sonrası mevcut indeksleri yeniden kurmadan günceller:
+    eski satırlar eski_to_yeni ile yeniden numaralanır, yeni tekil satırlar
+    eklenir. Eski vectors.npy ile uyuşmayan (zaten bayat) indeksler atlanır.
+    kNN grafı satır eklemeyle güncellenemez (eski satırların komşuları da
+    değişir); güncelse aynı k ile yeniden kurulur.
+    """
+    from ann_store import index_dir, read_index, vector_fingerprint, write_index
+
+    eski_iz = vector_fingerprint(old_emb)
+    rows = list(_duplicate_groups(chunks))
+    for tur in ANN_TYPES:
+        path = index_dir(out_dir, tur)
+        ann = read_index(path, eski_iz, mmap=False) if path.exists() else None
+        if ann is None:
+            continue
+        arrays, meta = _ann_module(tur).update(ann, embeddings, eski_to_yeni, rows)
+        meta.update(model=MODEL_NAME, satir=len(chunks), tekil=len(rows),
+                    parmak_izi=vector_fingerprint(embeddings))
+        write_index(path, arrays, meta)
+        logger.info(f"{tur.upper()} indeksi artımlı güncellendi → {path}")
+
+    path = index_dir(out_dir, "knn")
+    graf = read_index(path, eski_iz, mmap=False) if path.exists() else None
+    if graf is not None:
+        build_knn_graph(out_dir, k=graf["meta"]["k"])
+    elif path.exists():
+        logger.warning("kNN grafı zaten bayattı; ilgili slaytlar için --build-index knn çalıştırın.")
+
+
+def evaluate_ann(tur: str, out_dir: Path, knobs: Optional[Dict] = None,
+                 n_queries: int = 200, top_k: int = 10, seed: int = 0) -> Dict:
+    """
+    Kayıtlı indeksin tam aramaya göre recall@top_k değerini ve ortalama sorgu
+    süresini ölçer. Model gerekmez: sorgular vectors.npy'den rastgele seçilen
+    tekil satırlardır; sorgunun kendisi iki sonuç listesinden de çıkarılır.
+    """
+    import numpy as np
+
+    embeddings, chunks = load_index(out_dir)
+    ann = load_ann_index(tur, out_dir, embeddings)
+    if ann is None:
+        logger.error(f"{tur.upper()} indeksi yok ya da bayat; önce --build-index {tur} çalıştırın.")
+        sys.exit(1)
+
+    def grup(idx):
+        return chunks[idx].get("ortak_vektor", chunks[idx]["id"])
+
+    rows = list(_duplicate_groups(chunks))
+    secilen = np.random.default_rng(seed).choice(rows, size=min(n_queries, len(rows)), replace=False)
+    sure = {"exact": 0.0, tur: 0.0}
+    recall = []
+    for r in secilen.tolist():
+        q = np.asarray(embeddings[r:r + 1], dtype=np.float32)
+        sonuc = {}
+        for ad, kw in (("exact", {}), (tur, {"ann": ann, "knobs": knobs})):
+            t0 = time.perf_counter()
+            hits = rank(embeddings, chunks, q, top_k + 1, **kw)
+            sure[ad] += time.perf_counter() - t0
+            sonuc[ad] = [grup(h["idx"]) for h in hits if grup(h["idx"]) != r][:top_k]
+        if sonuc["exact"]:
+            recall.append(len(set(sonuc[tur]) & set(sonuc["exact"])) / len(sonuc["exact"]))
+
+    n = max(len(secilen), 1)
+    return {"tur": tur, "sorgu": len(secilen), "top_k": top_k, "knobs": dict(knobs or {}),
+            "recall": float(np.mean(recall)) if recall else 0.0,
+            "exact_ms": sure["exact"] / n * 1000, "ann_ms": sure[tur] / n * 1000}
+
+
+def print_recall_report(rapor: Dict):
+    """evaluate_ann sonucunu konsola yazdırır."""
+    ayar = ", ".join(f"{k}={v}" for k, v in rapor["knobs"].items()) or "varsayılan"
+    print()
+    print("=" * 60)
+    print(f"  RECALL RAPORU: {rapor['tur'].upper()} ({ayar})")
+    print("=" * 60)
+    print(f"  Sorgu sayısı      : {rapor['sorgu']}")
+    print(f"  Recall@{rapor['top_k']:<10} : {rapor['recall']:.3f}")
+    print(f"  Tam arama         : {rapor['exact_ms']:.2f} ms/sorgu")
+    print(f"  {rapor['tur'].upper():<18}: {rapor['ann_ms']:.2f} ms/sorgu")
+    print("=" * 60 + "\n")
+
+
+# ── İLGİLİ SLAYTLAR (kNN GRAFI) ─────────────────────────────────────────────
+# Her tekil parçanın en yakın k komşusu --build-index knn ile bir kez,
+# bloklu matris çarpımıyla hesaplanır (bkz. knn_graph). Graf güncelse
+# arama sonuçları ve KVKK raporu "ilgili slaytlar" bağlantılarını ondan okur.
+
+def build_knn_graph(out_dir: Path, k: int = 0) -> Path:
+    """Tekil parçaların kNN grafını vectors.npy'den kurar (k = 0 ise varsayılan)."""
+    import knn_graph
+    import numpy as np
+    from ann_store import index_dir, vector_fingerprint, write_index
+
+    embeddings, chunks = load_index(out_dir, mmap=True)
+    ortak = np.empty(len(chunks), dtype=np.int64)
+    for g, uyeler in _duplicate_groups(chunks).items():
+        ortak[uyeler] = g
+    t0 = time.time()
+    arrays, meta = knn_graph.build(embeddings, ortak, k=k or knn_graph.DEFAULT_K)
+    meta.update(model=MODEL_NAME, satir=len(chunks), parmak_izi=vector_fingerprint(embeddings))
+    path = index_dir(out_dir, "knn")
+    write_index(path, arrays, meta)
+    logger.info(f"kNN grafı kuruldu ({time.time() - t0:.1f}s) → {path}")
+    return path
+
+
+def load_knn_graph(out_dir: Path, embeddings) -> Optional[Dict]:
+    """Kayıtlı kNN grafını yükler; yoksa ya da bayatsa None."""
+    from ann_store import index_dir, read_index, vector_fingerprint
+
+    return read_index(index_dir(out_dir, "knn"), vector_fingerprint(embeddings))
+
+
+def attach_related(graph: Optional[Dict], chunks: List[Dict], hits: List[Dict],
+                   n: int = RELATED_SLIDES) -> List[Dict]:
+    """Graf varsa her sonuca "ilgili" alanını [(dosya, slayt_no, skor), ...] ekler."""
+    from knn_graph import related_slides
+
+    if graph is not None:
+        for hit in hits:
+            hit["ilgili"] = related_slides(graph, chunks, hit["idx"], n)
+    return hits
+
+
+# ── METADATA FİLTRELERİ ─────────────────────────────────────────────────────
+# Deste / slayt aralığı / madde bit eşlemleri save() ile index_filtre/
+# altına yazılır (bkz. filter_index). Filtre sıralamadan önce uygulanır:
+# sonuç listesi hiçbir zaman sonradan süzülüp top_k'nın altına düşmez.
+
+def build_filter_index(out_dir: Path, embeddings=None, chunks: Optional[List[Dict]] = None) -> Path:
+    """Deste ve madde bit eşlemlerini kurar (embeddings verilmezse diskten)."""
+    import filter_index
+    from ann_store import index_dir, vector_fingerprint, write_index
+
+    if embeddings is None:
+        embeddings, chunks = load_index(out_dir, mmap=True)
+    arrays, meta = filter_index.build(chunks)
+    meta["parmak_izi"] = vector_fingerprint(embeddings)
+    path = index_dir(out_dir, "filtre")
+    write_index(path, arrays, meta)
+    return path
+
+
+def parse_range(metin: str) -> Tuple[int, int]:
+    """--slayt-range: "10-40" → (10, 40); "17" → (17, 17)."""
+    bas, _, son = metin.partition("-")
+    return int(bas), int(son or bas)
+
+
+def load_filter_index(out_dir: Path, embeddings) -> Optional[Dict]:
+    """Kayıtlı filtre indeksini yükler; yoksa ya da bayatsa None."""
+    from ann_store import index_dir, read_index, vector_fingerprint
+
+    return read_index(index_dir(out_dir, "filtre"), vector_fingerprint(embeddings))
+
+
+def select_rows(out_dir: Path, embeddings, dosya: Optional[str] = None,
+                slayt: Optional[Tuple[int, int]] = None,
+                madde: Optional[List[int]] = None) -> Optional[Dict]:
+    """Filtrelerin aday satırlarını döndürür (bkz. filter_index.select); filtre yoksa None."""
+    import filter_index
+
+    if dosya is None and slayt is None and not madde:
+        return None
+    index = load_filter_index(out_dir, embeddings)
+    if index is None:
+        logger.error("Filtre indeksi yok ya da bayat. --build-index filtre ile kurun.")
+        sys.exit(1)
+    return filter_index.select(index, dosya=dosya, slayt=slayt, madde=madde)
+
+
+# ── SÖZCÜKSEL (BM25) + HİBRİT ARAMA ─────────────────────────────────────────
+# Ters indeks save() ile vectors.npy'nin yanında (index_bm25/) kurulur
+# (bkz. bm25_index). Hibrit modda gömme ve BM25 aday listeleri karşılıklı
+# sıra birleştirmesiyle (RRF) tek listeye indirilir; skorların ölçeği
+# farklı olduğundan yalnızca sıralar kullanılır.
+
+def build_bm25_index(out_dir: Path, embeddings=None, chunks: Optional[List[Dict]] = None) -> Path:
+    """Tekil parçalar üzerinde BM25 ters indeksini kurar (embeddings verilmezse diskten)."""
+    import bm25_index
+    from ann_store import index_dir, vector_fingerprint, write_index
+
+    if embeddings is None:
+        embeddings, chunks = load_index(out_dir, mmap=True)
+    rows = list(_duplicate_groups(chunks))
+    arrays, meta = bm25_index.build(chunks, rows)
+    meta.update(satir=len(chunks), tekil=len(rows), parmak_izi=vector_fingerprint(embeddings))
+    path = index_dir(out_dir, "bm25")
+    write_index(path, arrays, meta)
+    return path
+
+
+def load_bm25_index(out_dir: Path, embeddings) -> Optional[Dict]:
+    """Kayıtlı BM25 indeksini yükler; yoksa ya da bayatsa None."""
+    from ann_store import index_dir, read_index, vector_fingerprint
+
+    return read_index(index_dir(out_dir, "bm25"), vector_fingerprint(embeddings))
+
+
+def bm25_rank(bm25: Dict, chunks: List[Dict], query: str, top_k: int,
+              filtre: Optional[Dict] = None) -> List[Dict]:
+    """
+    BM25 ile en iyi top_k sonuç; biçim rank() ile aynıdır. filtre verilirse
+    yalnızca aday grupları puanlanır ve sonuç grubun ilk aday üyesine taşınır.
+    """
+    import bm25_index
+    import numpy as np
+
+    if filtre is None:
+        rows, skor = bm25_index.search(bm25, query, top_k)
+    else:
+        temsil = filtre["temsil"]
+        uye = temsil[np.asarray(bm25["ids"], dtype=np.int64)]
+        rows, skor = bm25_index.search(bm25, query, top_k, izin=uye >= 0)
+        rows = temsil[rows]
+    rows = rows.tolist()
+    hits = _group_hits(rows, dict(zip(rows, skor.tolist())), chunks, top_k)
+    for hit in hits:
+        c = chunks[hit["idx"]]
+        hit.update(dosya=c["dosya"], slayt_no=c["slayt_no"], metin=c["metin"])
+    return hits
+
+
+def fuse_rrf(listeler: List[List[Dict]], chunks: List[Dict], top_k: int,
+             k: int = RRF_K) -> List[Dict]:
+    """
+    Sıralı sonuç listelerini karşılıklı sıra birleştirmesiyle (RRF) birleştirir.
+    Aynı ortak vektörü paylaşan sonuçlar tek aday sayılır; "skor" RRF toplamıdır.
+    """
+    toplam: Dict[int, float] = {}
+    temsil: Dict[int, Dict] = {}
+    for hits in listeler:
+        for sira, hit in enumerate(hits, start=1):
+            c = chunks[hit["idx"]]
+            grup = c.get("ortak_vektor", c["id"])
+            toplam[grup] = toplam.get(grup, 0.0) + 1.0 / (k + sira)
+            temsil.setdefault(grup, hit)
+    sirali = sorted(toplam, key=lambda g: -toplam[g])[:top_k]
+    return [dict(temsil[g], skor=toplam[g]) for g in sirali]
+
+
+def hybrid_rank(embeddings, chunks: List[Dict], bm25: Optional[Dict], q_vec, query: str,
+                top_k: int, ann: Optional[Dict] = None, knobs: Optional[Dict] = None,
+                n_aday: int = HYBRID_CANDIDATES, filtre: Optional[Dict] = None) -> List[Dict]:
+    """Gömme (rank) ve BM25 listelerinin ilk n_aday sonucunu RRF ile birleştirir."""
+    n = max(top_k, n_aday)
+    listeler = [rank(embeddings, chunks, q_vec, n, ann=ann, knobs=knobs, filtre=filtre)]
+    if bm25 is not None:
+        listeler.append(bm25_rank(bm25, chunks, query, n, filtre=filtre))
+    return fuse_rrf(listeler, chunks, top_k)
+
+
+# ── İKİ AŞAMALI ARAMA: CROSS-ENCODER İLE YENİDEN SIRALAMA ───────────────────
+# Bi-encoder (ya da BM25/hibrit) sıralaması yalnızca aday üretir; en iyi N aday
+# sorguyla birlikte cross-encoder'a tek batch olarak verilir. N sabit
+# olduğundan bu aşamanın süresi derlem büyüklüğünden bağımsızdır.
+
+def load_reranker(model_name: str = RERANK_MODEL):
+    """
+    Cross-encoder'ı yükler. Önce yalnızca yerel önbellekten denenir (ağ
+    denetimi yok); model hiç indirilmemişse bir kez indirilir.
+    """
+    from sentence_transformers import CrossEncoder
+
+    try:
+        return CrossEncoder(model_name, local_files_only=True)
+    except OSError:
+        logger.info(f"Yeniden sıralama modeli önbellekte yok, indiriliyor: {model_name}")
+        return CrossEncoder(model_name)
+
+
+def rerank_hits(reranker, query: str, hits: List[Dict], top_k: int) -> List[Dict]:
+    """
+    Aday sonuçları (sorgu, metin) çiftleriyle tek batch'te yeniden puanlar ve
+    ilk top_k'yı döndürür. "skor" cross-encoder skorudur, ilk aşama skoru
+    "ilk_skor" alanında kalır; eşit skorlarda ilk aşama sırası korunur.
+    """
+    if not hits:
+        return []
+    skor = reranker.predict([(query, h["metin"]) for h in hits],
+                            batch_size=len(hits), show_progress_bar=False)
+    skor = [float(x) for x in skor]
+    sira = sorted(range(len(hits)), key=lambda i: -skor[i])[:top_k]
+    return [dict(hits[i], skor=skor[i], ilk_skor=hits[i]["skor"]) for i in sira]
+
+
+def _timed_rerank(reranker, query: str, hits: List[Dict], top_k: int) -> List[Dict]:
+    """rerank_hits + süre logu (iki aşamalı aramanın ikinci aşaması)."""
+    t0 = time.perf_counter()
+    sonuc = rerank_hits(reranker, query, hits, top_k)
+    logger.info(f"Yeniden sıralama ({len(hits)} aday → {len(sonuc)}): "
+                f"{(time.perf_counter() - t0) * 1000:.1f} ms")
+    return sonuc
+
+
+def search_db(query: str, out_dir: Path, top_k: int = 5, dosya: Optional[str] = None):
+    """
+    SQLite FTS5 veritabanında sözcüksel arama; model ve vektörler yüklenmez.
+    Tam yasal atıflar ("7499/33", "Madde 12") için uygundur.
+    """
+    from chunk_db import DB_NAME, search as fts_search
+
+    db_path = out_dir / DB_NAME
+    if not db_path.exists():
+        logger.error("Parça veritabanı bulunamadı. Önce --db ile oluşturun.")
+        sys.exit(1)
+    print_hits(query, fts_search(db_path, query, top_k=top_k, dosya=dosya))
+
+
+def search(query: str, out_dir: Path, top_k: int = 5, model_name: str = MODEL_NAME,
+           port: Optional[int] = None, index: str = "exact", knobs: Optional[Dict] = None,
+           mode: str = "dense", dosya: Optional[str] = None,
+           slayt: Optional[Tuple[int, int]] = None, madde: Optional[List[int]] = None,
+           rerank: int = 0):
+    """
+    Vektör deposunda cosine similarity ile semantik arama yapar.
+
+    port verilirse önce o porttaki arama sunucusuna (--serve) sorulur; sunucu
+    çalışıyorsa model ve indeks yüklenmeden milisaniyeler içinde yanıt gelir.
+    Sunucuya ulaşılamazsa arama bu işlemde yapılır.
+
+    index "exact" dışında bir türse (ör. "ivf") kayıtlı yaklaşık indeks
+    kullanılır; indeks yok ya da bayatsa tam aramaya dönülür. Tam aramada
+    güncel bir parçalı depo varsa vectors.npy/metadata.json belleğe alınmaz,
+    parçalar mmap ile paralel taranır.
+
+    mode "bm25" ise yalnızca BM25 ters indeksi kullanılır (model ve torch
+    yüklenmez); "hybrid" ise gömme ve BM25 sonuçları RRF ile birleştirilir.
+
+    dosya / slayt (ilk, son) / madde verilirse arama yalnızca bu desteler,
+    slayt aralığı ve maddelere atıf yapan parçalar üzerinde yapılır (bkz. select_rows).
+
+    rerank > 0 ise ilk aşama max(top_k, rerank) aday üretir, bunlar
+    cross-encoder ile yeniden sıralanır (bkz. rerank_hits); aşama süreleri loglanır.
+    """
+    filtreli = dosya is not None or slayt is not None or bool(madde)
+    n = max(top_k, rerank) if rerank else top_k
+    if mode == "bm25":
+        embeddings, chunks = load_index(out_dir, mmap=True)
+        bm25 = load_bm25_index(out_dir, embeddings)
+        if bm25 is None:
+            logger.error("BM25 indeksi yok ya da bayat. --build-index bm25 ile kurun.")
+            sys.exit(1)
+        filtre = select_rows(out_dir, embeddings, dosya, slayt, madde)
+        reranker = load_reranker() if rerank else None
+        t0 = time.perf_counter()
+        hits = bm25_rank(bm25, chunks, query, n, filtre=filtre)
+        logger.info(f"Arama (bm25): {(time.perf_counter() - t0) * 1000:.1f} ms")
+        if reranker is not None:
+            hits = _timed_rerank(reranker, query, hits, top_k)
+        print_hits(query, attach_related(load_knn_graph(out_dir, embeddings), chunks, hits))
+        return
+
+    if port is not None:
+        from search_daemon import query_daemon
+
+        hits = query_daemon(query, top_k, model_name, out_dir, port=port,
+                            index=index, knobs=knobs, mode=mode,
+                            filtre={"dosya": dosya, "slayt": slayt, "madde": madde}
+                            if filtreli else None, rerank=rerank)
+        if hits is not None:
+            print_hits(query, hits)
+            return
+
+    from sentence_transformers import SentenceTransformer
+    from vector_store import open_shards, search_shards
+
+    parcali = (open_shards(out_dir) if index == "exact" and mode == "dense" and not filtreli
+               else None)
+    ann = bm25 = filtre = None
+    if parcali is None:
+        embeddings, chunks = load_index(
+            out_dir, mmap=index != "exact" or mode != "dense" or filtreli)
+        ann = load_ann_index(index, out_dir, embeddings) if index != "exact" else None
+        filtre = select_rows(out_dir, embeddings, dosya, slayt, madde)
+        if mode == "hybrid":
+            bm25 = load_bm25_index(out_dir, embeddings)
+            if bm25 is None:
+                logger.warning("BM25 indeksi kullanılamıyor; yalnızca gömme araması yapılıyor.")
+    model = SentenceTransformer(model_name)
+    reranker = load_reranker() if rerank else None
+    t0 = time.perf_counter()
+    q_vec = model.encode([query], normalize_embeddings=True)
+    logger.info(f"Sorgu kodlama: {(time.perf_counter() - t0) * 1000:.1f} ms")
+    t0 = time.perf_counter()
+    if parcali is not None:
+        hits = search_shards(out_dir, parcali, q_vec, n)
+    elif mode == "hybrid":
+        hits = hybrid_rank(embeddings, chunks, bm25, q_vec, query, n, ann=ann, knobs=knobs,
+                           filtre=filtre)
+    else:
+        hits = rank(embeddings, chunks, q_vec, n, ann=ann, knobs=knobs, filtre=filtre)
+    tur = "parçalı" if parcali is not None else (index if ann is not None else "exact")
+    if bm25 is not None:
+        tur += " + bm25"
+    if filtre is not None:
+        tur += f" + filtre ({len(filtre['satirlar'])} aday)"
+    logger.info(f"Arama ({tur}): {(time.perf_counter() - t0) * 1000:.1f} ms")
+    if reranker is not None:
+        hits = _timed_rerank(reranker, query, hits, top_k)
+    if parcali is not None:
+        # Parçalı depo: graf için matris mmap ile (önbellekli parmak izi), kayıtlar sütunlardan
+        import numpy as np
+        from chunk_columns import open_columns
+
+        embeddings = np.load(str(out_dir / "vectors.npy"), mmap_mode="r")
+        chunks = open_columns(out_dir, parcali["parmak_izi"])
+    attach_related(load_knn_graph(out_dir, embeddings), chunks, hits)
+    print_hits(query, hits)
+
+
+def slide_rows(chunks: List[Dict], spec: str) -> Tuple[str, int, List[int]]:
+    """
+    "<dosya>:<slayt_no>" biçimindeki slaydın parça satırlarını bulur.
+    dosya tam ad ya da (Türkçe harf duyarsız) tek bir desteyi belirleyen
+    parça olabilir. (deste adı, slayt_no, satırlar) döndürür; bulunamazsa ValueError.
+    """
+    import numpy as np
+    from filter_index import match_decks
+
+    dosya, _, no = spec.rpartition(":")
+    if not dosya or not no.strip().isdigit():
+        raise ValueError(f"Beklenen biçim \"<dosya>:<slayt_no>\": {spec}")
+    slayt_no = int(no)
+    dosyalar = getattr(chunks, "dosyalar", None) or sorted({c["dosya"] for c in chunks})
+    adaylar = [d for d in dosyalar if d == dosya] or \
+              [dosyalar[i] for i in match_decks(dosyalar, dosya)]
+    if len(adaylar) != 1:
+        raise ValueError(f"\"{dosya}\" {len(adaylar)} desteyle eşleşti: {', '.join(adaylar[:5])}")
+    deste = adaylar[0]
+
+    if hasattr(chunks, "slayt_no"):             # sütunlu metadata: metinler çözülmez
+        kod = chunks.dosyalar.index(deste)
+        satirlar = np.flatnonzero((np.asarray(chunks.dosya) == kod)
+                                  & (np.asarray(chunks.slayt_no) == slayt_no)).tolist()
+    else:
+        satirlar = [i for i, c in enumerate(chunks)
+                    if c["dosya"] == deste and c["slayt_no"] == slayt_no]
+    if not satirlar:
+        raise ValueError(f"{deste} destesinde {slayt_no}. slayt yok")
+    return deste, slayt_no, satirlar
+
+
+def similar_to(spec: str, out_dir: Path, top_k: int = 5, index: str = "exact",
+               knobs: Optional[Dict] = None, dosya: Optional[str] = None,
+               slayt: Optional[Tuple[int, int]] = None,
+               madde: Optional[List[int]] = None) -> List[Dict]:
+    """
+    Örnekle arama: "<dosya>:<slayt_no>" slaydının vectors.npy'deki parça
+    vektörlerinin normalize ortalamasını sorgu yapar; model ve torch
+    yüklenmez. Kaynak slaydın kendi parçaları sonuçlardan çıkarılır.
+    Yaklaşık indeksler ve filtreler search() ile aynı şekilde uygulanır.
+    """
+    import numpy as np
+
+    t0 = time.perf_counter()
+    embeddings, chunks = load_index(out_dir, mmap=True)
+    try:
+        deste, slayt_no, satirlar = slide_rows(chunks, spec)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    q_vec = np.asarray(embeddings[satirlar], dtype=np.float32).mean(axis=0, keepdims=True)
+    q_vec /= max(float(np.linalg.norm(q_vec)), 1e-12)
+    ann = load_ann_index(index, out_dir, embeddings) if index != "exact" else None
+    filtre = select_rows(out_dir, embeddings, dosya, slayt, madde)
+
+    kaynak = {chunks[i].get("ortak_vektor", chunks[i]["id"]) for i in satirlar}
+    hits = rank(embeddings, chunks, q_vec, top_k + len(kaynak), ann=ann, knobs=knobs,
+                filtre=filtre)
+    hits = [h for h in hits
+            if chunks[h["idx"]].get("ortak_vektor", chunks[h["idx"]]["id"]) not in kaynak][:top_k]
+    logger.info(f"Örnekle arama ({len(satirlar)} parça, "
+                f"{index if ann is not None else 'exact'}): "
+                f"{(time.perf_counter() - t0) * 1000:.1f} ms (yükleme dahil)")
+    print_hits(f"{deste} · slayt {slayt_no} benzerleri",
+               attach_related(load_knn_graph(out_dir, embeddings), chunks, hits))
+    return hits
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # 6) TXT DIŞA AKTARMA
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def export_txt(kaynak_dir: Path, txt_dir: Path):
-    """Her PPTX dosyasını ayrı bir .txt dosyasına aktarır."""
-    from pptx import Presentation
-
-    pptx_files = sorted(kaynak_dir.glob("*.pptx"))
+def _write_txt(file_path: Path, slide_texts: List[List[str]], txt_dir: Path) -> Path:
+    """Bir destenin slayt metinlerini txt_dir/<ad>.txt dosyasına yazar."""
+    lines: List[str] = []
+    lines.append(f"{'=' * 60}")
+    lines.append(f"  {file_path.stem}")
+    lines.append(f"{'=' * 60}")
+    lines.append("")
+
+    for slide_idx, texts in enumerate(slide_texts, start=1):
+        if texts:
+            lines.append(f"── Slayt {slide_idx} {'─' * 40}")
+            for t in texts:
+                lines.append(t)
+            lines.append("")
+
+    # Dosyayı yaz
+    txt_path = txt_dir / (file_path.stem + ".txt")
+    with open(str(txt_path), "w", encoding="utf-8") as out:
+        out.write("\n".join(lines))
+    return txt_path
+
+
+def stale_txt_files(kaynak_dir: Path, txt_dir: Path) -> List[Path]:
+    """TXT çıktısı olmayan ya da PPTX'ten eski kalan desteleri döndürür."""
+    eskiler: List[Path] = []
+    for f in sorted(kaynak_dir.glob("*.pptx")):
+        txt_path = txt_dir / (f.stem + ".txt")
+        if not txt_path.exists() or txt_path.stat().st_mtime < f.stat().st_mtime:
+            eskiler.append(f)
+    return eskiler
+
+
+def export_txt(kaynak_dir: Path, txt_dir: Path, jobs: int = 1, engine: str = "pptx",
+               files: Optional[List[Path]] = None):
+    """
+    Her PPTX dosyasını ayrı bir .txt dosyasına aktarır.
+    Çıkarma ile aynı çalıştırmada TXT isteniyorsa extract_all(..., sinks=[txt_sink(...)])
+    tercih edilmeli; bu fonksiyon yalnızca TXT gerektiğinde desteleri okur.
+    """
+    pptx_files = sorted(files) if files is not None else sorted(kaynak_dir.glob("*.pptx"))
     if not pptx_files:
-        logger.warning(f"PPTX dosyası bulunamadı: {kaynak_dir}")
+        if files is None:
+            logger.warning(f"PPTX dosyası bulunamadı: {kaynak_dir}")
+        else:
+            logger.info("TXT çıktıları güncel, okunacak deste yok.")
         return
 
-    txt_dir.mkdir(parents=True, exist_ok=True)
     logger.info(f"{len(pptx_files)} PPTX dosyası → TXT dönüştürülecek")
+    extract_all(kaynak_dir, jobs=jobs, engine=engine, files=pptx_files,
+                sinks=[txt_sink(txt_dir)])
+    logger.info(f"TXT çıktıları → {txt_dir}")
 
-    for f in pptx_files:
-        logger.info(f"  → {f.name}")
-        try:
-            prs = Presentation(str(f))
-        except Exception as exc:
-            logger.error(f"  ✗ Dosya okunamadı: {f.name} → {exc}")
-            continue
 
-        lines: List[str] = []
-        lines.append(f"{'=' * 60}")
-        lines.append(f"  {f.stem}")
-        lines.append(f"{'=' * 60}")
-        lines.append("")
-
-        for slide_idx, slide in enumerate(prs.slides, start=1):
-            slide_texts: List[str] = []
-            for shape in slide.shapes:
-                slide_texts.extend(_shape_texts(shape))
-
-            if slide_texts:
-                lines.append(f"── Slayt {slide_idx} {'─' * 40}")
-                for t in slide_texts:
-                    lines.append(t)
-                lines.append("")
-
-        # Dosyayı yaz
-        txt_name = f.stem + ".txt"
-        txt_path = txt_dir / txt_name
-        with open(str(txt_path), "w", encoding="utf-8") as out:
-            out.write("\n".join(lines))
-        logger.info(f"    → {txt_path.name} ({len(prs.slides)} slayt)")
+# ═══════════════════════════════════════════════════════════════════════════════
+# 7) ARTIMLI GÜNCELLEME  (Manifest)
+# ═══════════════════════════════════════════════════════════════════════════════
+# manifest.json her PPTX için içerik özetini (sha256) ve o destenin parça id /
+# vektör satırı aralığını tutar. Parçalar dosya sırasıyla ardışık olduğundan
+# id aralığı ile satır aralığı aynıdır: [bas, son).
 
-    logger.info(f"TXT çıktıları → {txt_dir}")
+MANIFEST_NAME = "manifest.json"
+
+
+def _file_sha256(path: Path) -> str:
+    """Dosya içeriğinin sha256 özetini döndürür."""
+    import hashlib
+
+    h = hashlib.sha256()
+    with open(str(path), "rb") as f:
+        for blok in iter(lambda: f.read(1 << 20), b""):
+            h.update(blok)
+    return h.hexdigest()
+
+
+def hash_sources(kaynak_dir: Path) -> Dict[str, str]:
+    """Klasördeki her PPTX için {dosya_adı: sha256} döndürür."""
+    return {f.name: _file_sha256(f) for f in sorted(kaynak_dir.glob("*.pptx"))}
+
+
+def build_manifest(chunks: List[Dict], hashes: Dict[str, str],
+                   model_name: str = MODEL_NAME) -> Dict:
+    """Parça listesi ve dosya özetlerinden manifest sözlüğü üretir."""
+    araliklar: Dict[str, List[int]] = {}
+    for c in chunks:
+        araliklar.setdefault(c["dosya"], [c["id"], c["id"]])[1] = c["id"] + 1
+
+    dosyalar = {}
+    for name in sorted(hashes):
+        bas, son = araliklar.get(name, [0, 0])
+        dosyalar[name] = {"sha256": hashes[name], "idler": [bas, son], "satirlar": [bas, son]}
+    return {"model": model_name, "toplam_parca": len(chunks), "dosyalar": dosyalar}
+
+
+def write_manifest(manifest: Dict, out_dir: Path):
+    """Manifesti out_dir/manifest.json olarak yazar."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / MANIFEST_NAME
+    with open(str(path), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    logger.info(f"Manifest → {path}")
+
+
+def load_manifest(out_dir: Path, model_name: str = MODEL_NAME) -> Optional[Dict]:
+    """
+    Manifesti yükler. Manifest yoksa, başka bir modelle üretildiyse ya da
+    vectors.npy / metadata.json ile tutarsızsa None döner (tam yeniden işleme).
+    """
+    man_path = out_dir / MANIFEST_NAME
+    meta_path = out_dir / "metadata.json"
+    if not man_path.exists() or not meta_path.exists() or not (out_dir / "vectors.npy").exists():
+        return None
+    try:
+        with open(str(man_path), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        with open(str(meta_path), "r", encoding="utf-8") as f:
+            toplam = json.load(f)["toplam_parca"]
+    except (OSError, ValueError, KeyError) as exc:
+        logger.warning(f"Manifest okunamadı, tam işleme yapılacak → {exc}")
+        return None
+    if manifest.get("model") != model_name or manifest.get("toplam_parca") != toplam:
+        logger.info("Manifest güncel çıktılarla uyuşmuyor, tam işleme yapılacak.")
+        return None
+    return manifest
+
+
+def invalidate_manifest(out_dir: Path):
+    """Manifest dışı bir yazımdan sonra eski manifesti siler."""
+    man_path = out_dir / MANIFEST_NAME
+    if man_path.exists():
+        man_path.unlink()
+        logger.info("Manifest geçersiz kılındı (sonraki --all tam işleme yapacak).")
+
+
+def update_incremental(kaynak_dir: Path, out_dir: Path, manifest: Dict,
+                       jobs: int = 1, engine: str = "pptx",
+                       sinks: Optional[List[SlideSink]] = None,
+                       vectorize_kwargs: Optional[Dict] = None,
+                       store_dtype: Optional[str] = None,
+                       shard_rows: Optional[int] = None,
+                       db: Optional[bool] = None) -> List[Dict]:
+    """
+    Yalnızca yeni/değişen desteleri çıkarır ve vektörleştirir; silinen
+    destelerin satırlarını atar, değişmeyenlerin satırlarını eski
+    vectors.npy'den kopyalayarak vectors.npy / metadata.json'ı yeniden birleştirir.
+    sinks yalnızca yeniden okunan destelere uygulanır; vectorize_kwargs
+    vectorize()'a aynen iletilir (ör. önbellek ayarları). store_dtype None ise
+    mevcut vectors.npy'nin saklama tipi korunur; shard_rows ve db save()'e iletilir.
+    """
+    import numpy as np
+
+    hashes = hash_sources(kaynak_dir)
+    eski = manifest["dosyalar"]
+    degisen = [name for name, digest in hashes.items()
+               if name not in eski or eski[name]["sha256"] != digest]
+    silinen = sorted(set(eski) - set(hashes))
+    logger.info(f"Manifest: {len(degisen)} yeni/değişen, {len(silinen)} silinen, "
+                f"{len(hashes) - len(degisen)} değişmemiş deste")
+
+    if not degisen and not silinen:
+        logger.info("Değişiklik yok – vektörler güncel.")
+        if shard_rows is not None:
+            build_shards(out_dir, shard_rows)
+        if db:
+            build_db(out_dir)
+        with open(str(out_dir / "metadata.json"), "r", encoding="utf-8") as f:
+            return json.load(f)["chunks"]
+
+    # Eski çıktılar – dosya üzerine yazılacağı için (Windows) mmap yerine belleğe
+    old_emb, old_chunks = load_index(out_dir)
+    if store_dtype is None:
+        store_dtype = getattr(old_emb, "raw", old_emb).dtype.name
+
+    # Yalnızca değişen desteleri çıkar + vektörleştir
+    yeni_chunks: List[Dict] = []
+    if degisen:
+        slides = extract_all(kaynak_dir, jobs=jobs, engine=engine,
+                             files=[kaynak_dir / name for name in degisen], sinks=sinks)
+        yeni_chunks = create_chunks(slides)
+    vectorize_kwargs = dict(vectorize_kwargs or {})
+    delta_path = out_dir / "vectors.delta.npy"
+    if vectorize_kwargs.get("stream_path") is not None:
+        vectorize_kwargs["stream_path"] = delta_path   # yeni satırlar ayrı dosyaya akar
+    yeni_emb = (vectorize(yeni_chunks, **vectorize_kwargs) if yeni_chunks
+                else np.empty((0, old_emb.shape[1]), dtype=old_emb.dtype))
+    yeni_aralik = build_manifest(yeni_chunks, {n: "" for n in degisen})["dosyalar"]
+
+    # Dosya sırasıyla ekle: değişmeyen → eski satırlar, değişen → yeni satırlar
+    chunks: List[Dict] = []
+    bloklar = []
+    eski_to_yeni = np.full(len(old_chunks), -1, dtype=np.int64)   # indeks güncellemesi için
+    for name in sorted(hashes):
+        if name in yeni_aralik:
+            bas, son = yeni_aralik[name]["satirlar"]
+            kaynak_chunks, kaynak_emb = yeni_chunks, yeni_emb
+        else:
+            bas, son = eski[name]["satirlar"]
+            kaynak_chunks, kaynak_emb = old_chunks, old_emb
+            eski_to_yeni[bas:son] = np.arange(len(chunks), len(chunks) + son - bas)
+        for c in kaynak_chunks[bas:son]:
+            chunks.append(dict(c, id=len(chunks)))
+        bloklar.append(kaynak_emb[bas:son])
+
+    if not chunks:
+        logger.error("Hiç metin parçası kalmadı, işlem durduruluyor.")
+        sys.exit(1)
+
+    embeddings = np.concatenate(bloklar).astype(old_emb.dtype, copy=False)
+    del bloklar, yeni_emb           # delta dosyasının bellek eşlemesini bırak
+    if delta_path.exists():
+        delta_path.unlink()
+    write_extracted(chunks, out_dir)
+    save(embeddings, chunks, out_dir, dtype=store_dtype, shard_rows=shard_rows, db=db)
+    write_manifest(build_manifest(chunks, hashes), out_dir)
+    if store_dtype != "float32":
+        embeddings, _ = load_index(out_dir)     # indeksler saklanan (nicemlenmiş) değerlerle
+    refresh_ann_indexes(out_dir, old_emb, embeddings, chunks, eski_to_yeni)
+    return chunks
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -393,38 +1945,139 @@ def export_txt(kaynak_dir: Path, txt_dir: Path):
 # ═══════════════════════════════════════════════════════════════════════════════
 
 def main():
+    # Kardeş modüller yalnızca onları kullanan dallarda içe aktarılır:
+    # ppt-vectorize (src.ppt_to_vectors:main) src/'yi sys.path'e eklemez
     parser = argparse.ArgumentParser(
         description="PPT dosyalarını AI vektörlerine dönüştürme aracı",
         formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Örnekler:
-  python ppt_to_vectors.py --all                   Tam işlem
-  python ppt_to_vectors.py --search "kişisel veri"  Semantik arama
-  python ppt_to_vectors.py --search "KVKK yaptırımlar" --top-k 10
-        """,
+        # Örnekler modül belgesindeki tek listeden gelir (python -OO belgeyi siler)
+        epilog="Örnekler:\n" + __doc__.split("Kullanım:\n", 1)[1] if __doc__ else None,
     )
     parser.add_argument("--extract",   action="store_true", help="PPT → metin çıkarma")
     parser.add_argument("--vectorize", action="store_true", help="Metinler → vektör")
     parser.add_argument("--all",       action="store_true", help="Çıkarma + vektörleştirme")
     parser.add_argument("--txt",       action="store_true", help="PPT → TXT dosyalarına aktar")
     parser.add_argument("--search",    type=str,            help="Semantik arama sorgusu")
+    parser.add_argument("--similar-to", type=str, metavar="DOSYA:SLAYT",
+                        help="Bu slayda benzeyen parçalar (kayıtlı vektörlerle; model yüklenmez)")
+    parser.add_argument("--search-file", type=Path,
+                        help="Satır başına bir sorgu içeren dosya (toplu arama, JSONL çıktı)")
+    parser.add_argument("--search-out", type=Path,
+                        help="--search-file sonuç dosyası (varsayılan: <dosya>_sonuclar.jsonl)")
     parser.add_argument("--top-k",     type=int, default=5, help="Arama sonuç sayısı")
+    parser.add_argument("--jobs",      type=int, default=1,
+                        help="PPT çıkarma için paralel işlem sayısı (varsayılan: 1)")
+    parser.add_argument("--engine",    choices=ENGINES, default="pptx",
+                        help="Çıkarma motoru: pptx (python-pptx) veya xml (hızlı XML akışı)")
+    parser.add_argument("--full",      action="store_true",
+                        help="--all için manifesti yok say; tüm desteleri baştan işle")
+    parser.add_argument("--no-cache",  action="store_true",
+                        help="Gömme önbelleğini kullanma (her parçayı yeniden kodla)")
+    parser.add_argument("--cache-max", type=int, default=0,
+                        help="Gömme önbelleğindeki en fazla kayıt sayısı (LRU; 0 = varsayılan)")
+    parser.add_argument("--token-budget", type=int, default=EMBED_TOKEN_BUDGET,
+                        help="Vektörleştirme batch'i başına token bütçesi (parça × en uzun)")
+    parser.add_argument("--embed-workers", type=int, default=1,
+                        help="CPU'da paralel model kopyası sayısı (varsayılan: 1)")
+    parser.add_argument("--store-dtype", choices=("float32", "float16", "int8"),   # vector_dtype.STORE_DTYPES
+                        help="vectors.npy saklama tipi: float32, float16 veya int8 (boyut başına "
+                             "ölçekli). Artımlı güncellemede verilmezse mevcut tip korunur")
+    parser.add_argument("--shard-size", type=int,
+                        help="Parçalı depo: vectors.npy'yi parça başına bu kadar satıra böl (ör. 65536; 0 = sil)")
+    parser.add_argument("--db",        action="store_true",
+                        help="SQLite + FTS5 parça veritabanını oluştur (sonraki kayıtlar günceller)")
+    parser.add_argument("--db-search", type=str,
+                        help="Parça veritabanında sözcüksel (FTS5) arama; model yüklenmez")
+    parser.add_argument("--dosya",     type=str,
+                        help="--search/--db-search/--similar-to: adı bu metni içeren destelerle "
+                             "sınırla (Türkçe harf duyarsız)")
+    parser.add_argument("--slayt-range", type=parse_range,
+                        help="--search: slayt aralığıyla sınırla (ör. 10-40 ya da 17)")
+    parser.add_argument("--madde",     type=lambda s: [int(m) for m in s.split(",")],
+                        help="--search: bu maddelere atıf yapan parçalarla sınırla (ör. 9 ya da 9,12)")
+    parser.add_argument("--build-index", choices=SEARCH_INDEXES + ("bm25", "filtre", "knn"),
+                        help="Vektörlerden yaklaşık arama indeksi kur (index_<tür>/; route = "
+                             "deste/slayt merkezleri, bm25 = sözcüksel ters indeks, "
+                             "filtre = deste/madde bit eşlemleri, knn = ilgili slayt grafı)")
+    parser.add_argument("--knn-k",     type=int, default=0,
+                        help="knn: parça başına saklanacak komşu sayısı (0 = 10)")
+    parser.add_argument("--mode",      choices=SEARCH_MODES, default="dense",
+                        help="--search: dense (gömme), bm25 (sözcüksel, modelsiz) ya da hybrid (RRF)")
+    parser.add_argument("--rerank",    type=int, nargs="?", const=RERANK_CANDIDATES, default=0,
+                        help="--search: ilk N adayı cross-encoder ile yeniden sırala "
+                             f"(N verilmezse {RERANK_CANDIDATES}; model: {RERANK_MODEL})")
+    parser.add_argument("--index",     choices=("exact",) + SEARCH_INDEXES, default="exact",
+                        help="Arama yöntemi: exact (tam tarama) veya kayıtlı indeks")
+    parser.add_argument("--n-lists",   type=int, default=0,
+                        help="IVF küme sayısı (0 = ≈4·√N)")
+    parser.add_argument("--nprobe",    type=int,
+                        help="IVF: sorguda taranacak küme sayısı (varsayılan: 8)")
+    parser.add_argument("--ef-search", type=int,
+                        help="HNSW: sorgu ışın genişliği; büyüdükçe recall artar (varsayılan: 64)")
+    parser.add_argument("--route-decks", type=int,
+                        help="route: önce seçilecek en yakın deste sayısı (varsayılan: 8)")
+    parser.add_argument("--route-slides", type=int,
+                        help="route: parçaları puanlanacak en yakın slayt sayısı (varsayılan: 64)")
+    parser.add_argument("--pq-m",      type=int, default=0,
+                        help="PQ: parça başına kod baytı / alt uzay sayısı, 8–64 (0 = otomatik)")
+    parser.add_argument("--rescore",   type=int,
+                        help="PQ/binary: en iyi N adayı diskteki tam vektörlerle yeniden puanla "
+                             "(binary varsayılanı: 200)")
+    parser.add_argument("--recall-report", action="store_true",
+                        help="--index ile seçilen indeksin recall ve süresini tam aramayla karşılaştır")
+    parser.add_argument("--serve",     action="store_true",
+                        help="Modeli ve indeksi bellekte tutan yerel arama sunucusunu başlat")
+    parser.add_argument("--port",      type=int,
+                        help="Arama sunucusu portu (127.0.0.1, varsayılan: 8765)")
+    parser.add_argument("--no-daemon", action="store_true",
+                        help="--search için arama sunucusunu deneme, her şeyi bu işlemde yükle")
 
     args = parser.parse_args()
 
-    if not any([args.extract, args.vectorize, args.all, args.txt, args.search]):
+    if not any([args.extract, args.vectorize, args.all, args.txt, args.search, args.search_file,
+                args.serve, args.build_index, args.recall_report,
+                args.shard_size is not None, args.db, args.db_search, args.similar_to]):
         parser.print_help()
         return
 
     chunks = None
+    hashes = None
+    # --txt çıkarmayla birlikte istendiyse desteler ikinci kez okunmaz
+    txt_sinks: List[SlideSink] = [txt_sink(TXT_CIKTILAR_DIR)] if args.txt else []
+    txt_done = False
+    store_dtype = args.store_dtype or "float32"
+    # Dar tipli saklamada float32 akış ayrı dosyaya yazılır, save() sonrası silinir
+    stream_path = CIKTILAR_DIR / ("vectors.npy" if store_dtype == "float32" else "vectors.stream.npy")
+    vectorize_kwargs: Dict = {"token_budget": args.token_budget,
+                              "workers": args.embed_workers,
+                              "stream_path": stream_path}
+    if not args.no_cache:
+        vectorize_kwargs.update(cache_path=CIKTILAR_DIR / EMBED_CACHE_NAME,
+                                cache_max=args.cache_max)
+
+    # ── ARTIMLI GÜNCELLEME: --all + geçerli manifest ─────────────────────
+    manifest = load_manifest(CIKTILAR_DIR) if args.all and not args.full else None
+    if manifest is not None:
+        logger.info("━" * 50)
+        logger.info("ADIM 1-2 · Artımlı güncelleme (manifest)")
+        logger.info("━" * 50)
+        chunks = update_incremental(KAYNAKLAR_DIR, CIKTILAR_DIR, manifest,
+                                    jobs=args.jobs, engine=args.engine, sinks=txt_sinks,
+                                    vectorize_kwargs=vectorize_kwargs,
+                                    store_dtype=args.store_dtype, shard_rows=args.shard_size,
+                                    db=args.db or None)
 
     # ── ADIM 1: Metin çıkarma ────────────────────────────────────────────
-    if args.extract or args.all:
+    if (args.extract or args.all) and manifest is None:
         logger.info("━" * 50)
         logger.info("ADIM 1 · PPT'lerden metin çıkarılıyor")
         logger.info("━" * 50)
 
-        slides = extract_all(KAYNAKLAR_DIR)
+        if args.all:
+            hashes = hash_sources(KAYNAKLAR_DIR)
+        slides = extract_all(KAYNAKLAR_DIR, jobs=args.jobs, engine=args.engine,
+                             sinks=txt_sinks)
+        txt_done = bool(txt_sinks)
         if not slides:
             logger.error("Hiç metin çıkarılamadı, işlem durduruluyor.")
             sys.exit(1)
@@ -433,14 +2086,10 @@ def main():
         logger.info(f"{len(chunks)} metin parçası oluşturuldu.")
 
         # Ara çıktı – sonraki adımda lazım olabilir
-        CIKTILAR_DIR.mkdir(parents=True, exist_ok=True)
-        ext_path = CIKTILAR_DIR / "extracted_chunks.json"
-        with open(str(ext_path), "w", encoding="utf-8") as f:
-            json.dump(chunks, f, ensure_ascii=False, indent=2)
-        logger.info(f"Çıkarılan metinler → {ext_path}")
+        write_extracted(chunks, CIKTILAR_DIR)
 
     # ── ADIM 2: Vektörleştirme ───────────────────────────────────────────
-    if args.vectorize or args.all:
+    if (args.vectorize or args.all) and manifest is None:
         logger.info("━" * 50)
         logger.info("ADIM 2 · Vektörleştirme")
         logger.info("━" * 50)
@@ -454,8 +2103,16 @@ def main():
             with open(str(ext_path), "r", encoding="utf-8") as f:
                 chunks = json.load(f)
 
-        embeddings = vectorize(chunks)
-        save(embeddings, chunks, CIKTILAR_DIR)
+        embeddings = vectorize(chunks, **vectorize_kwargs)
+        save(embeddings, chunks, CIKTILAR_DIR, dtype=store_dtype, shard_rows=args.shard_size,
+             db=args.db or None)
+        del embeddings                  # akış dosyasının bellek eşlemesini bırak
+        if stream_path.name != "vectors.npy" and stream_path.exists():
+            stream_path.unlink()
+        if hashes is not None:
+            write_manifest(build_manifest(chunks, hashes), CIKTILAR_DIR)
+        else:
+            invalidate_manifest(CIKTILAR_DIR)
 
         logger.info("━" * 50)
         logger.info("İşlem tamamlandı!")
@@ -463,18 +2120,69 @@ def main():
         logger.info("━" * 50)
 
     # ── TXT DIŞA AKTARMA ─────────────────────────────────────────────────
-    if args.txt:
+    if args.txt and not txt_done:
         logger.info("━" * 50)
         logger.info("TXT · PPT'ler metin dosyalarına aktarılıyor")
         logger.info("━" * 50)
-        export_txt(KAYNAKLAR_DIR, TXT_CIKTILAR_DIR)
+        # Artımlı güncellemede yalnızca eksik/eski kalan TXT'ler için okuma yapılır
+        files = stale_txt_files(KAYNAKLAR_DIR, TXT_CIKTILAR_DIR) if manifest is not None else None
+        export_txt(KAYNAKLAR_DIR, TXT_CIKTILAR_DIR, jobs=args.jobs, engine=args.engine, files=files)
         logger.info("━" * 50)
         logger.info("TXT dışa aktarma tamamlandı!")
         logger.info("━" * 50)
 
+    # ── PARÇALI DEPO (vektörleştirme olmadan yeniden bölme) ──────────────
+    if args.shard_size is not None and not (args.vectorize or args.all):
+        build_shards(CIKTILAR_DIR, args.shard_size)
+    if args.db and not (args.vectorize or args.all):
+        build_db(CIKTILAR_DIR)
+
+    # ── YAKLAŞIK ARAMA İNDEKSİ ───────────────────────────────────────────
+    if args.build_index == "bm25":
+        build_bm25_index(CIKTILAR_DIR)
+    elif args.build_index == "filtre":
+        build_filter_index(CIKTILAR_DIR)
+    elif args.build_index == "route":
+        build_route_index(CIKTILAR_DIR)
+    elif args.build_index == "knn":
+        build_knn_graph(CIKTILAR_DIR, k=args.knn_k)
+    elif args.build_index:
+        params = {"ivf": {"n_lists": args.n_lists},
+                  "pq": {"m": args.pq_m}}.get(args.build_index, {})
+        build_ann_index(args.build_index, CIKTILAR_DIR, **params)
+
     # ── ARAMA ─────────────────────────────────────────────────────────────
+    knobs = {k: getattr(args, k) for k in ANN_KNOBS.get(args.index, ())
+             if getattr(args, k) is not None}
+    if args.db_search:
+        search_db(args.db_search, CIKTILAR_DIR, top_k=args.top_k, dosya=args.dosya)
+
     if args.search:
-        search(args.search, CIKTILAR_DIR, top_k=args.top_k)
+        from search_daemon import DEFAULT_PORT
+
+        search(args.search, CIKTILAR_DIR, top_k=args.top_k,
+               port=None if args.no_daemon else args.port or DEFAULT_PORT, index=args.index, knobs=knobs,
+               mode=args.mode, dosya=args.dosya, slayt=args.slayt_range, madde=args.madde,
+               rerank=args.rerank)
+
+    if args.similar_to:
+        similar_to(args.similar_to, CIKTILAR_DIR, top_k=args.top_k, index=args.index, knobs=knobs,
+                   dosya=args.dosya, slayt=args.slayt_range, madde=args.madde)
+
+    if args.recall_report:
+        if args.index == "exact":
+            logger.error("--recall-report için --index ile bir indeks türü seçin.")
+            sys.exit(1)
+        print_recall_report(evaluate_ann(args.index, CIKTILAR_DIR, knobs=knobs, top_k=args.top_k))
+
+    if args.search_file:
+        search_file(args.search_file, CIKTILAR_DIR, top_k=args.top_k, out_path=args.search_out)
+
+    # ── ARAMA SUNUCUSU ───────────────────────────────────────────────────
+    if args.serve:
+        from search_daemon import DEFAULT_PORT, serve
+
+        serve(CIKTILAR_DIR, MODEL_NAME, port=args.port or DEFAULT_PORT)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,148 @@
+"""
+PPTX Doğrudan XML Okuyucu
+=========================
+python-pptx nesne modelini (ve medya parçalarını) hiç kurmadan, slayt
+XML'lerini zip arşivinden artımlı (iterparse) olarak okur.
+
+Üretilen satırlar ppt_to_vectors._shape_texts ile birebir aynıdır:
+  • metin çerçevesi paragrafları (boş olanlar atlanır)
+  • tablo satırları  → dolu hücreler " | " ile birleştirilir
+  • grup şekilleri   → iç içe şekiller belge sırasıyla gezilir
+
+Yalnızca ppt/presentation.xml, ilgili .rels dosyaları ve slayt XML'leri
+okunur; resim/video gibi medya parçaları açılmaz.
+"""
+
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import List
+
+# ── XML AD ALANLARI ─────────────────────────────────────────────────────────
+_P   = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_A   = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_R   = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_OFFICE_DOCUMENT = "/officeDocument"
+
+# Slayt ağacı kökü: p:sld / p:cSld / p:spTree
+_SLIDE_ROOT = [_P + "sld", _P + "cSld", _P + "spTree"]
+# Tablo paragrafının şekle göre yolu
+_TABLE_PATH = [_P + "graphicFrame", _A + "graphic", _A + "graphicData",
+               _A + "tbl", _A + "tr", _A + "tc", _A + "txBody"]
+# Bellekten atılabilecek üst düzey şekil elemanları
+_SHAPE_TAGS = {_P + "sp", _P + "graphicFrame", _P + "pic", _P + "cxnSp", _P + "grpSp"}
+
+
+def _resolve(base_dir: str, target: str) -> str:
+    """Bir ilişki hedefini zip içindeki mutlak parça adına çevirir."""
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+def _rels(zf: zipfile.ZipFile, part_name: str) -> List[ET.Element]:
+    """Bir parçanın .rels dosyasındaki Relationship elemanlarını döndürür."""
+    base, name = posixpath.split(part_name)
+    rels_name = posixpath.join(base, "_rels", name + ".rels")
+    try:
+        root = ET.fromstring(zf.read(rels_name))
+    except KeyError:
+        return []
+    return list(root.iter(_REL + "Relationship"))
+
+
+def slide_part_names(zf: zipfile.ZipFile) -> List[str]:
+    """Slayt parçalarını sunumdaki gösterim sırasıyla (sldIdLst) döndürür."""
+    pres_name = "ppt/presentation.xml"
+    for rel in _rels(zf, ""):
+        if rel.get("Type", "").endswith(_OFFICE_DOCUMENT):
+            pres_name = _resolve("", rel.get("Target", pres_name))
+            break
+
+    targets = {rel.get("Id"): rel.get("Target") for rel in _rels(zf, pres_name)}
+    pres = ET.fromstring(zf.read(pres_name))
+    sld_id_lst = pres.find(_P + "sldIdLst")
+    if sld_id_lst is None:
+        return []
+
+    base_dir = posixpath.dirname(pres_name)
+    names: List[str] = []
+    for sld_id in sld_id_lst.iter(_P + "sldId"):
+        target = targets.get(sld_id.get(_R + "id"))
+        if target:
+            names.append(_resolve(base_dir, target))
+    return names
+
+
+def _in_shape_tree(path: List[str]) -> bool:
+    """Yol, spTree altında yalnızca grup şekillerinden mi geçiyor?"""
+    return (path[:3] == _SLIDE_ROOT
+            and all(tag == _P + "grpSp" for tag in path[3:]))
+
+
+def _slide_texts(stream) -> List[str]:
+    """Tek bir slayt XML akışından metin satırlarını çıkarır."""
+    texts: List[str] = []
+    path: List[str] = []
+    para: List[str] = []        # geçerli paragrafın parçaları
+    cell_paras: List[str] = []  # geçerli tablo hücresinin paragrafları
+    row_cells: List[str] = []   # geçerli tablo satırının dolu hücreleri
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            path.append(elem.tag)
+            continue
+
+        tag = path.pop()
+
+        if tag == _A + "t":
+            # a:r / a:fld içindeki metin, doğrudan a:p altındaysa
+            if len(path) >= 2 and path[-2] == _A + "p" and path[-1] in (_A + "r", _A + "fld"):
+                para.append(elem.text or "")
+
+        elif tag == _A + "br":
+            if path and path[-1] == _A + "p":
+                para.append("\v")   # python-pptx satır sonunu \v olarak verir
+
+        elif tag == _A + "p":
+            text = "".join(para)
+            para = []
+            if path[-2:] == [_P + "sp", _P + "txBody"] and _in_shape_tree(path[:-2]):
+                line = text.strip()
+                if line:
+                    texts.append(line)
+            elif path[-7:] == _TABLE_PATH and _in_shape_tree(path[:-7]):
+                cell_paras.append(text)
+
+        elif tag == _A + "tc":
+            cell_text = "\n".join(cell_paras).strip()
+            cell_paras = []
+            if cell_text:
+                row_cells.append(cell_text)
+
+        elif tag == _A + "tr":
+            if row_cells:
+                texts.append(" | ".join(row_cells))
+            row_cells = []
+
+        elif tag in _SHAPE_TAGS and _in_shape_tree(path):
+            elem.clear()    # işlenen şeklin alt ağacını bellekten at
+
+    return texts
+
+
+def read_slide_texts(file_path: Path) -> List[List[str]]:
+    """
+    Bir PPTX dosyasının her slaytı için metin satırı listesini döndürür.
+    Boş slaytlar da (boş liste olarak) yer alır; böylece indeks + 1
+    python-pptx'teki slayt numarasıyla eşleşir.
+    """
+    with zipfile.ZipFile(str(file_path)) as zf:
+        result: List[List[str]] = []
+        for name in slide_part_names(zf):
+            with zf.open(name) as stream:
+                result.append(_slide_texts(stream))
+        return result
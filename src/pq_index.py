@@ -0,0 +1,158 @@
+"""
+Ürün Nicemleme (Product Quantization) İndeksi
+=============================================
+Her vektör m alt uzaya bölünür; her alt uzayda 256 merkezli bir kod kitabı
+(k-means) eğitilir ve vektör, alt uzay başına 1 baytlık merkez numarasıyla
+saklanır. 384 boyutlu float32 vektör (1536 bayt) m = 32 ile 32 bayta iner.
+
+Sorguda asimetrik mesafe (ADC): sorgu sıkıştırılmaz; her alt uzay için
+sorgu · merkez iç çarpım tablosu (m × 256) bir kez hesaplanır ve bir
+parçanın yaklaşık skoru m tablo değerinin toplamıdır. İsteğe bağlı olarak
+en iyi `rescore` aday, diskteki tam vektörlerle (vectors.npy) yeniden
+puanlanır.
+
+Disk biçimi (ann_store): ids (n,) int64, codebooks (m, 256, d/m) float32,
+codes (m, n) uint8 — alt uzay başına ardışık; ADC toplamı her alt uzayda tek
+bir ardışık take() ile yapılır.
+"""
+
+import logging
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+KSUB = 256                      # alt uzay başına merkez (uint8 kod)
+_TRAIN_MAX = 65536              # kod kitabı eğitimindeki en fazla örnek
+_ENCODE_BLOCK = 65536           # kodlamanın satır bloğu
+_CODE_SIZES = (8, 16, 24, 32, 48, 64)
+
+
+def valid_m(d: int) -> List[int]:
+    """d'yi bölen kod boyları (8–64 bayt); hiçbiri bölmüyorsa [1]."""
+    return [m for m in _CODE_SIZES if m <= d and d % m == 0] or [1]
+
+
+def default_m(d: int) -> int:
+    """d'yi bölen, 32 bayta en yakın kod boyu (8–64 bayt)."""
+    return min(valid_m(d), key=lambda m: abs(m - 32))
+
+
+def _kmeans_l2(x, k: int, iters: int, rng):
+    """Öklid k-means (alt uzay kod kitapları için). (k, dsub) merkez döner."""
+    import numpy as np
+
+    c = x[rng.choice(len(x), size=k, replace=False)].copy()
+    for _ in range(iters):
+        # ‖x − c‖² = ‖x‖² − 2·x·c + ‖c‖²  (‖x‖² argmin'i etkilemez)
+        etiket = np.argmin((c * c).sum(axis=1) - 2 * x @ c.T, axis=1)
+        sayi = np.bincount(etiket, minlength=k)
+        yeni = np.zeros_like(c)
+        np.add.at(yeni, etiket, x)
+        dolu = sayi > 0
+        yeni[dolu] /= sayi[dolu, None]
+        yeni[~dolu] = x[rng.choice(len(x), size=int((~dolu).sum()), replace=False)]
+        if np.allclose(yeni, c, atol=1e-6):
+            break
+        c = yeni
+    return c
+
+
+def encode(vectors, codebooks):
+    """Vektörleri (n, m) uint8 kodlara çevirir (bloklu)."""
+    import numpy as np
+
+    m, ksub, dsub = codebooks.shape
+    normlar = (codebooks * codebooks).sum(axis=2)          # (m, ksub)
+    codes = np.empty((len(vectors), m), dtype=np.uint8)
+    for b in range(0, len(vectors), _ENCODE_BLOCK):
+        x = np.asarray(vectors[b:b + _ENCODE_BLOCK], dtype=np.float32).reshape(-1, m, dsub)
+        for j in range(m):
+            codes[b:b + len(x), j] = np.argmin(normlar[j] - 2 * x[:, j] @ codebooks[j].T, axis=1)
+    return codes
+
+
+def build(vectors, rows, m: int = 0, iters: int = 20, seed: int = 0) -> Tuple[Dict, Dict]:
+    """vectors[rows] üzerinde kod kitaplarını eğitir ve kodları üretir."""
+    import numpy as np
+
+    rows = np.asarray(rows, dtype=np.int64)
+    x = np.asarray(vectors[rows], dtype=np.float32)
+    d = x.shape[1]
+    m = m or default_m(d)
+    if m not in valid_m(d):
+        raise ValueError(f"PQ: kod boyu {m} geçersiz; {d} boyut için {valid_m(d)} olmalı")
+    dsub, ksub = d // m, min(KSUB, len(x))
+
+    rng = np.random.default_rng(seed)
+    egitim = x if len(x) <= _TRAIN_MAX else x[rng.choice(len(x), size=_TRAIN_MAX, replace=False)]
+    logger.info(f"PQ: {len(egitim)} örnekle {m} alt uzay × {ksub} merkez eğitiliyor...")
+    codebooks = np.zeros((m, KSUB, dsub), dtype=np.float32)
+    for j in range(m):
+        codebooks[j, :ksub] = _kmeans_l2(egitim[:, j * dsub:(j + 1) * dsub], ksub, iters, rng)
+    codebooks = codebooks[:, :ksub]
+
+    codes = np.ascontiguousarray(encode(x, codebooks).T)
+    logger.info(f"PQ: parça başına {m} bayt (float32: {d * 4} bayt)")
+    return {"ids": rows, "codebooks": codebooks, "codes": codes}, {"tur": "pq", "m": int(m)}
+
+
+def update(index: Dict, vectors, eski_to_yeni, tekil_satirlar) -> Tuple[Dict, Dict]:
+    """
+    Artımlı güncelleme: kod kitapları korunur; satırlar yeniden numaralanır,
+    artık tekil olmayanlar çıkarılır, yeni tekil satırlar kodlanıp eklenir.
+    """
+    import numpy as np
+
+    codebooks = np.asarray(index["codebooks"])
+    tekil = np.asarray(tekil_satirlar, dtype=np.int64)
+    ids = np.asarray(eski_to_yeni, dtype=np.int64)[np.asarray(index["ids"])]
+    keep = (ids >= 0) & np.isin(ids, tekil)
+    eklenecek = np.setdiff1d(tekil, ids[keep])
+
+    ids = np.concatenate([ids[keep], eklenecek])
+    codes = np.concatenate([np.asarray(index["codes"])[:, keep],
+                            encode(vectors[eklenecek], codebooks).T], axis=1)
+    logger.info(f"PQ: {int((~keep).sum())} satır çıkarıldı, {len(eklenecek)} satır eklendi")
+    return ({"ids": ids, "codebooks": codebooks, "codes": codes},
+            {"tur": "pq", "m": int(codebooks.shape[0])})
+
+
+def adc_scores(index: Dict, q):
+    """Tüm kodlar için yaklaşık iç çarpım skorları (n,) float32."""
+    import numpy as np
+
+    codebooks, codes = index["codebooks"], index["codes"]
+    m, _, dsub = codebooks.shape
+    tablo = np.einsum("jkd,jd->jk", codebooks, q.reshape(m, dsub))    # (m, ksub)
+    skor = np.zeros(codes.shape[1], dtype=np.float32)
+    for j in range(m):
+        skor += tablo[j].take(codes[j])
+    return skor
+
+
+def search(index: Dict, vectors, q, k: int, rescore: int = 0):
+    """
+    Tek bir normalize sorgu için en iyi k (satır, skor) çiftini döndürür.
+    rescore > 0 ise ADC'ye göre en iyi max(rescore, k) aday vectors.npy'deki
+    tam vektörlerle yeniden puanlanır; aksi halde skorlar yaklaşıktır.
+    """
+    import numpy as np
+
+    q = np.asarray(q, dtype=np.float32).ravel()
+    ids = index["ids"]
+    if len(ids) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    skor = adc_scores(index, q)
+
+    n_aday = min(max(rescore, k), len(skor))
+    aday = np.argpartition(-skor, n_aday - 1)[:n_aday]
+    if rescore > 0:
+        satir = np.sort(np.asarray(ids)[aday])        # vectors.npy'de ileri yönlü okuma
+        skor_aday = np.asarray(vectors[satir], dtype=np.float32) @ q
+    else:
+        satir, skor_aday = np.asarray(ids)[aday], skor[aday]
+
+    k = min(k, len(satir))
+    en_iyi = np.argpartition(-skor_aday, k - 1)[:k]
+    en_iyi = en_iyi[np.argsort(-skor_aday[en_iyi], kind="stable")]
+    return satir[en_iyi], skor_aday[en_iyi]
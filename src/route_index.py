@@ -0,0 +1,118 @@
+"""
+Deste → Slayt → Parça Yönlendirme İndeksi
+=========================================
+Parçalar slaytlara, slaytlar destelere aittir. save() sırasında her slayt
+ve deste için parça vektörlerinin normalize ortalaması (merkez vektörü)
+hesaplanır. Sorguda önce en yakın route_decks deste, bu destelerin
+slaytları arasından en yakın route_slides slayt seçilir; yalnızca bu
+slaytların parçaları tam iç çarpımla puanlanır. Maliyet toplam parça
+sayısına değil, seçilen slaytların parça sayısına bağlıdır.
+
+Disk biçimi (ann_store, index_route/):
+  deck_centroids  (D, d)  float32   deste merkezleri
+  deck_offsets    (D+1,)  int64     deste l'nin slaytları: [deck_offsets[l], deck_offsets[l+1])
+  slide_centroids (S, d)  float32   slayt merkezleri (deste sırasına göre)
+  slayt_no        (S,)    int32
+  slide_offsets   (S+1,)  int64     slayt s'nin parçaları: ids[slide_offsets[s]:slide_offsets[s+1]]
+  ids             (P,)    int64     tekil vectors.npy satırları (kopya başka slayttaysa
+                                    aynı satır o slaytta da yer alır)
+meta.json: dosyalar (deck_centroids satır sırası)
+"""
+
+import logging
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DECKS = 8
+DEFAULT_SLIDES = 64
+_SUM_BLOCK = 65536              # merkez toplamlarının satır bloğu
+
+
+def _normalize(x):
+    import numpy as np
+
+    return (x / np.maximum(np.linalg.norm(x, axis=1, keepdims=True), 1e-12)).astype(np.float32)
+
+
+def build(vectors, chunks: List[Dict]) -> Tuple[Dict, Dict]:
+    """
+    Parça listesinden slayt / deste merkezlerini ve slayt başına tekil
+    satır listelerini hesaplar. (diziler, meta) döndürür.
+    """
+    import numpy as np
+
+    kayitlar = [(c["dosya"], c["slayt_no"], c.get("ortak_vektor", c["id"])) for c in chunks]
+    n = len(kayitlar)
+    dosyalar = sorted({k[0] for k in kayitlar})
+    kod = {d: i for i, d in enumerate(dosyalar)}
+    deste = np.fromiter((kod[k[0]] for k in kayitlar), dtype=np.int64, count=n)
+    slayt = np.fromiter((k[1] for k in kayitlar), dtype=np.int64, count=n)
+    ortak = np.fromiter((k[2] for k in kayitlar), dtype=np.int64, count=n)
+
+    # (deste, slayt) → slayt sırası; slayt içinde aynı tekil satır bir kez sayılır
+    sira = np.lexsort((ortak, slayt, deste))
+    deste, slayt, ortak = deste[sira], slayt[sira], ortak[sira]
+    yeni_slayt = np.ones(n, dtype=bool)
+    yeni_slayt[1:] = (deste[1:] != deste[:-1]) | (slayt[1:] != slayt[:-1])
+    tekrar = np.zeros(n, dtype=bool)
+    tekrar[1:] = ~yeni_slayt[1:] & (ortak[1:] == ortak[:-1])
+    yeni_slayt, deste, slayt, ortak = yeni_slayt[~tekrar], deste[~tekrar], slayt[~tekrar], ortak[~tekrar]
+
+    uye = np.cumsum(yeni_slayt) - 1                 # satır → slayt sırası
+    bas = np.flatnonzero(yeni_slayt)
+    n_slayt = len(bas)
+    slide_offsets = np.append(bas, len(ortak)).astype(np.int64)
+    slayt_deste = deste[bas]
+    deck_offsets = np.searchsorted(slayt_deste, np.arange(len(dosyalar) + 1)).astype(np.int64)
+
+    toplam = np.zeros((n_slayt, vectors.shape[1]), dtype=np.float64)
+    for b in range(0, len(ortak), _SUM_BLOCK):
+        satir = ortak[b:b + _SUM_BLOCK]
+        sira_oku = np.argsort(satir, kind="stable")   # vectors.npy'de ileri yönlü okuma
+        blok = np.asarray(vectors[satir[sira_oku]], dtype=np.float32)
+        np.add.at(toplam, uye[b:b + _SUM_BLOCK][sira_oku], blok)
+    deste_toplam = np.zeros((len(dosyalar), vectors.shape[1]), dtype=np.float64)
+    np.add.at(deste_toplam, slayt_deste, toplam)
+
+    logger.info(f"Yönlendirme: {len(dosyalar)} deste, {n_slayt} slayt, {len(ortak)} parça kaydı")
+    arrays = {"deck_centroids": _normalize(deste_toplam), "deck_offsets": deck_offsets,
+              "slide_centroids": _normalize(toplam), "slayt_no": slayt[bas].astype(np.int32),
+              "slide_offsets": slide_offsets, "ids": ortak}
+    return arrays, {"tur": "route", "dosyalar": dosyalar}
+
+
+def search(index: Dict, vectors, q, k: int, route_decks: int = DEFAULT_DECKS,
+           route_slides: int = DEFAULT_SLIDES):
+    """
+    Tek bir normalize sorgu için en iyi k (satır, skor) çiftini döndürür.
+    route_decks ve route_slides tüm deste/slayt sayısına eşitse sonuç tam
+    aramayla aynıdır.
+    """
+    import numpy as np
+
+    q = np.asarray(q, dtype=np.float32).ravel()
+    deck_centroids, deck_offsets = index["deck_centroids"], index["deck_offsets"]
+    slide_offsets, ids = index["slide_offsets"], index["ids"]
+    if len(deck_centroids) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    # 1) Desteler
+    nd = min(max(route_decks, 1), len(deck_centroids))
+    d_skor = np.asarray(deck_centroids, dtype=np.float32) @ q
+    desteler = np.sort(np.argpartition(-d_skor, nd - 1)[:nd])
+
+    # 2) Seçilen destelerin slaytları (her deste ardışık bir aralık)
+    slaytlar = np.concatenate([np.arange(deck_offsets[d], deck_offsets[d + 1]) for d in desteler])
+    s_skor = np.asarray(index["slide_centroids"][slaytlar], dtype=np.float32) @ q
+    ns = min(max(route_slides, 1), len(slaytlar))
+    slaytlar = slaytlar[np.argpartition(-s_skor, ns - 1)[:ns]]
+
+    # 3) Seçilen slaytların parçaları
+    aday = np.unique(np.concatenate([ids[slide_offsets[s]:slide_offsets[s + 1]] for s in slaytlar]))
+    skor = np.asarray(vectors[aday], dtype=np.float32) @ q
+
+    k = min(k, len(aday))
+    en_iyi = np.argpartition(-skor, k - 1)[:k]
+    en_iyi = en_iyi[np.argsort(-skor[en_iyi], kind="stable")]
+    return aday[en_iyi], skor[en_iyi]
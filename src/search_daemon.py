@@ -0,0 +1,264 @@
+"""
+Sıcak Arama Sunucusu
+====================
+Modeli ve vektör indeksini bellekte tutan, yalnızca 127.0.0.1'i dinleyen
+uzun ömürlü bir HTTP sunucusu. `--search` (ve ARA.bat) çalışan bir sunucu
+bulursa sorguyu ona iletir; torch içe aktarımı, model yükleme ve
+vectors.npy okuma her aramada tekrarlanmaz.
+
+Uç noktalar (JSON):
+  GET  /durum  → {"model", "dizin", "parca"}
+  POST /ara    ← {"sorgu", "top_k", "model", "dizin", "index", "knobs", "mod", "filtre",
+                  "rerank"}
+               → {"sonuclar": [...]}
+
+vectors.npy veya metadata.json değişirse (ör. --all yeniden çalıştı)
+indeks bir sonraki sorguda diskten tazelenir; yaklaşık arama indeksleri
+(index_<tür>/) ve BM25 ters indeksi de ilk kullanımda yüklenir ve yeniden
+kurulunca tazelenir. rerank > 0 istenirse cross-encoder ilk istekte
+yüklenir ve sunucu kapanana kadar bellekte kalır.
+
+Kullanım:
+    python ppt_to_vectors.py --serve               # sunucuyu başlat (Ctrl+C ile durur)
+    python ppt_to_vectors.py --search "açık rıza"   # sunucu açıksa ona sorar
+"""
+
+import json
+import logging
+import threading
+import time
+import urllib.error
+import urllib.request
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+CLIENT_TIMEOUT = 30.0   # sn; sunucu yoksa bağlantı zaten anında reddedilir
+
+
+class _Index:
+    """Diskteki indeksin bellek kopyası; dosyalar değişince yeniden yüklenir."""
+
+    def __init__(self, out_dir: Path):
+        self.out_dir = out_dir
+        self.embeddings = None
+        self.chunks: List[Dict] = []
+        self._imza = None
+        self._ann: Dict = {}        # tür → (meta.json imzası, indeks veya None)
+        self._lock = threading.Lock()
+
+    def _dosya_imzasi(self):
+        return tuple(
+            (p.stat().st_mtime_ns, p.stat().st_size)
+            for p in (self.out_dir / "vectors.npy", self.out_dir / "metadata.json")
+        )
+
+    def current(self):
+        """Güncel (embeddings, chunks) çiftini döndürür; gerekirse diskten tazeler."""
+        from ppt_to_vectors import load_index
+
+        with self._lock:
+            imza = self._dosya_imzasi()
+            if imza != self._imza:
+                embeddings, chunks = load_index(self.out_dir)
+                if embeddings.shape[0] != len(chunks):
+                    # Yazım sürüyor (vectors.npy yeni, metadata eski) → eskisiyle devam
+                    if self.embeddings is not None:
+                        return self.embeddings, self.chunks
+                    raise RuntimeError("vectors.npy ile metadata.json satır sayısı uyuşmuyor")
+                self.embeddings, self.chunks, self._imza = embeddings, chunks, imza
+                self._ann.clear()
+                logger.info(f"İndeks yüklendi: {len(chunks)} parça")
+            return self.embeddings, self.chunks
+
+    def ann(self, tur: str, embeddings) -> Optional[Dict]:
+        """
+        Yaklaşık arama indeksini (yoksa/bayatsa None) önbellekten döndürür.
+        tur "bm25" ise BM25 ters indeksi, "filtre" ise filtre bit eşlemleri,
+        "knn" ise ilgili slayt grafı döner.
+        """
+        from ann_store import META_NAME, index_dir
+        from ppt_to_vectors import (load_ann_index, load_bm25_index, load_filter_index,
+                                    load_knn_graph)
+
+        meta = index_dir(self.out_dir, tur) / META_NAME
+        imza = meta.stat().st_mtime_ns if meta.exists() else None
+        with self._lock:
+            if tur not in self._ann or self._ann[tur][0] != imza:
+                yukle = {"bm25": load_bm25_index, "filtre": load_filter_index,
+                         "knn": load_knn_graph}.get(
+                    tur, partial(load_ann_index, tur))
+                self._ann[tur] = (imza, yukle(self.out_dir, embeddings))
+            return self._ann[tur][1]
+
+
+def make_server(out_dir: Path, model, model_name: str,
+                host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                reranker=None) -> ThreadingHTTPServer:
+    """
+    Verilen (yüklenmiş) modelle sorgu yanıtlayan HTTP sunucusunu kurar.
+    reranker verilmezse gerektiğinde load_reranker() ile yüklenir.
+    """
+    import filter_index
+    from ppt_to_vectors import (ANN_KNOBS, SEARCH_INDEXES, SEARCH_MODES, attach_related,
+                                bm25_rank, hybrid_rank, load_reranker, rank, rerank_hits)
+
+    index = _Index(out_dir)
+    index.current()
+    encode_lock = threading.Lock()
+    dizin = str(out_dir.resolve())
+    capraz = [reranker]
+
+    def _reranker():
+        with encode_lock:
+            if capraz[0] is None:
+                capraz[0] = load_reranker()
+            return capraz[0]
+
+    class Handler(BaseHTTPRequestHandler):
+        def _yanit(self, kod: int, govde: Dict):
+            data = json.dumps(govde, ensure_ascii=False).encode("utf-8")
+            self.send_response(kod)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path != "/durum":
+                self._yanit(404, {"hata": "bilinmeyen yol"})
+                return
+            _, chunks = index.current()
+            self._yanit(200, {"model": model_name, "dizin": dizin, "parca": len(chunks)})
+
+        def do_POST(self):
+            if self.path != "/ara":
+                self._yanit(404, {"hata": "bilinmeyen yol"})
+                return
+            try:
+                istek = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                sorgu, top_k = str(istek["sorgu"]), int(istek.get("top_k", 5))
+                tur, knobs = str(istek.get("index", "exact")), dict(istek.get("knobs") or {})
+                mod = str(istek.get("mod", "dense"))
+                rerank = int(istek.get("rerank") or 0)
+                secim = dict(istek.get("filtre") or {})
+                slayt = secim.get("slayt")
+                secim = {"dosya": secim.get("dosya"),
+                         "slayt": None if slayt is None else (int(slayt[0]), int(slayt[1])),
+                         "madde": [int(m) for m in secim.get("madde") or []]}
+                if (tur != "exact" and tur not in SEARCH_INDEXES) or mod not in SEARCH_MODES:
+                    raise ValueError(f"bilinmeyen indeks/mod: {tur}/{mod}")
+                if top_k < 1 or rerank < 0:
+                    raise ValueError("top_k ≥ 1, rerank ≥ 0 olmalı")
+                for ad, deger in knobs.items():
+                    if ad not in ANN_KNOBS.get(tur, ()):
+                        raise ValueError(f"{tur} için bilinmeyen ayar: {ad}")
+                    if type(deger) is not int or deger < (0 if ad == "rescore" else 1):
+                        raise ValueError(f"geçersiz {ad}: {deger!r}")
+            except (ValueError, KeyError, TypeError, IndexError) as e:
+                self._yanit(400, {"hata": f"geçersiz istek: {e}"})
+                return
+            if istek.get("model", model_name) != model_name or istek.get("dizin", dizin) != dizin:
+                self._yanit(409, {"hata": "sunucu farklı bir model/dizin için çalışıyor"})
+                return
+            try:
+                kod, govde = self._ara(sorgu, top_k, tur, knobs, mod, rerank, secim)
+            except Exception as e:     # bağlantı kopmasın: hata JSON olarak dönsün
+                logger.exception(f"\"{sorgu[:40]}\" aranamadı")
+                kod, govde = 500, {"hata": f"{type(e).__name__}: {e}"}
+            self._yanit(kod, govde)
+
+        def _ara(self, sorgu: str, top_k: int, tur: str, knobs: Dict, mod: str,
+                 rerank: int, secim: Dict):
+            """Doğrulanmış isteği yanıtlar; (HTTP kodu, gövde) döndürür."""
+            reranker = _reranker() if rerank > 0 else None
+            n = max(top_k, rerank) if reranker is not None else top_k
+            t0 = time.perf_counter()
+            embeddings, chunks = index.current()
+            ann = index.ann(tur, embeddings) if tur != "exact" else None
+            bm25 = index.ann("bm25", embeddings) if mod != "dense" else None
+            filtre = None
+            if secim["dosya"] is not None or secim["slayt"] is not None or secim["madde"]:
+                bitler = index.ann("filtre", embeddings)
+                if bitler is None:
+                    return 409, {"hata": "filtre indeksi yok ya da bayat"}
+                filtre = filter_index.select(bitler, **secim)
+            if mod == "bm25":
+                if bm25 is None:
+                    return 409, {"hata": "BM25 indeksi yok ya da bayat; --build-index bm25 ile kurun"}
+                sonuclar = bm25_rank(bm25, chunks, sorgu, n, filtre=filtre)
+            else:
+                with encode_lock:
+                    q_vec = model.encode([sorgu], normalize_embeddings=True)
+                if mod == "hybrid":
+                    sonuclar = hybrid_rank(embeddings, chunks, bm25, q_vec, sorgu, n,
+                                           ann=ann, knobs=knobs, filtre=filtre)
+                else:
+                    sonuclar = rank(embeddings, chunks, q_vec, n, ann=ann, knobs=knobs,
+                                    filtre=filtre)
+            sure = f"{(time.perf_counter() - t0) * 1000:.1f} ms"
+            if reranker is not None:
+                t1 = time.perf_counter()
+                with encode_lock:
+                    sonuclar = rerank_hits(reranker, sorgu, sonuclar, top_k)
+                sure += f" + yeniden sıralama {(time.perf_counter() - t1) * 1000:.1f} ms"
+            attach_related(index.ann("knn", embeddings), chunks, sonuclar)
+            logger.info(f"\"{sorgu[:40]}\" → {len(sonuclar)} sonuç ({sure})")
+            return 200, {"sonuclar": sonuclar}
+
+        def log_message(self, format, *args):   # http.server'ın stderr satırlarını sustur
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def serve(out_dir: Path, model_name: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    """Modeli yükler ve sunucuyu Ctrl+C'ye kadar çalıştırır."""
+    from sentence_transformers import SentenceTransformer
+
+    logger.info(f"Model yükleniyor: {model_name}")
+    model = SentenceTransformer(model_name)
+    server = make_server(out_dir, model, model_name, host, port)
+    logger.info(f"Arama sunucusu hazır → http://{host}:{port}  (durdurmak için Ctrl+C)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Arama sunucusu durduruldu.")
+    finally:
+        server.server_close()
+
+
+def query_daemon(sorgu: str, top_k: int, model_name: str, out_dir: Path,
+                 host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 timeout: float = CLIENT_TIMEOUT, index: str = "exact",
+                 knobs: Optional[Dict] = None, mode: str = "dense",
+                 filtre: Optional[Dict] = None, rerank: int = 0) -> Optional[List[Dict]]:
+    """
+    Sorguyu çalışan sunucuya iletir ve sonuç listesini döndürür.
+    Sunucu yoksa ya da farklı model/dizin için çalışıyorsa None döner.
+    filtre: {"dosya", "slayt", "madde"} (bkz. ppt_to_vectors.select_rows).
+    """
+    govde = json.dumps({
+        "sorgu": sorgu, "top_k": top_k, "model": model_name,
+        "dizin": str(out_dir.resolve()), "index": index, "knobs": knobs or {},
+        "mod": mode, "filtre": filtre, "rerank": rerank,
+    }).encode("utf-8")
+    istek = urllib.request.Request(
+        f"http://{host}:{port}/ara", data=govde,
+        headers={"Content-Type": "application/json"},
+    )
+    # Ortamdaki HTTP(S)_PROXY ayarı yerel bağlantıya karışmasın
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    try:
+        with opener.open(istek, timeout=timeout) as yanit:
+            return json.loads(yanit.read())["sonuclar"]
+    except urllib.error.HTTPError as e:
+        logger.warning(f"Arama sunucusu isteği reddetti ({e.code}); yerel arama yapılıyor.")
+    except (OSError, ValueError, KeyError):
+        pass    # sunucu çalışmıyor
+    return None
@@ -0,0 +1,96 @@
+"""
+Düşük Hassasiyetli Vektör Saklama
+=================================
+vectors.npy isteğe bağlı olarak float32 yerine daha dar bir tiple yazılır:
+
+  • float16 – 2 bayt/boyut; tarama sırasında bloklar float32'ye çevrilir.
+              NumPy bu dönüşümü vektörleştirmediği için tek sorguluk tam
+              tarama float32'den birkaç kat yavaştır (toplu aramada fark
+              azalır); bellek ve hız birlikte gerekiyorsa int8 seçilmeli
+  • int8    – 1 bayt/boyut; boyut başına simetrik ölçek:
+              olcek[j] = max|x[:, j]| / 127,  x ≈ int8 · olcek
+
+Tip ve ölçekler metadata.json'da ("vektor_tipi", "olcek") saklanır.
+load_index, dar tipli matrisi ScaledVectors ile sarar: satır erişimi
+float32 döndürür, matris–vektör çarpımında ölçekler sorguya katlanır
+(x · q = int8 · (olcek ⊙ q)) ve matrisin float32 kopyası hiç oluşmaz.
+"""
+
+from typing import Dict, Optional, Tuple
+
+STORE_DTYPES = ("float32", "float16", "int8")
+_SCORE_BLOCK = 4096             # çarpımda float32'ye çevrilen satır bloğu (önbelleğe sığar)
+
+
+def quantize(embeddings, dtype: str) -> Tuple[object, Dict]:
+    """
+    float32 vektörleri saklama tipine çevirir.
+    (dizi, metadata alanları) döndürür.
+    """
+    import numpy as np
+
+    if dtype == "float32":
+        return np.asarray(embeddings, dtype=np.float32), {"vektor_tipi": "float32"}
+    if dtype == "float16":
+        return np.asarray(embeddings).astype(np.float16), {"vektor_tipi": "float16"}
+    if dtype == "int8":
+        x = np.asarray(embeddings, dtype=np.float32)
+        olcek = np.abs(x).max(axis=0) / 127.0 if len(x) else np.ones(x.shape[1], np.float32)
+        olcek = np.where(olcek > 0, olcek, 1.0).astype(np.float32)
+        q = np.clip(np.rint(x / olcek), -127, 127).astype(np.int8)
+        return q, {"vektor_tipi": "int8", "olcek": olcek.tolist()}
+    raise ValueError(f"Bilinmeyen vektör tipi: {dtype}")
+
+
+class ScaledVectors:
+    """
+    float16/int8 saklanan matrisin float32 gibi kullanılabilen görünümü.
+    Yalnızca aramanın ihtiyaç duyduğu işlemleri destekler: shape, len,
+    satır/dilim erişimi (float32 döner) ve `@` ile bloklu çarpım.
+    """
+
+    def __init__(self, raw, olcek: Optional[object] = None):
+        import numpy as np
+
+        self.raw = raw
+        self.olcek = None if olcek is None else np.asarray(olcek, dtype=np.float32)
+        self.shape = raw.shape
+        self.dtype = np.dtype(np.float32)
+        self.nbytes = raw.nbytes
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        import numpy as np
+
+        x = np.asarray(self.raw[key], dtype=np.float32)
+        return x if self.olcek is None else x * self.olcek
+
+    def __matmul__(self, other):
+        """
+        (n, d) @ (d, k) → (n, k) float32. Bloklar yeniden kullanılan float32
+        tampona açılıp BLAS ile çarpılır; int8'de ölçekler sağ tarafa katlanır,
+        float16'da ölçek yoktur ve blok olduğu gibi çarpılır.
+        """
+        import numpy as np
+
+        other = np.asarray(other, dtype=np.float32)
+        if self.olcek is not None:
+            other = (other.T * self.olcek).T
+        out = np.empty((self.shape[0],) + other.shape[1:], dtype=np.float32)
+        tampon = np.empty((min(_SCORE_BLOCK, self.shape[0]), self.shape[1]), dtype=np.float32)
+        for b in range(0, self.shape[0], _SCORE_BLOCK):
+            blok = self.raw[b:b + _SCORE_BLOCK]
+            n = len(blok)
+            np.copyto(tampon[:n], blok, casting="unsafe")
+            np.matmul(tampon[:n], other, out=out[b:b + n])
+        return out
+
+
+def wrap(raw, meta: Dict):
+    """metadata.json'daki tipe göre ham diziyi aramaya hazır hale getirir."""
+    tip = meta.get("vektor_tipi", "float32")
+    if tip == "float32":
+        return raw
+    return ScaledVectors(raw, meta.get("olcek") if tip == "int8" else None)
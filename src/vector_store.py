@@ -0,0 +1,176 @@
+"""
+Parçalı (Sharded) Vektör Deposu
+===============================
+vectors.npy'nin sabit boyutlu satır aralıklarına (parçalara) bölünmüş görünümü.
+Arama, tüm matrisi RAM'e ve tüm metadata'yı JSON olarak okumak yerine
+vectors.npy'yi mmap ile açar ve parçaları bir iş parçacığı havuzunda tarar.
+Her parça blok blok puanlanır ve yalnızca top_k boyutlu bir yığın (heap)
+tutar; bellek kullanımı derlem büyüklüğünden bağımsızdır. Metadata yalnızca
+kazanan satırlar için sütunlu depodan (columns/, bkz. chunk_columns) okunur.
+
+Parçalı depo veri kopyalamaz: shards/ klasöründe yalnızca manifest bulunur,
+vektörler vectors.npy'de, parça kayıtları columns/ altında kalır. Bu yüzden
+parçalı tarama yalnızca filtresiz, yoğun (dense) tam aramada kullanılır;
+yaklaşık indeksler, BM25/hibrit ve filtreli arama vectors.npy'yi doğrudan okur.
+
+Klasör düzeni (output/vectors/shards/):
+  shards.json          parça boyu, parça/satır sayısı, vektör tipi/ölçekler ve
+                       vectors.npy parmak izi (bayat manifest kullanılmaz)
+"""
+
+import heapq
+import json
+import logging
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SHARD_DIR = "shards"
+MANIFEST_NAME = "shards.json"
+DEFAULT_SHARD_ROWS = 65536      # 384 boyut float32 ≈ 100 MB / parça
+_SCAN_BLOCK = 16384             # parça içi puanlama bloğu
+
+
+def shard_dir(out_dir: Path) -> Path:
+    return out_dir / SHARD_DIR
+
+
+def has_shards(out_dir: Path) -> bool:
+    return (shard_dir(out_dir) / MANIFEST_NAME).exists()
+
+
+def read_manifest(out_dir: Path) -> Optional[Dict]:
+    path = shard_dir(out_dir) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    with open(str(path), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def open_shards(out_dir: Path) -> Optional[Dict]:
+    """
+    Parçalı depo vectors.npy ve sütunlu metadata ile uyumluysa manifesti
+    döndürür; yoksa ya da vectors.npy sonradan değiştiyse None (çağıran tek
+    dosyalı aramaya döner).
+    """
+    import numpy as np
+    from ann_store import vector_fingerprint
+    from chunk_columns import columns_dir
+
+    manifest = read_manifest(out_dir)
+    vec_path = out_dir / "vectors.npy"
+    if manifest is None or not vec_path.exists():
+        return None
+    if manifest.get("parmak_izi") != vector_fingerprint(np.load(str(vec_path), mmap_mode="r")):
+        logger.warning("Parçalı depo vectors.npy ile uyuşmuyor (bayat); tek dosyadan aranıyor.")
+        return None
+    if not (columns_dir(out_dir) / "meta.json").exists():
+        logger.warning("Parçalı depo için sütunlu metadata yok; tek dosyadan aranıyor.")
+        return None
+    return manifest
+
+
+def remove_shards(out_dir: Path):
+    if shard_dir(out_dir).exists():
+        shutil.rmtree(str(shard_dir(out_dir)))
+        logger.info(f"Parçalı depo silindi → {shard_dir(out_dir)}")
+
+
+def write_shards(stored, chunks: List[Dict], out_dir: Path, tip_meta: Dict,
+                 shard_rows: int = DEFAULT_SHARD_ROWS) -> Path:
+    """
+    Saklanan (gerekirse nicemlenmiş) vektör matrisini shard_rows satırlık
+    parçalara bölen manifesti yazar. Vektör ve chunk kayıtları kopyalanmaz
+    (vectors.npy ve columns/ okunur). Geçici dosyaya yazıp yerine taşır.
+    """
+    from ann_store import vector_fingerprint
+
+    hedef = shard_dir(out_dir)
+    hedef.mkdir(parents=True, exist_ok=True)
+    for eski in [*hedef.glob("vectors_*.npy"), *hedef.glob("tekil_*.npy"), *hedef.glob("chunks_*.json")]:
+        eski.unlink()           # eski sürümün kopya parçaları
+
+    sayi = -(-len(chunks) // shard_rows)
+    manifest = {"parca_boyu": shard_rows, "parca_sayisi": sayi, "toplam_satir": len(chunks),
+                "vektor_boyutu": int(stored.shape[1]), **tip_meta,
+                "parmak_izi": vector_fingerprint(stored)}
+    tmp = hedef / (MANIFEST_NAME + ".tmp")
+    with open(str(tmp), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(str(tmp), str(hedef / MANIFEST_NAME))
+    logger.info(f"Parçalı depo: {sayi} parça × {shard_rows} satır → {hedef}")
+    return hedef
+
+
+def _scan_shard(vecs, ortak, ids, q, olcek, bas: int, son: int, k: int) -> List[Tuple[float, int]]:
+    """
+    vectors.npy'nin [bas, son) satırlarını bloklar halinde puanlar; en iyi k
+    (skor, −satır) yığınını döndürür (eşit skorlarda küçük satır önde, rank()
+    ile aynı sıra). ortak_vektor ≠ id olan kopya satırlar puanlanmaz.
+    """
+    import numpy as np
+
+    q_eff = q if olcek is None else q * olcek
+    yigin: List[Tuple[float, int]] = []
+    for b in range(bas, son, _SCAN_BLOCK):
+        e = min(b + _SCAN_BLOCK, son)
+        skor = np.asarray(vecs[b:e], dtype=np.float32) @ q_eff
+        skor[np.asarray(ortak[b:e]) != np.asarray(ids[b:e])] = -np.inf
+        kk = min(k, len(skor))
+        for j in np.argpartition(-skor, kk - 1)[:kk].tolist():
+            if skor[j] == -np.inf:
+                continue
+            oge = (float(skor[j]), -(b + j))
+            if len(yigin) < k:
+                heapq.heappush(yigin, oge)
+            elif oge > yigin[0]:
+                heapq.heapreplace(yigin, oge)
+    return yigin
+
+
+def search_shards(out_dir: Path, manifest: Dict, q_vec, top_k: int, workers: int = 0) -> List[Dict]:
+    """
+    Parçalı depoda tam arama yapar (manifest: open_shards çıktısı); sonuçlar
+    ppt_to_vectors.rank() ile aynı biçimdedir. workers = 0 ise iş parçacığı
+    sayısı parça sayısı ve CPU sayısından seçilir.
+    """
+    import numpy as np
+    from chunk_columns import open_columns
+
+    kolon = open_columns(out_dir, manifest["parmak_izi"])
+    if kolon is None:
+        raise RuntimeError("Parçalı depo için sütunlu metadata bayat; --shard-size ile yeniden kurun.")
+    vecs = np.load(str(out_dir / "vectors.npy"), mmap_mode="r")
+    q = np.asarray(q_vec, dtype=np.float32).ravel()
+    olcek = np.asarray(manifest["olcek"], dtype=np.float32) if "olcek" in manifest else None
+    n = manifest["parca_sayisi"]
+    boy = manifest["parca_boyu"]
+    toplam = manifest["toplam_satir"]
+    workers = workers or max(1, min(n, os.cpu_count() or 1))
+
+    with ThreadPoolExecutor(max_workers=workers) as havuz:
+        yiginlar = list(havuz.map(
+            lambda i: _scan_shard(vecs, kolon.ortak_vektor, kolon.id, q, olcek, i * boy, min((i + 1) * boy, toplam), top_k),
+            range(n)))
+    en_iyi = heapq.nlargest(top_k, (oge for y in yiginlar for oge in y))
+
+    # Metadata yalnızca kazanan satırlar (ve kopyaları) için sütunlardan okunur
+    satirlar = [-eksi_satir for _, eksi_satir in en_iyi]
+    kimlik = {int(kolon.id[s]): s for s in satirlar}
+    konumlar: Dict[int, List[Tuple[str, int]]] = {s: [] for s in satirlar}
+    ortak = np.asarray(kolon.ortak_vektor)
+    for r in np.flatnonzero(np.isin(ortak, list(kimlik))).tolist():
+        konumlar[kimlik[int(ortak[r])]].append((kolon.dosyalar[kolon.dosya[r]], int(kolon.slayt_no[r])))
+
+    hits: List[Dict] = []
+    for (skor, _), satir in zip(en_iyi, satirlar):
+        c = kolon[satir]
+        hits.append({
+            "idx": satir, "skor": skor, "konumlar": konumlar[satir],
+            "dosya": c["dosya"], "slayt_no": c["slayt_no"], "metin": c["metin"],
+        })
+    return hits
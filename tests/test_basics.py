@@ -406,3 +406,1620 @@ def test_extract_all_finds_all_pptx():
     dosyalar = set(s["dosya"] for s in slides)
     assert len(dosyalar) == pptx_count, \
         f"{pptx_count} PPTX var ama sadece {len(dosyalar)} dosyadan veri çıkarıldı"
+
+
+# ════════════════════════════════════════════════════════════════
+# 8 · SENTETİK PPTX İLE ÇIKARMA TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def _make_pptx(path: Path, slaytlar):
+    """Verilen slayt tanımlarından küçük bir PPTX üretir.
+
+    Her slayt bir sözlüktür: "metinler" (text box paragrafları),
+    "tablo" (satır listesi) ve "grup" (grup içindeki text box metinleri).
+    """
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    prs = Presentation()
+    layout = prs.slide_layouts[6]  # boş düzen
+    for tanim in slaytlar:
+        slide = prs.slides.add_slide(layout)
+        metinler = tanim.get("metinler", [])
+        if metinler:
+            tf = slide.shapes.add_textbox(Inches(1), Inches(1), Inches(6), Inches(2)).text_frame
+            tf.text = metinler[0]
+            for satir in metinler[1:]:
+                tf.add_paragraph().text = satir
+        tablo = tanim.get("tablo")
+        if tablo:
+            shape = slide.shapes.add_table(len(tablo), len(tablo[0]),
+                                           Inches(1), Inches(3), Inches(6), Inches(2))
+            for r, satir in enumerate(tablo):
+                for c, hucre in enumerate(satir):
+                    shape.table.cell(r, c).text = hucre
+        grup = tanim.get("grup")
+        if grup:
+            grp = slide.shapes.add_group_shape()
+            for i, metin in enumerate(grup):
+                grp.shapes.add_textbox(Inches(1), Inches(5 + i * 0.5),
+                                       Inches(4), Inches(0.5)).text_frame.text = metin
+    prs.save(str(path))
+    return path
+
+
+@pytest.fixture
+def pptx_dir(tmp_path):
+    """Üç küçük deste içeren geçici bir input/ klasörü."""
+    pytest.importorskip("pptx")
+    d = tmp_path / "input"
+    d.mkdir()
+    _make_pptx(d / "b_deste.pptx", [
+        {"metinler": ["Madde 6 özel nitelikli kişisel veriler", "İkinci\vsatır sonlu paragraf"]},
+        {"tablo": [["Başlık A", "Başlık B"], ["hücre 1", ""]]},
+    ])
+    _make_pptx(d / "a_deste.pptx", [
+        {"metinler": ["Yurt dışına aktarım – Madde 9"]},
+        {},
+        {"grup": ["Grup içi metin bir", "Grup içi metin iki"]},
+    ])
+    _make_pptx(d / "c_deste.pptx", [{"metinler": ["Tek slaytlık deste"]}])
+    return d
+
+
+def test_extract_all_parallel_matches_sequential(pptx_dir):
+    """--jobs ile paralel çıkarma sıralı çıkarmayla aynı sonucu vermeli."""
+    from ppt_to_vectors import extract_all
+    sirali = extract_all(pptx_dir, jobs=1)
+    paralel = extract_all(pptx_dir, jobs=3)
+    assert paralel == sirali
+    anahtarlar = [(s["dosya"], s["slayt_no"]) for s in paralel]
+    assert anahtarlar == sorted(anahtarlar), "Çıktı (dosya, slayt) sırasında olmalı"
+    assert anahtarlar[0][0] == "a_deste.pptx"
+
+
+@pytest.mark.parametrize("dosya", ["a_deste.pptx", "b_deste.pptx", "c_deste.pptx"])
+def test_xml_engine_parity_with_pptx(pptx_dir, dosya):
+    """XML akış motoru python-pptx motoruyla aynı kayıtları üretmeli."""
+    from ppt_to_vectors import extract_pptx
+    beklenen = extract_pptx(pptx_dir / dosya, engine="pptx")
+    assert beklenen, "Sentetik deste boş olmamalı"
+    assert extract_pptx(pptx_dir / dosya, engine="xml") == beklenen
+
+
+def test_xml_engine_reads_tables_and_groups(pptx_dir):
+    """XML motoru tablo satırlarını ve grup şekillerini okumalı."""
+    from pptx_xml import read_slide_texts
+    b = read_slide_texts(pptx_dir / "b_deste.pptx")
+    assert b[1] == ["Başlık A | Başlık B", "hücre 1"]
+    a = read_slide_texts(pptx_dir / "a_deste.pptx")
+    assert a[1] == [], "Boş slayt boş liste olarak yer almalı"
+    assert a[2] == ["Grup içi metin bir", "Grup içi metin iki"]
+
+
+def test_xml_engine_extract_all(pptx_dir):
+    """extract_all iki motorla da aynı sonucu vermeli."""
+    from ppt_to_vectors import extract_all
+    assert extract_all(pptx_dir, engine="xml") == extract_all(pptx_dir, engine="pptx")
+
+
+# ════════════════════════════════════════════════════════════════
+# 9 · MANIFEST / ARTIMLI GÜNCELLEME TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def _fake_vectorize(cagrilar):
+    """Metnin sha256'sından deterministik 8 boyutlu vektör üreten sahte kodlayıcı."""
+    import hashlib
+    import numpy as np
+
+    def _vectorize(chunks, *args, **kwargs):
+        cagrilar.append(sorted({c["dosya"] for c in chunks}))
+        rows = [np.frombuffer(hashlib.sha256(c["metin"].encode()).digest()[:8], dtype=np.uint8)
+                for c in chunks]
+        emb = np.array(rows, dtype=np.float32).reshape(len(chunks), 8)
+        return emb / np.linalg.norm(emb, axis=1, keepdims=True)
+    return _vectorize
+
+
+def test_incremental_update_only_reprocesses_changed(pptx_dir, tmp_path, monkeypatch):
+    """Manifest ile yalnızca yeni/değişen desteler yeniden işlenmeli."""
+    import numpy as np
+    import ppt_to_vectors as pv
+
+    cagrilar = []
+    monkeypatch.setattr(pv, "vectorize", _fake_vectorize(cagrilar))
+    out = tmp_path / "vectors"
+
+    chunks = pv.create_chunks(pv.extract_all(pptx_dir))
+    pv.save(pv.vectorize(chunks), chunks, out)
+    pv.write_manifest(pv.build_manifest(chunks, pv.hash_sources(pptx_dir)), out)
+
+    # b değişti, c silindi, d eklendi; a aynı kaldı
+    _make_pptx(pptx_dir / "b_deste.pptx", [{"metinler": ["Madde 12 veri güvenliği yükümlülükleri"]}])
+    (pptx_dir / "c_deste.pptx").unlink()
+    _make_pptx(pptx_dir / "d_deste.pptx", [{"metinler": ["Yeni eklenen deste metni burada"]}])
+
+    manifest = pv.load_manifest(out)
+    assert manifest is not None
+    yeni = pv.update_incremental(pptx_dir, out, manifest)
+    assert cagrilar[-1] == ["b_deste.pptx", "d_deste.pptx"], "Yalnızca değişen desteler kodlanmalı"
+
+    # Birleştirilmiş çıktı, sıfırdan hesaplamayla aynı olmalı
+    beklenen = pv.create_chunks(pv.extract_all(pptx_dir))
+    pv.mark_duplicates(beklenen)
+    assert yeni == beklenen
+    assert np.allclose(np.load(str(out / "vectors.npy")), _fake_vectorize([])(beklenen))
+
+    # Değişiklik yoksa hiçbir şey kodlanmamalı
+    n = len(cagrilar)
+    pv.update_incremental(pptx_dir, out, pv.load_manifest(out))
+    assert len(cagrilar) == n
+
+
+def test_load_manifest_rejects_other_model(pptx_dir, tmp_path, monkeypatch):
+    """Başka bir modelle üretilmiş manifest tam yeniden işlemeye zorlamalı."""
+    import ppt_to_vectors as pv
+
+    monkeypatch.setattr(pv, "vectorize", _fake_vectorize([]))
+    out = tmp_path / "vectors"
+    chunks = pv.create_chunks(pv.extract_all(pptx_dir))
+    pv.save(pv.vectorize(chunks), chunks, out)
+    pv.write_manifest(pv.build_manifest(chunks, pv.hash_sources(pptx_dir), model_name="baska"), out)
+    assert pv.load_manifest(out) is None
+
+
+# ════════════════════════════════════════════════════════════════
+# 10 · TEK GEÇİŞLİ ÇIKARMA (SINK) TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def test_single_pass_feeds_records_and_txt(pptx_dir, tmp_path, monkeypatch):
+    """extract_all + txt_sink her desteyi bir kez okuyup iki çıktıyı da üretmeli."""
+    import ppt_to_vectors as pv
+
+    okunan = []
+    gercek = pv._read_slide_texts
+
+    def _sayan(file_path, engine="pptx"):
+        okunan.append(file_path.name)
+        return gercek(file_path, engine)
+
+    monkeypatch.setattr(pv, "_read_slide_texts", _sayan)
+    txt_dir = tmp_path / "txt"
+    slides = pv.extract_all(pptx_dir, sinks=[pv.txt_sink(txt_dir)])
+
+    assert sorted(okunan) == ["a_deste.pptx", "b_deste.pptx", "c_deste.pptx"]
+    assert {s["dosya"] for s in slides} == {"a_deste.pptx", "b_deste.pptx", "c_deste.pptx"}
+    icerik = (txt_dir / "b_deste.txt").read_text(encoding="utf-8")
+    assert icerik.startswith("=" * 60 + "\n  b_deste\n")
+    assert "── Slayt 2 " in icerik
+    assert "Başlık A | Başlık B" in icerik
+    # Boş slayt TXT'de başlık almamalı
+    assert "── Slayt 2 " not in (txt_dir / "a_deste.txt").read_text(encoding="utf-8")
+
+
+def test_stale_txt_files(pptx_dir, tmp_path):
+    """Eksik ya da PPTX'ten eski TXT'ler yeniden üretim için seçilmeli."""
+    import os
+    import ppt_to_vectors as pv
+
+    txt_dir = tmp_path / "txt"
+    pv.export_txt(pptx_dir, txt_dir)
+    assert pv.stale_txt_files(pptx_dir, txt_dir) == []
+
+    (txt_dir / "a_deste.txt").unlink()
+    eski = txt_dir / "c_deste.txt"
+    os.utime(eski, (0, 0))
+    assert [f.name for f in pv.stale_txt_files(pptx_dir, txt_dir)] == ["a_deste.pptx", "c_deste.pptx"]
+
+
+# ════════════════════════════════════════════════════════════════
+# 11 · GÖMME ÖNBELLEĞİ TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def test_embedding_cache_roundtrip_and_lru(tmp_path):
+    """Önbellek vektörleri saklamalı ve sınır aşılınca en eskiyi silmeli."""
+    import numpy as np
+    from embedding_cache import EmbeddingCache, text_key
+
+    cache = EmbeddingCache(tmp_path / "cache.sqlite", max_entries=2)
+    keys = [text_key(t) for t in ("bir", "iki", "üç")]
+    vecs = np.eye(3, dtype=np.float32)
+
+    cache.put_many("m", keys[:2], vecs[:2])
+    assert set(cache.get_many("m", [keys[0]])) == {keys[0]}   # "bir" tazelendi
+    cache.put_many("m", keys[2:], vecs[2:])                    # "iki" atılmalı
+
+    found = cache.get_many("m", keys)
+    assert set(found) == {keys[0], keys[2]}
+    assert np.array_equal(found[keys[2]], vecs[2])
+    assert cache.get_many("baska-model", keys) == {}, "Anahtar modele özgü olmalı"
+    cache.close()
+
+
+def test_vectorize_full_cache_hit_skips_model(tmp_path):
+    """Tüm parçalar önbellekteyse model hiç yüklenmeden vektörler dönmeli."""
+    import numpy as np
+    import ppt_to_vectors as pv
+    from embedding_cache import EmbeddingCache, text_key
+
+    chunks = [{"metin": "Madde 6 özel nitelikli veri"}, {"metin": "Madde 9 yurt dışı aktarım"}]
+    vecs = np.array([[1, 0, 0], [0, 1, 0]], dtype=np.float32)
+    path = tmp_path / "cache.sqlite"
+    cache = EmbeddingCache(path)
+    cache.put_many(pv.MODEL_NAME, [text_key(c["metin"]) for c in chunks], vecs)
+    cache.close()
+
+    emb = pv.vectorize(chunks + chunks[:1], cache_path=path)
+    assert np.array_equal(emb, np.vstack([vecs, vecs[:1]]))
+
+
+# ════════════════════════════════════════════════════════════════
+# 12 · TEKRAR EDEN PARÇA (DEDUP) TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def test_dedup_index_normalizes_whitespace():
+    """Yalnızca boşlukları farklı metinler aynı tekil metne eşlenmeli."""
+    from ppt_to_vectors import dedup_index
+    texts = ["Madde 6  metni\nburada", "Başka metin", "Madde 6 metni burada", "Başka metin"]
+    uniq_idx, inverse = dedup_index(texts)
+    assert uniq_idx == [0, 1]
+    assert inverse == [0, 1, 0, 1]
+
+
+def test_mark_duplicates_and_grouped_hits():
+    """Kopyalar aynı ortak vektörü göstermeli ve aramada tek sonuçta toplanmalı."""
+    import numpy as np
+    from ppt_to_vectors import _group_hits, mark_duplicates
+
+    chunks = [
+        {"id": 0, "dosya": "a.pptx", "slayt_no": 3, "metin": "Madde 6 özel nitelikli veri"},
+        {"id": 1, "dosya": "a.pptx", "slayt_no": 4, "metin": "Farklı bir içerik"},
+        {"id": 2, "dosya": "b.pptx", "slayt_no": 9, "metin": "Madde 6 özel nitelikli veri"},
+    ]
+    assert mark_duplicates(chunks) == 2
+    assert [c["ortak_vektor"] for c in chunks] == [0, 1, 0]
+
+    scores = np.array([0.9, 0.5, 0.9])
+    hits = _group_hits(scores.argsort()[::-1], scores, chunks, top_k=2)
+    assert len(hits) == 2
+    assert sorted(hits[0]["konumlar"]) == [("a.pptx", 3), ("b.pptx", 9)]
+    assert hits[1]["konumlar"] == [("a.pptx", 4)]
+
+
+def test_vectorize_encodes_duplicates_once(tmp_path):
+    """Önbellek yoluyla: kopya metinler tek anahtar olarak sorgulanmalı ve vektörü paylaşmalı."""
+    import numpy as np
+    import ppt_to_vectors as pv
+    from embedding_cache import EmbeddingCache, text_key
+
+    path = tmp_path / "cache.sqlite"
+    cache = EmbeddingCache(path)
+    cache.put_many(pv.MODEL_NAME, [text_key("Ortak paragraf metni")], np.ones((1, 4), np.float32))
+    cache.close()
+
+    chunks = [{"metin": "Ortak paragraf metni"}, {"metin": "Ortak  paragraf metni"}]
+    emb = pv.vectorize(chunks, cache_path=path)
+    assert emb.shape == (2, 4)
+    assert np.array_equal(emb[0], emb[1])
+
+
+# ════════════════════════════════════════════════════════════════
+# 13 · DİNAMİK BATCH TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def test_plan_batches_respects_token_budget():
+    """Her parça tam bir kez yer almalı, batch maliyeti bütçeyi aşmamalı."""
+    from ppt_to_vectors import plan_batches
+    lengths = [5, 120, 7, 60, 128, 6, 90, 8] * 10
+    batches = plan_batches(lengths, token_budget=512)
+    assert sorted(i for b in batches for i in b) == list(range(len(lengths)))
+    for b in batches:
+        assert len(b) == 1 or len(b) * max(lengths[i] for i in b) <= 512
+    # Uzun parçalar kısa başlıklarla aynı batch'e düşmemeli
+    assert all(max(lengths[i] for i in b) - min(lengths[i] for i in b) < 100 for b in batches)
+
+
+def test_encode_batched_restores_order():
+    """Uzunluğa göre gruplanan kodlama sonucu orijinal sıraya dönmeli."""
+    import numpy as np
+    from ppt_to_vectors import encode_batched
+
+    class _UzunlukModeli:
+        """Vektör olarak [len(metin), batch boyu] döndüren deneme modeli."""
+        batch_boylari = []
+
+        def encode(self, texts, batch_size, **kwargs):
+            self.batch_boylari.append(len(texts))
+            return np.array([[len(t), len(texts)] for t in texts], dtype=np.float32)
+
+    texts = ["kısa", "çok " * 60, "orta uzunlukta bir metin " * 4, "a b"] * 5
+    model = _UzunlukModeli()
+    emb = encode_batched(model, texts, token_budget=200)
+    assert emb[:, 0].tolist() == [len(t) for t in texts]
+    assert len(model.batch_boylari) > 1
+
+
+@pytest.mark.skipif(SKIP_HEAVY, reason="Model indirmesi gerektirir")
+def test_vectorize_embed_workers_matches_single_process():
+    """--embed-workers ile havuzda kodlama tek işlemli kodlamayla aynı sonucu vermeli."""
+    pytest.importorskip("sentence_transformers")
+    import numpy as np
+    from ppt_to_vectors import vectorize
+    chunks = [{"metin": f"KVKK madde {i} kapsamında örnek slayt metni"} for i in range(1, 13)]
+    tek = vectorize(chunks, token_budget=64)
+    havuz = vectorize(chunks, token_budget=64, workers=2)
+    assert np.allclose(tek, havuz, atol=1e-5)
+
+
+# ════════════════════════════════════════════════════════════════
+# 14 · AKIŞLI YAZIM / CHECKPOINT TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def _cached_chunks(path, n=6):
+    """n farklı uzunlukta parça üretir ve vektörlerini önbelleğe yazar."""
+    import numpy as np
+    import ppt_to_vectors as pv
+    from embedding_cache import EmbeddingCache, text_key
+
+    chunks = [{"metin": " ".join(["madde"] * (i + 1) + [str(i)])} for i in range(n)]
+    vecs = np.arange(n * 4, dtype=np.float32).reshape(n, 4)
+    cache = EmbeddingCache(path)
+    cache.put_many(pv.MODEL_NAME, [text_key(c["metin"]) for c in chunks], vecs)
+    cache.close()
+    return chunks, vecs
+
+
+def test_vectorize_streams_to_memmap(tmp_path):
+    """stream_path ile vektörler doğrudan hedef .npy dosyasına yazılmalı."""
+    import numpy as np
+    import ppt_to_vectors as pv
+
+    chunks, vecs = _cached_chunks(tmp_path / "cache.sqlite")
+    hedef = tmp_path / "out" / "vectors.npy"
+    emb = pv.vectorize(chunks + chunks[:1], cache_path=tmp_path / "cache.sqlite",
+                       token_budget=8, stream_path=hedef)
+
+    assert isinstance(emb, np.memmap)
+    assert np.array_equal(np.load(str(hedef)), np.vstack([vecs, vecs[:1]]))
+    assert sorted(p.name for p in hedef.parent.iterdir()) == ["vectors.npy"]
+
+
+def test_vectorize_resumes_from_checkpoint(tmp_path, monkeypatch):
+    """Yarıda kesilen akışlı yazım, tamamlanan batch'leri tekrar kodlamadan sürmeli."""
+    import numpy as np
+    import ppt_to_vectors as pv
+    from embedding_cache import EmbeddingCache
+
+    cache_path = tmp_path / "cache.sqlite"
+    chunks, vecs = _cached_chunks(cache_path)
+    hedef = tmp_path / "vectors.npy"
+    kwargs = {"cache_path": cache_path, "token_budget": 8, "stream_path": hedef}
+
+    gercek_yaz = pv._write_checkpoint
+    yazim = []
+
+    def _cokus(path, state):
+        yazim.append(state["tamamlanan_batch"])
+        if len(yazim) == 2:
+            raise KeyboardInterrupt
+        gercek_yaz(path, state)
+
+    monkeypatch.setattr(pv, "_write_checkpoint", _cokus)
+    with pytest.raises(KeyboardInterrupt):
+        pv.vectorize(chunks, **kwargs)
+    assert not hedef.exists()
+    assert (tmp_path / "vectors.checkpoint.json").exists()
+    monkeypatch.setattr(pv, "_write_checkpoint", gercek_yaz)
+
+    istenen = []
+    gercek_get = EmbeddingCache.get_many
+
+    def _izle(self, model, keys):
+        keys = list(keys)
+        istenen.extend(keys)
+        return gercek_get(self, model, keys)
+
+    monkeypatch.setattr(EmbeddingCache, "get_many", _izle)
+    emb = pv.vectorize(chunks, **kwargs)
+
+    assert 0 < len(istenen) < len(chunks), "Tamamlanan batch'ler yeniden istenmemeli"
+    assert np.array_equal(np.asarray(emb), vecs)
+    assert not (tmp_path / "vectors.checkpoint.json").exists()
+    assert not (tmp_path / "vectors.partial.npy").exists()
+
+
+def test_vectorize_restarts_when_duplicates_move(tmp_path, monkeypatch):
+    """Aynı tekil metinler, farklı kopya dizilimi: checkpoint kullanılmamalı, satırlar eksiksiz dolmalı."""
+    import numpy as np
+    import ppt_to_vectors as pv
+
+    cache_path = tmp_path / "cache.sqlite"
+    chunks, vecs = _cached_chunks(cache_path)
+    hedef = tmp_path / "vectors.npy"
+    kwargs = {"cache_path": cache_path, "token_budget": 8, "stream_path": hedef}
+
+    gercek_yaz = pv._write_checkpoint
+    yazim = []
+
+    def _cokus(path, state):
+        yazim.append(state["tamamlanan_batch"])
+        if len(yazim) == 2:
+            raise KeyboardInterrupt
+        gercek_yaz(path, state)
+
+    monkeypatch.setattr(pv, "_write_checkpoint", _cokus)
+    with pytest.raises(KeyboardInterrupt):
+        pv.vectorize(chunks + chunks[:1], **kwargs)         # [A, B, …, A]
+    monkeypatch.setattr(pv, "_write_checkpoint", gercek_yaz)
+
+    emb = pv.vectorize(chunks[:1] + chunks, **kwargs)       # [A, A, B, …]
+    assert np.array_equal(np.asarray(emb), np.vstack([vecs[:1], vecs]))
+
+
+def test_vectorize_reads_cache_per_batch(tmp_path, monkeypatch):
+    """Önbellek her batch için ayrı okunmalı; model yalnızca ilk ıskada yüklenmeli."""
+    import types
+    import numpy as np
+    import ppt_to_vectors as pv
+    from embedding_cache import EmbeddingCache, text_key
+
+    cache_path = tmp_path / "cache.sqlite"
+    chunks, vecs = _cached_chunks(cache_path)
+    yeni = {"metin": "önbellekte olmayan yeni slayt metni"}
+
+    class _SabitModel:
+        def __init__(self, name):
+            pass
+
+        def encode(self, texts, **kwargs):
+            return np.full((len(texts), 4), -1.0, dtype=np.float32)
+
+    monkeypatch.setitem(sys.modules, "sentence_transformers",
+                        types.SimpleNamespace(SentenceTransformer=_SabitModel))
+    istenen = []
+    gercek_get = EmbeddingCache.get_many
+
+    def _izle(self, model, keys):
+        keys = list(keys)
+        istenen.append(keys)
+        return gercek_get(self, model, keys)
+
+    monkeypatch.setattr(EmbeddingCache, "get_many", _izle)
+    emb = pv.vectorize(chunks + [yeni], cache_path=cache_path, token_budget=8)
+
+    assert len(istenen) > 1 and max(len(k) for k in istenen) < len(chunks)
+    assert np.array_equal(emb[:-1], vecs) and (emb[-1] == -1).all()
+    cache = EmbeddingCache(cache_path)
+    assert text_key(yeni["metin"]) in gercek_get(cache, pv.MODEL_NAME, [text_key(yeni["metin"])])
+    cache.close()
+
+
+# ════════════════════════════════════════════════════════════════
+# 15 · ARAMA SUNUCUSU TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+class _SabitModel:
+    """Her sorgu için aynı normalize vektörü döndüren deneme modeli."""
+
+    def __init__(self, vec):
+        self.vec = vec
+
+    def encode(self, texts, **kwargs):
+        import numpy as np
+        return np.tile(self.vec, (len(texts), 1))
+
+
+@pytest.fixture
+def kucuk_indeks(tmp_path):
+    """Üç parçalık (biri kopya) vektör deposu yazar."""
+    import numpy as np
+    import ppt_to_vectors as pv
+
+    chunks = [
+        {"id": 0, "dosya": "a.pptx", "slayt_no": 1, "parca_no": 1, "metin": "Açık rıza şartları"},
+        {"id": 1, "dosya": "a.pptx", "slayt_no": 2, "parca_no": 1, "metin": "Yurt dışına aktarım"},
+        {"id": 2, "dosya": "b.pptx", "slayt_no": 5, "parca_no": 1, "metin": "Açık rıza şartları"},
+    ]
+    emb = np.array([[1, 0], [0, 1], [1, 0]], dtype=np.float32)
+    pv.save(emb, chunks, tmp_path)
+    return tmp_path
+
+
+def test_search_daemon_answers_and_reloads(kucuk_indeks, capsys):
+    """Sunucu sorguyu yanıtlamalı, search() onu kullanmalı, indeks değişince tazelenmeli."""
+    import threading
+    import time
+    import numpy as np
+    import ppt_to_vectors as pv
+    from search_daemon import make_server, query_daemon
+
+    server = make_server(kucuk_indeks, _SabitModel(np.array([1, 0], np.float32)),
+                         pv.MODEL_NAME, port=0)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        hits = query_daemon("rıza", 2, pv.MODEL_NAME, kucuk_indeks, port=port)
+        assert [h["metin"] for h in hits] == ["Açık rıza şartları", "Yurt dışına aktarım"]
+        assert sorted(map(tuple, hits[0]["konumlar"])) == [("a.pptx", 1), ("b.pptx", 5)]
+        assert query_daemon("rıza", 2, "baska-model", kucuk_indeks, port=port) is None
+
+        pv.search("rıza", kucuk_indeks, top_k=1, port=port)
+        assert "Açık rıza şartları" in capsys.readouterr().out
+
+        emb, chunks = pv.load_index(kucuk_indeks)
+        pv.save(emb[:, ::-1].copy(), chunks, kucuk_indeks)   # vektörleri değiştir
+        ileri = time.time() + 5                               # kaba mtime çözünürlüğüne karşı
+        os.utime(kucuk_indeks / "vectors.npy", (ileri, ileri))
+        hits = query_daemon("rıza", 1, pv.MODEL_NAME, kucuk_indeks, port=port)
+        assert hits[0]["metin"] == "Yurt dışına aktarım"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert query_daemon("rıza", 1, pv.MODEL_NAME, kucuk_indeks, port=port) is None
+
+
+def test_search_daemon_rejects_bad_requests(kucuk_indeks, monkeypatch):
+    """Geçersiz istekler 400, arama sırasında oluşan hatalar 500 JSON yanıtı almalı."""
+    import threading
+    import urllib.error
+    import urllib.request
+    import numpy as np
+    import ppt_to_vectors as pv
+    from search_daemon import make_server
+
+    def _hata(*args, **kwargs):
+        raise RuntimeError("bozuk indeks")
+
+    monkeypatch.setattr(pv, "rank", _hata)
+    server = make_server(kucuk_indeks, _SabitModel(np.array([1, 0], np.float32)),
+                         pv.MODEL_NAME, port=0)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+    def _gonder(**alanlar):
+        govde = json.dumps({"sorgu": "rıza", **alanlar}).encode("utf-8")
+        try:
+            with opener.open(f"http://127.0.0.1:{port}/ara", data=govde, timeout=10) as yanit:
+                return yanit.status, json.loads(yanit.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    try:
+        for alanlar in ({"top_k": 0}, {"rerank": -1}, {"index": "ivf", "knobs": {"nprobe": -1}},
+                        {"index": "hnsw", "knobs": {"ef": "x"}},
+                        {"index": "hnsw", "knobs": {"ef_search": "x"}}):
+            kod, govde = _gonder(**alanlar)
+            assert kod == 400 and govde["hata"].startswith("geçersiz istek"), alanlar
+        kod, govde = _gonder(top_k=1)
+        assert kod == 500 and "bozuk indeks" in govde["hata"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize("argv", [[], ["--help"]])
+def test_console_script_main_runs_from_package(monkeypatch, capsys, argv):
+    """ppt-vectorize (src.ppt_to_vectors:main) src/ sys.path'te değilken de çalışmalı."""
+    import importlib
+
+    src = str(ROOT / "src")
+    monkeypatch.setattr(sys, "path", [str(ROOT)] + [p for p in sys.path if p != src])
+    for ad in ("filter_index", "search_daemon", "vector_dtype", "src", "src.ppt_to_vectors"):
+        monkeypatch.delitem(sys.modules, ad, raising=False)
+    monkeypatch.setattr(sys, "argv", ["ppt-vectorize"] + argv)
+    try:
+        main = importlib.import_module("src.ppt_to_vectors").main
+        if argv:
+            with pytest.raises(SystemExit) as cikis:
+                main()
+            assert cikis.value.code == 0
+        else:
+            main()
+    finally:
+        for ad in ("src", "src.ppt_to_vectors"):
+            sys.modules.pop(ad, None)
+    assert "--search" in capsys.readouterr().out
+
+
+# ════════════════════════════════════════════════════════════════
+# 16 · TOPLU ARAMA TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def test_top_k_rows_matches_full_sort():
+    """argpartition tabanlı seçim, tam sıralamanın ilk k sütunuyla aynı olmalı."""
+    import numpy as np
+    from ppt_to_vectors import top_k_rows
+    rng = np.random.default_rng(0)
+    scores = rng.standard_normal((7, 50)).astype(np.float32)
+    assert np.array_equal(top_k_rows(scores, 5), np.argsort(-scores, axis=1)[:, :5])
+    assert top_k_rows(scores, 80).shape == (7, 50)
+
+
+def test_rank_batch_matches_single_rank(kucuk_indeks, monkeypatch):
+    """Toplu puanlama her sorgu için tekli rank() ile aynı sonucu vermeli, bloklansa bile."""
+    import numpy as np
+    import ppt_to_vectors as pv
+
+    emb, chunks = pv.load_index(kucuk_indeks)
+    q = np.array([[1, 0], [0, 1], [0.6, 0.8]], dtype=np.float32)
+    monkeypatch.setattr(pv, "SCORE_BLOCK_ELEMS", 2)   # her blokta tek sorgu
+    toplu = pv.rank_batch(emb, chunks, q, top_k=2)
+    for satir, hits in zip(q, toplu):
+        tekli = pv.rank(emb, chunks, satir[None, :], top_k=2)
+        assert [(sorted(h["konumlar"]), round(h["skor"], 5)) for h in hits] == \
+               [(sorted(h["konumlar"]), round(h["skor"], 5)) for h in tekli]
+
+
+def test_rank_batch_does_not_copy_scaled_rows(kucuk_indeks, monkeypatch):
+    """int8 saklamada toplu puanlama tekil satırları float32'ye kopyalamamalı."""
+    import numpy as np
+    import ppt_to_vectors as pv
+    from vector_dtype import ScaledVectors
+
+    emb, chunks = pv.load_index(kucuk_indeks)
+    pv.save(emb, chunks, kucuk_indeks, dtype="int8")
+    emb, chunks = pv.load_index(kucuk_indeks)
+    q = np.array([[1, 0], [0.6, 0.8]], dtype=np.float32)
+    beklenen = [pv.rank(emb, chunks, satir[None, :], top_k=2) for satir in q]
+
+    def kopyalama(self, key):
+        raise AssertionError("satır kopyası")
+    monkeypatch.setattr(ScaledVectors, "__getitem__", kopyalama)
+    toplu = pv.rank_batch(emb, chunks, q, top_k=2)
+    for hits, tekli in zip(toplu, beklenen):
+        assert [(sorted(h["konumlar"]), round(h["skor"], 4)) for h in hits] == \
+               [(sorted(h["konumlar"]), round(h["skor"], 4)) for h in tekli]
+
+
+def test_read_queries_skips_blank_and_comments(tmp_path):
+    """Boş satırlar ve # yorumları sorgu sayılmamalı."""
+    from ppt_to_vectors import read_queries
+    path = tmp_path / "sorular.txt"
+    path.write_text("# değerlendirme seti\nAçık rıza nedir?\n\n  Yurt dışı aktarım  \n", encoding="utf-8")
+    assert read_queries(path) == ["Açık rıza nedir?", "Yurt dışı aktarım"]
+
+
+# ════════════════════════════════════════════════════════════════
+# 17 · YAKLAŞIK ARAMA İNDEKSİ (IVF) TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def _kumeli_vektorler(n=2000, d=16, kume=20, seed=0):
+    """Kümeli, birim uzunlukta sentetik vektörler."""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    merkez = rng.standard_normal((kume, d))
+    x = merkez[rng.integers(0, kume, n)] + 0.3 * rng.standard_normal((n, d))
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float32)
+
+
+@pytest.fixture
+def sentetik_depo(tmp_path):
+    """2000 parçalık sentetik vektör deposu (son 10 parça ilk 10'un kopyası)."""
+    import ppt_to_vectors as pv
+
+    emb = _kumeli_vektorler()
+    emb[-10:] = emb[:10]
+    chunks = [{"id": i, "dosya": f"d{i // 50}.pptx", "slayt_no": i % 50 + 1, "parca_no": 1,
+               "metin": f"parça {i % 1990}"} for i in range(len(emb))]
+    pv.save(emb, chunks, tmp_path)
+    return tmp_path
+
+
+def _recall(ann_rows, exact_rows):
+    return len(set(ann_rows) & set(exact_rows)) / len(exact_rows)
+
+
+def test_ivf_full_probe_equals_exact(sentetik_depo):
+    """nprobe = n_lists iken IVF tam aramayla aynı sonucu, küçük nprobe yüksek recall vermeli."""
+    import numpy as np
+    import ppt_to_vectors as pv
+
+    pv.build_ann_index("ivf", sentetik_depo, n_lists=32)
+    emb, chunks = pv.load_index(sentetik_depo, mmap=True)
+    ann = pv.load_ann_index("ivf", sentetik_depo, emb)
+    assert ann["meta"]["tekil"] == 1990 and len(ann["ids"]) == 1990
+
+    recall = []
+    for q in _kumeli_vektorler(n=20, seed=2):
+        tam = [h["idx"] for h in pv.rank(emb, chunks, q[None, :], 10)]
+        hepsi = [h["idx"] for h in pv.rank(emb, chunks, q[None, :], 10, ann=ann,
+                                            knobs={"nprobe": 32})]
+        assert hepsi == tam
+        az = [h["idx"] for h in pv.rank(emb, chunks, q[None, :], 10, ann=ann,
+                                         knobs={"nprobe": 4})]
+        recall.append(_recall(az, tam))
+    assert np.mean(recall) >= 0.9
+
+
+def test_stale_ann_index_falls_back(sentetik_depo):
+    """vectors.npy değişince indeks bayat sayılmalı ve yüklenmemeli."""
+    import numpy as np
+    import ppt_to_vectors as pv
+
+    pv.build_ann_index("ivf", sentetik_depo, n_lists=8)
+    emb, chunks = pv.load_index(sentetik_depo)
+    pv.save(np.ascontiguousarray(emb[:, ::-1]), chunks, sentetik_depo)
+    emb2, _ = pv.load_index(sentetik_depo)
+    assert pv.load_ann_index("ivf", sentetik_depo, emb2) is None
+    assert pv.load_ann_index("ivf", sentetik_depo, emb) is not None
+
+
+def test_fingerprint_covers_every_row(sentetik_depo):
+    """Aynı şekilli vektörlerde tek bir satırın değişmesi de indeksi bayat yapmalı."""
+    import numpy as np
+    import ppt_to_vectors as pv
+    from ann_store import vector_fingerprint
+
+    pv.build_ann_index("ivf", sentetik_depo, n_lists=8)
+    emb, chunks = pv.load_index(sentetik_depo)
+    mm, _ = pv.load_index(sentetik_depo, mmap=True)
+    assert vector_fingerprint(mm) == vector_fingerprint(emb)
+
+    emb = np.array(emb)
+    emb[1234] = emb[1235]
+    np.save(str(sentetik_depo / "vectors.npy"), emb)
+    mm2, _ = pv.load_index(sentetik_depo, mmap=True)
+    assert vector_fingerprint(mm2) == vector_fingerprint(emb)
+    assert pv.load_ann_index("ivf", sentetik_depo, mm2) is None
+
+
+def test_in_memory_index_reuses_file_fingerprint(sentetik_depo, monkeypatch):
+    """mmap=False ile yüklenen matris, indeks okuyucularında yeniden özetlenmemeli."""
+    import ann_store
+    import ppt_to_vectors as pv
+
+    pv.build_ann_index("ivf", sentetik_depo, n_lists=8)
+    pv.load_index(sentetik_depo, mmap=True)              # dosya önbelleği yazılır
+    ozet = []
+    gercek = ann_store._array_digest
+    monkeypatch.setattr(ann_store, "_array_digest", lambda raw: ozet.append(1) or gercek(raw))
+
+    emb, _ = pv.load_index(sentetik_depo)
+    assert not emb.flags.writeable
+    assert pv.load_ann_index("ivf", sentetik_depo, emb) is not None
+    assert pv.load_filter_index(sentetik_depo, emb) is not None
+    assert pv.load_bm25_index(sentetik_depo, emb) is not None
+    assert ozet == []
+    assert ann_store.vector_fingerprint(emb.copy()) == ann_store.vector_fingerprint(emb)
+
+
+# ════════════════════════════════════════════════════════════════
+# 18 · HNSW GRAF İNDEKSİ TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def test_hnsw_recall_and_mmap_load(sentetik_depo):
+    """HNSW indeksi mmap ile açılmalı ve ef_search büyüdükçe tam aramaya yaklaşmalı."""
+    import numpy as np
+    import ppt_to_vectors as pv
+
+    pv.build_ann_index("hnsw", sentetik_depo, M=8, ef_construction=40)
+    emb, chunks = pv.load_index(sentetik_depo, mmap=True)
+    ann = pv.load_ann_index("hnsw", sentetik_depo, emb)
+    assert isinstance(ann["nbr0"], np.memmap)
+
+    recall = {16: [], 128: []}
+    for q in _kumeli_vektorler(n=20, seed=3):
+        tam = [h["idx"] for h in pv.rank(emb, chunks, q[None, :], 10)]
+        for ef in recall:
+            bulunan = [h["idx"] for h in pv.rank(emb, chunks, q[None, :], 10, ann=ann,
+                                                 knobs={"ef_search": ef})]
+            recall[ef].append(_recall(bulunan, tam))
+    assert np.mean(recall[128]) >= 0.95
+    assert np.mean(recall[128]) >= np.mean(recall[16])
+
+
+def test_hnsw_update_removes_and_inserts():
+    """Artımlı güncelleme silinen satırları çıkarmalı, yenileri bulunabilir kılmalı."""
+    import numpy as np
+    import hnsw_index
+
+    x = _kumeli_vektorler(n=600, seed=4)
+    arrays, meta = hnsw_index.build(x, np.arange(400), M=8, ef_construction=40)
+    index = dict(arrays, meta=meta)
+
+    # Eski 0-99 silindi; 100-399 → 0-299; 300-599 yeni satırlar
+    eski_to_yeni = np.full(400, -1)
+    eski_to_yeni[100:] = np.arange(300)
+    yeni_x = np.concatenate([x[100:400], x[400:600]])
+    arrays, meta = hnsw_index.update(index, yeni_x, eski_to_yeni, np.arange(500))
+    index = dict(arrays, meta=meta)
+
+    assert sorted(index["ids"].tolist()) == list(range(500))
+    bulunan = [hnsw_index.search(index, yeni_x, yeni_x[i], 1, ef_search=64)[0][0]
+               for i in range(0, 500, 5)]
+    assert np.mean(np.array(bulunan) == np.arange(0, 500, 5)) >= 0.95
+
+
+def test_incremental_update_refreshes_ann_indexes(pptx_dir, tmp_path, monkeypatch):
+    """update_incremental, mevcut IVF/HNSW/PQ indekslerini ve kNN grafını yeni vektörlere uyarlamalı."""
+    import ppt_to_vectors as pv
+
+    monkeypatch.setattr(pv, "vectorize", _fake_vectorize([]))
+    out = tmp_path / "vectors"
+    chunks = pv.create_chunks(pv.extract_all(pptx_dir))
+    pv.save(pv.vectorize(chunks), chunks, out)
+    pv.write_manifest(pv.build_manifest(chunks, pv.hash_sources(pptx_dir)), out)
+    for tur in ("ivf", "hnsw", "pq", "binary"):
+        pv.build_ann_index(tur, out)
+    pv.build_knn_graph(out, k=2)
+
+    _make_pptx(pptx_dir / "b_deste.pptx", [{"metinler": ["Madde 12 veri güvenliği yükümlülükleri"]}])
+    (pptx_dir / "c_deste.pptx").unlink()
+    yeni = pv.update_incremental(pptx_dir, out, pv.load_manifest(out))
+
+    emb, _ = pv.load_index(out)
+    for tur in ("ivf", "hnsw", "pq", "binary"):
+        ann = pv.load_ann_index(tur, out, emb)
+        assert ann is not None, f"{tur} indeksi güncellenmeliydi"
+        assert sorted(ann["ids"].tolist()) == sorted(pv._duplicate_groups(yeni))
+        for i in sorted(pv._duplicate_groups(yeni)):
+            assert pv.rank(emb, yeni, emb[i][None, :], 1, ann=ann)[0]["idx"] == i
+    graf = pv.load_knn_graph(out, emb)
+    assert graf is not None and graf["meta"]["k"] == 2 and len(graf["konum"]) == len(yeni)
+
+
+# ════════════════════════════════════════════════════════════════
+# 19 · ÜRÜN NİCEMLEME (PQ) TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def test_pq_codes_and_rescore_recall(sentetik_depo):
+    """PQ kodları parça başına m bayt olmalı; yeniden puanlama recall'ı artırmalı."""
+    import numpy as np
+    import ppt_to_vectors as pv
+
+    pv.build_ann_index("pq", sentetik_depo, m=8)
+    emb, chunks = pv.load_index(sentetik_depo, mmap=True)
+    ann = pv.load_ann_index("pq", sentetik_depo, emb)
+    assert ann["codes"].dtype == np.uint8 and ann["codes"].shape == (8, 1990)
+
+    recall = {0: [], 100: []}
+    for q in _kumeli_vektorler(n=20, seed=5):
+        tam = [h["idx"] for h in pv.rank(emb, chunks, q[None, :], 10)]
+        for n in recall:
+            hits = pv.rank(emb, chunks, q[None, :], 10, ann=ann, knobs={"rescore": n})
+            recall[n].append(_recall([h["idx"] for h in hits], tam))
+            if n:   # yeniden puanlanan skorlar tam skorlardır
+                assert np.allclose([h["skor"] for h in hits],
+                                   [float(emb[h["idx"]] @ q) for h in hits], atol=1e-5)
+    assert np.mean(recall[100]) >= 0.9
+    assert np.mean(recall[100]) >= np.mean(recall[0])
+
+
+def test_pq_default_code_size():
+    """Varsayılan kod boyu vektör boyutunu bölmeli ve 8–64 bayt aralığında olmalı."""
+    from pq_index import default_m
+    assert default_m(384) == 32
+    assert default_m(768) == 32
+    assert default_m(16) == 16
+
+
+@pytest.mark.parametrize("m", [-4, 4, 5, 96])
+def test_pq_rejects_invalid_code_size(sentetik_depo, m, caplog):
+    """--pq-m 8–64 aralığında boyutu bölen bir kod boyu değilse indeks kurulmadan çıkılmalı."""
+    import ppt_to_vectors as pv
+    from ann_store import index_dir
+
+    with pytest.raises(SystemExit):
+        pv.build_ann_index("pq", sentetik_depo, m=m)
+    assert f"--pq-m {m} geçersiz" in caplog.text and "(16)" in caplog.text
+    assert not index_dir(sentetik_depo, "pq").exists()
+
+
+@pytest.mark.parametrize("m", [4, 96])
+def test_pq_build_rejects_code_size_outside_range(m):
+    """pq_index.build da 8–64 dışı kod boylarını reddetmeli (384 boyutu bölse bile)."""
+    import numpy as np
+    import pq_index
+
+    x = np.random.default_rng(0).standard_normal((300, 384)).astype(np.float32)
+    with pytest.raises(ValueError, match="kod boyu"):
+        pq_index.build(x, np.arange(300), m=m)
+
+
+# ════════════════════════════════════════════════════════════════
+# 20 · İKİLİ ÖZET (BINARY) ÖN FİLTRE TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def test_binary_hamming_matches_unpacked_bits():
+    """Vektörize popcount, açılmış bitlerle sayılan Hamming mesafesine eşit olmalı."""
+    import numpy as np
+    from binary_index import hamming, pack
+
+    x = _kumeli_vektorler(n=300, d=384, seed=6)
+    bits = pack(x)
+    assert bits.shape == (300, 48), "384 boyut → 48 bayt"
+    beklenen = np.unpackbits(bits ^ bits[7], axis=1).sum(axis=1)
+    assert np.array_equal(hamming(bits, bits[7]), beklenen)
+
+
+def test_binary_prefilter_recall_report(sentetik_depo):
+    """Yeniden puanlanan aday sayısı arttıkça recall artmalı; rapor tam aramayla kıyaslamalı."""
+    import ppt_to_vectors as pv
+
+    pv.build_ann_index("binary", sentetik_depo)
+    az = pv.evaluate_ann("binary", sentetik_depo, knobs={"rescore": 20}, n_queries=50)
+    cok = pv.evaluate_ann("binary", sentetik_depo, knobs={"rescore": 400}, n_queries=50)
+    assert az["sorgu"] == 50 and az["top_k"] == 10
+    assert cok["recall"] >= 0.9
+    assert cok["recall"] >= az["recall"]
+    assert cok["exact_ms"] > 0 and cok["ann_ms"] > 0
+
+
+# ════════════════════════════════════════════════════════════════
+# 21 · DÜŞÜK HASSASİYETLİ SAKLAMA (float16 / int8) TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+@pytest.mark.parametrize("tip,bayt", [("float16", 2), ("int8", 1)])
+def test_reduced_dtype_save_and_search(sentetik_depo, tip, bayt):
+    """Dar tipli saklama metadata'ya yazılmalı ve arama float32 ile neredeyse aynı olmalı."""
+    import numpy as np
+    import ppt_to_vectors as pv
+
+    emb32, chunks = pv.load_index(sentetik_depo)
+    pv.save(emb32, chunks, sentetik_depo, dtype=tip)
+
+    with open(sentetik_depo / "metadata.json", encoding="utf-8") as f:
+        meta = json.load(f)
+    assert meta["vektor_tipi"] == tip
+    assert ("olcek" in meta) == (tip == "int8")
+    ham = np.load(str(sentetik_depo / "vectors.npy"))
+    assert ham.dtype == np.dtype(tip) and ham.nbytes == emb32.size * bayt
+
+    emb, _ = pv.load_index(sentetik_depo, mmap=True)
+    assert emb.shape == emb32.shape
+    assert np.abs(emb[:50] - emb32[:50]).max() < 0.02
+    ortak = []
+    for q in _kumeli_vektorler(n=20, seed=7):
+        a = [h["idx"] for h in pv.rank(emb32, chunks, q[None, :], 10)]
+        b = [h["idx"] for h in pv.rank(emb, chunks, q[None, :], 10)]
+        ortak.append(_recall(b, a))
+    assert np.mean(ortak) >= 0.95
+
+
+def test_incremental_update_keeps_store_dtype(pptx_dir, tmp_path, monkeypatch):
+    """Artımlı güncelleme, tip verilmezse mevcut int8 saklamayı korumalı."""
+    import ppt_to_vectors as pv
+
+    monkeypatch.setattr(pv, "vectorize", _fake_vectorize([]))
+    out = tmp_path / "vectors"
+    chunks = pv.create_chunks(pv.extract_all(pptx_dir))
+    pv.save(pv.vectorize(chunks), chunks, out, dtype="int8")
+    pv.write_manifest(pv.build_manifest(chunks, pv.hash_sources(pptx_dir)), out)
+
+    _make_pptx(pptx_dir / "d_deste.pptx", [{"metinler": ["Yeni eklenen deste metni burada"]}])
+    yeni = pv.update_incremental(pptx_dir, out, pv.load_manifest(out))
+
+    with open(out / "metadata.json", encoding="utf-8") as f:
+        assert json.load(f)["vektor_tipi"] == "int8"
+    emb, _ = pv.load_index(out)
+    beklenen = _fake_vectorize([])(yeni)
+    assert abs(emb[:len(yeni)] - beklenen).max() < 0.02
+
+
+# ════════════════════════════════════════════════════════════════
+# 22 · PARÇALI (SHARDED) DEPO TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+@pytest.mark.parametrize("tip", ["float32", "int8"])
+def test_sharded_search_matches_rank(sentetik_depo, tip):
+    """Parça parça paralel tarama, tek dosyalı rank() ile aynı sonuçları vermeli."""
+    import numpy as np
+    import ppt_to_vectors as pv
+    from vector_store import open_shards, search_shards, shard_dir
+
+    emb32, chunks = pv.load_index(sentetik_depo)
+    pv.save(emb32, chunks, sentetik_depo, dtype=tip, shard_rows=300)
+    assert [p.name for p in shard_dir(sentetik_depo).iterdir()] == ["shards.json"]
+
+    manifest = open_shards(sentetik_depo)
+    assert manifest["parca_sayisi"] == 7 and manifest["toplam_satir"] == 2000 and manifest["vektor_tipi"] == tip
+    emb, chunks = pv.load_index(sentetik_depo)
+    for q in list(_kumeli_vektorler(n=10, seed=8)) + [emb32[3]]:
+        beklenen = pv.rank(emb, chunks, q[None, :], 10)
+        hits = search_shards(sentetik_depo, manifest, q[None, :], 10, workers=3)
+        assert [h["idx"] for h in hits] == [h["idx"] for h in beklenen]
+        assert [h["konumlar"] for h in hits] == [h["konumlar"] for h in beklenen]
+        assert np.allclose([h["skor"] for h in hits], [h["skor"] for h in beklenen], atol=1e-5)
+    assert len(search_shards(sentetik_depo, manifest, emb32[3][None, :], 1)[0]["konumlar"]) == 2
+
+
+def test_shards_follow_save_and_detect_staleness(sentetik_depo):
+    """save() parça boyunu korumalı, 0 ile silmeli; dışarıdan değişen vectors.npy bayat sayılmalı."""
+    import numpy as np
+    import ppt_to_vectors as pv
+    from vector_store import has_shards, open_shards, read_manifest
+
+    pv.build_shards(sentetik_depo, 512)
+    emb, chunks = pv.load_index(sentetik_depo)
+    pv.save(emb[:1500], chunks[:1500], sentetik_depo)
+    manifest = open_shards(sentetik_depo)
+    assert manifest["parca_boyu"] == 512 and manifest["parca_sayisi"] == 3
+
+    np.save(str(sentetik_depo / "vectors.npy"), np.asarray(emb[:1500]) * 0.5)
+    assert open_shards(sentetik_depo) is None
+    assert read_manifest(sentetik_depo) is not None
+
+    pv.save(emb, chunks, sentetik_depo, shard_rows=0)
+    assert not has_shards(sentetik_depo)
+
+
+# ════════════════════════════════════════════════════════════════
+# 23 · SÜTUNLU METADATA TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def test_columns_roundtrip_matches_json(sentetik_depo):
+    """Sütunlu görünüm metadata.json'daki kayıtları birebir üretmeli."""
+    import ppt_to_vectors as pv
+    from chunk_columns import ChunkColumns
+
+    with open(sentetik_depo / "metadata.json", encoding="utf-8") as f:
+        beklenen = json.load(f)["chunks"]
+    beklenen[5]["metin"] = "İşlenen kişisel veri – açık rıza ğüşıöç"
+    pv.save(pv.load_index(sentetik_depo)[0], beklenen, sentetik_depo)
+
+    _, chunks = pv.load_index(sentetik_depo, mmap=True)
+    assert isinstance(chunks, ChunkColumns)
+    assert len(chunks) == len(beklenen)
+    assert chunks[5] == beklenen[5] and chunks[-1] == beklenen[-1]
+    assert chunks.text(5) == "İşlenen kişisel veri – açık rıza ğüşıöç"
+    assert chunks[1990:1993] == beklenen[1990:1993]
+    assert chunks.dosyalar[chunks.dosya[120]] == beklenen[120]["dosya"]
+    assert pv._duplicate_groups(chunks) == pv._duplicate_groups(beklenen)
+
+
+def test_stale_columns_fall_back_to_json(sentetik_depo, monkeypatch):
+    """vectors.npy dışarıdan değişirse JSON okunmalı; rapor yükleyicisi sütunları kullanmalı."""
+    import numpy as np
+    import kvkk_rapor
+    import ppt_to_vectors as pv
+    from chunk_columns import ChunkColumns
+
+    monkeypatch.setattr(kvkk_rapor, "VEKTORLER_DIR", sentetik_depo)
+    meta = kvkk_rapor.load_metadata()
+    assert isinstance(meta["chunks"], ChunkColumns) and meta["toplam_parca"] == 2000
+
+    emb, _ = pv.load_index(sentetik_depo)
+    np.save(str(sentetik_depo / "vectors.npy"), emb * 0.5)
+    _, chunks = pv.load_index(sentetik_depo)
+    assert isinstance(chunks, list) and len(chunks) == 2000
+
+
+# ════════════════════════════════════════════════════════════════
+# 24 · SQLITE + FTS5 PARÇA VERİTABANI TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def _yasal_chunks():
+    metinler = [
+        ("VERBIS.pptx", 1, "Veri sorumluları siciline kayıt (Değişik:2/3/2024-7499/33 md.)"),
+        ("VERBIS.pptx", 2, "IŞIK altında açık rıza şartları"),
+        ("Madde6.pptx", 1, "Özel nitelikli kişisel veriler 7499/33 ile değişti"),
+        ("Madde6.pptx", 2, "Veri sorumluları siciline kayıt (Değişik:2/3/2024-7499/33 md.)"),
+        ("Madde6.pptx", 3, "Madde 12 veri güvenliği yükümlülükleri"),
+    ]
+    return [{"id": i, "dosya": d, "slayt_no": n, "parca_no": 1, "metin": m}
+            for i, (d, n, m) in enumerate(metinler)]
+
+
+def test_chunk_db_fts_search(tmp_path):
+    """save(db=True) tabloları doldurmalı; FTS5 atıf, deste filtresi ve Türkçe katlamayı desteklemeli."""
+    import sqlite3
+    import ppt_to_vectors as pv
+    from chunk_db import DB_NAME, search
+
+    chunks = _yasal_chunks()
+    pv.save(_fake_vectorize([])(chunks), chunks, tmp_path, db=True)
+    db = tmp_path / DB_NAME
+
+    hits = search(db, "7499/33")
+    assert sorted(h["idx"] for h in hits) == [0, 2]
+    kopya = next(h for h in hits if h["idx"] == 0)
+    assert kopya["konumlar"] == [("VERBIS.pptx", 1), ("Madde6.pptx", 2)]
+    assert [h["idx"] for h in search(db, "7499/33 özel")] == [2]
+    assert sorted(h["idx"] for h in search(db, "7499/33", dosya="madde6")) == [0, 2]
+    assert [h["idx"] for h in search(db, "7499/33", dosya="VERBIS")] == [0]
+    assert [h["idx"] for h in search(db, "ışık")] == [1]
+    assert [h["idx"] for h in search(db, "madde 12")] == [4]
+    assert [h["idx"] for h in search(db, "sicil*")] == [0]
+    assert search(db, "()") == []
+
+    with sqlite3.connect(str(db)) as conn:
+        assert conn.execute("SELECT parca_sayisi FROM slides WHERE dosya = 'Madde6.pptx' "
+                            "AND slayt_no = 3").fetchone() == (1,)
+
+    # Sonraki kayıtlar veritabanını (istenmese de) güncel tutar
+    pv.save(_fake_vectorize([])(chunks[:2]), chunks[:2], tmp_path)
+    assert [h["idx"] for h in search(db, "7499/33")] == [0]
+
+
+def test_change_annotations_written_to_db(tmp_path):
+    """extract_ppt_change_annotations, veritabanı varsa notasyonları indeksli tabloya yazmalı."""
+    import sqlite3
+    from chunk_db import DB_NAME, connect
+    from kvkk_rapor import extract_ppt_change_annotations
+
+    txt = tmp_path / "txt"
+    txt.mkdir()
+    (txt / "deste.txt").write_text(
+        "── Slayt 4 ────\nMADDE 6 - Özel nitelikli\n(3) (Mülga:2/3/2024-7499/33 md.)\n",
+        encoding="utf-8")
+    db = tmp_path / DB_NAME
+    connect(db).close()
+    kayitlar = extract_ppt_change_annotations(txt, db)
+    assert len(kayitlar) == 1
+    with sqlite3.connect(str(db)) as conn:
+        satir = conn.execute("SELECT tip, kaynak_txt, slayt_no, baglantilar FROM annotations "
+                             "WHERE kanun_no = '7499' AND madde_ref = '33'").fetchone()
+    assert satir == ("Mülga", "deste", 4, '["Madde 6"]')
+
+
+# ════════════════════════════════════════════════════════════════
+# 25 · BM25 + HİBRİT ARAMA TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def test_bm25_turkish_tokenize():
+    """Türkçe büyük/küçük harf, kesme eki, sayısal atıf ve ek budama."""
+    from bm25_index import tokenize
+
+    assert tokenize("KVKK'nın İŞLENMESİ IŞIK ışık 7499/33") == \
+        ["kvkk", "işlen", "ışık", "ışık", "7499/33", "7499", "33"]
+    assert tokenize("verilerin")[0] == tokenize("Veriler")[0]
+
+
+def test_bm25_search_without_model(tmp_path, capsys):
+    """--mode bm25 birebir atıfları bulmalı ve sentence_transformers'ı içe aktarmamalı."""
+    import sys
+    import ppt_to_vectors as pv
+
+    chunks = _yasal_chunks()
+    pv.save(_fake_vectorize([])(chunks), chunks, tmp_path)
+    emb, chunks = pv.load_index(tmp_path, mmap=True)
+    bm25 = pv.load_bm25_index(tmp_path, emb)
+
+    hits = pv.bm25_rank(bm25, chunks, "7499/33", 5)
+    assert sorted(h["idx"] for h in hits) == [0, 2]
+    assert next(h for h in hits if h["idx"] == 0)["konumlar"] == [("VERBIS.pptx", 1),
+                                                                  ("Madde6.pptx", 2)]
+    assert pv.bm25_rank(bm25, chunks, "madde 12", 5)[0]["idx"] == 4
+    assert pv.bm25_rank(bm25, chunks, "ışık", 5)[0]["idx"] == 1
+    assert pv.bm25_rank(bm25, chunks, "bulunmayan", 5) == []
+
+    onceki = "sentence_transformers" in sys.modules
+    pv.search("Madde 12", tmp_path, top_k=3, mode="bm25")
+    assert ("sentence_transformers" in sys.modules) == onceki
+    assert "Madde 12 veri güvenliği" in capsys.readouterr().out
+
+
+def test_hybrid_rrf_fuses_dense_and_bm25(tmp_path):
+    """RRF, iki listede de olan adayı öne almalı ve kopyaları tek adayda toplamalı."""
+    import ppt_to_vectors as pv
+
+    chunks = _yasal_chunks()
+    pv.save(_fake_vectorize([])(chunks), chunks, tmp_path)
+    emb, chunks = pv.load_index(tmp_path)
+    bm25 = pv.load_bm25_index(tmp_path, emb)
+
+    # Gömme sorgusu 3. parçaya (0'ın kopyası) en yakın; BM25 "7499/33" ile 0 ve 2'yi bulur
+    hits = pv.hybrid_rank(emb, chunks, bm25, emb[3][None, :], "7499/33", 3)
+    assert len({(h["dosya"], h["slayt_no"]) for h in hits}) == 3
+    assert chunks[hits[0]["idx"]]["ortak_vektor"] == 0
+    assert hits[0]["skor"] > hits[1]["skor"]
+
+    birlesik = pv.fuse_rrf([[{"idx": 1}, {"idx": 4}], [{"idx": 4}, {"idx": 2}]], chunks, 3)
+    assert [h["idx"] for h in birlesik] == [4, 1, 2]
+    assert birlesik[0]["skor"] == pytest.approx(1 / 62 + 1 / 61)
+
+
+def test_search_daemon_bm25_and_hybrid_modes(kucuk_indeks, caplog):
+    """Sunucu "mod" alanıyla BM25 ve hibrit sorguları da yanıtlamalı; BM25 indeksi yoksa 409."""
+    import shutil
+    import threading
+    import numpy as np
+    import ppt_to_vectors as pv
+    from ann_store import index_dir
+    from search_daemon import make_server, query_daemon
+
+    server = make_server(kucuk_indeks, _SabitModel(np.array([1, 0], np.float32)),
+                         pv.MODEL_NAME, port=0)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        hits = query_daemon("aktarım", 2, pv.MODEL_NAME, kucuk_indeks, port=port, mode="bm25")
+        assert [h["metin"] for h in hits] == ["Yurt dışına aktarım"]
+        hits = query_daemon("aktarım", 2, pv.MODEL_NAME, kucuk_indeks, port=port, mode="hybrid")
+        assert {h["metin"] for h in hits} == {"Açık rıza şartları", "Yurt dışına aktarım"}
+        assert query_daemon("x", 1, pv.MODEL_NAME, kucuk_indeks, port=port, mode="yok") is None
+
+        shutil.rmtree(str(index_dir(kucuk_indeks, "bm25")))
+        assert query_daemon("aktarım", 2, pv.MODEL_NAME, kucuk_indeks, port=port, mode="bm25") is None
+        assert "(409)" in caplog.text
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# ════════════════════════════════════════════════════════════════
+# 26 · METADATA FİLTRE (BITMAP) TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def test_filter_select_and_articles(sentetik_depo, monkeypatch):
+    """Bit eşlemleri deste / slayt / madde kesişimini ve kopya temsilcilerini doğru vermeli."""
+    import numpy as np
+    import ppt_to_vectors as pv
+    from filter_index import articles, select
+    from ppt_to_vectors import parse_range
+
+    monkeypatch.delitem(sys.modules, "kvkk_rapor", raising=False)
+    assert articles("Madde 12 ve m. 9; MADDE 12") == [9, 12]
+    assert "kvkk_rapor" not in sys.modules, "filtre indeksi rapor modülünü yüklememeli"
+    assert articles("7499/33 md.") == []
+    assert parse_range("10-40") == (10, 40) and parse_range("17") == (17, 17)
+
+    emb, chunks = pv.load_index(sentetik_depo, mmap=True)
+    index = pv.load_filter_index(sentetik_depo, emb)
+    assert select(index) is None
+
+    secim = select(index, dosya="D1.PPTX", slayt=(10, 20))
+    assert secim["satirlar"].tolist() == list(range(59, 70))
+    # d39'daki son 10 satır, d0'daki ilk 10 satırın kopyası → grup temsilcisi kopya satırdır
+    secim = select(index, dosya="d39")
+    assert secim["temsil"][:10].tolist() == list(range(1990, 2000))
+    assert secim["temsil"][10] == -1 and secim["temsil"][1950] == 1950
+    assert len(select(index, dosya="yok")["satirlar"]) == 0
+
+
+def test_filtered_rank_exact_and_ann(sentetik_depo, monkeypatch):
+    """Filtreli arama aday kümesinde kaba kuvvetle aynı olmalı; IVF/HNSW ile de top_k dolmalı."""
+    import numpy as np
+    import ppt_to_vectors as pv
+
+    emb, chunks = pv.load_index(sentetik_depo, mmap=True)
+    q = np.asarray(emb[1500], dtype=np.float32)[None, :]
+    filtre = pv.select_rows(sentetik_depo, emb, dosya="d39")
+
+    tekil = {}
+    for i in filtre["satirlar"].tolist():
+        tekil.setdefault(chunks[i]["ortak_vektor"], i)
+    skor = {i: float(np.asarray(emb[i]) @ q[0]) for i in tekil.values()}
+    beklenen = sorted(skor, key=lambda i: -skor[i])[:5]
+
+    hits = pv.rank(emb, chunks, q, 5, filtre=filtre)
+    assert [h["idx"] for h in hits] == beklenen
+    assert all(h["dosya"] == "d39.pptx" for h in hits)
+
+    # Çok aday varsayımıyla yaklaşık indeks yolu: fazla örnekleme + temsilci eşleme
+    monkeypatch.setattr(pv, "FILTER_EXACT_MAX", 0)
+    pv.build_ann_index("ivf", sentetik_depo, n_lists=16)
+    ivf = pv.load_ann_index("ivf", sentetik_depo, emb)
+    hits = pv.rank(emb, chunks, q, 5, ann=ivf, knobs={"nprobe": 16}, filtre=filtre)
+    assert [h["idx"] for h in hits] == beklenen
+
+    pv.build_ann_index("hnsw", sentetik_depo)
+    hnsw = pv.load_ann_index("hnsw", sentetik_depo, emb)
+    hits = pv.rank(emb, chunks, q, 5, ann=hnsw, filtre=filtre)
+    assert len(hits) == 5 and all(h["dosya"] == "d39.pptx" for h in hits)
+
+
+def test_filtered_bm25_and_search(tmp_path, capsys):
+    """BM25 filtreyle yalnızca aday parçaları döndürmeli; kopya sonuç aday satıra taşınmalı."""
+    import ppt_to_vectors as pv
+
+    chunks = _yasal_chunks()
+    pv.save(_fake_vectorize([])(chunks), chunks, tmp_path)
+    emb, chunks = pv.load_index(tmp_path, mmap=True)
+    bm25 = pv.load_bm25_index(tmp_path, emb)
+
+    def ara(sorgu, **secim):
+        filtre = pv.select_rows(tmp_path, emb, **secim)
+        return [h["idx"] for h in pv.bm25_rank(bm25, chunks, sorgu, 5, filtre=filtre)]
+
+    assert ara("7499/33", dosya="verbıs") == [0]
+    assert sorted(ara("7499/33", dosya="Madde6")) == [2, 3]
+    assert ara("7499/33", dosya="Madde6", slayt=(2, 3)) == [3]
+    assert ara("veri", madde=[12]) == [4]
+    assert ara("veri", madde=[9]) == []
+
+    pv.search("7499/33", tmp_path, top_k=3, mode="bm25", dosya="Madde6", slayt=(1, 1))
+    cikti = capsys.readouterr().out
+    assert "Özel nitelikli" in cikti and "siciline" not in cikti
+
+
+def test_filters_match_report_and_db_semantics(tmp_path):
+    """--dosya her arka uçta aynı desteleri, --madde KVKK raporuyla aynı maddeleri seçmeli."""
+    import kvkk_rapor
+    import ppt_to_vectors as pv
+    from article_refs import mentioned_articles
+    from chunk_db import DB_NAME, search
+    from filter_index import articles
+
+    chunks = [dict(c, dosya=c["dosya"].replace("VERBIS", "VERBİS")) for c in _yasal_chunks()]
+    chunks.append({"id": 5, "dosya": "Madde6.pptx", "slayt_no": 4, "parca_no": 1,
+                   "metin": "Ayrıntı için bkz. Madde 9"})
+    pv.save(_fake_vectorize([])(chunks), chunks, tmp_path, db=True)
+    emb, _ = pv.load_index(tmp_path, mmap=True)
+
+    assert pv.select_rows(tmp_path, emb, dosya="verbis")["satirlar"].tolist() == [0, 1]
+    assert [h["idx"] for h in search(tmp_path / DB_NAME, "7499/33", dosya="verbis")] == [0]
+    assert search(tmp_path / DB_NAME, "7499/33", dosya="%") == []
+    assert pv.slide_rows(chunks, "verbis:2")[:2] == ("VERBİS.pptx", 2)
+
+    madde_map = kvkk_rapor.extract_article_mentions(chunks)
+    for madde in (9, 12):
+        beklenen = [r["idx"] for r in madde_map.get(madde, [])]
+        assert pv.select_rows(tmp_path, emb, madde=[madde])["satirlar"].tolist() == beklenen
+    assert all(articles(c["metin"]) == sorted(mentioned_articles(c["metin"]))
+               for c in chunks)
+
+
+def test_search_daemon_applies_filters(kucuk_indeks):
+    """Sunucu "filtre" alanını sıralamadan önce uygulamalı."""
+    import threading
+    import numpy as np
+    import ppt_to_vectors as pv
+    from search_daemon import make_server, query_daemon
+
+    server = make_server(kucuk_indeks, _SabitModel(np.array([1, 0], np.float32)),
+                         pv.MODEL_NAME, port=0)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        hits = query_daemon("rıza", 2, pv.MODEL_NAME, kucuk_indeks, port=port,
+                            filtre={"dosya": "b.pptx", "slayt": None, "madde": None})
+        assert [(h["dosya"], h["slayt_no"]) for h in hits] == [("b.pptx", 5)]
+        hits = query_daemon("rıza", 2, pv.MODEL_NAME, kucuk_indeks, port=port,
+                            filtre={"dosya": None, "slayt": [2, 2], "madde": None})
+        assert [h["metin"] for h in hits] == ["Yurt dışına aktarım"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# ════════════════════════════════════════════════════════════════
+# 27 · CROSS-ENCODER İLE YENİDEN SIRALAMA TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+class _KelimeCapraz:
+    """Sorgu kelimelerinin metinde kaç kez geçtiğini skor veren deneme cross-encoder'ı."""
+
+    def __init__(self):
+        self.batchler = []
+
+    def predict(self, pairs, batch_size=32, **kwargs):
+        self.batchler.append(len(pairs))
+        return [sum(m.lower().count(k) for k in q.lower().split()) for q, m in pairs]
+
+
+def test_rerank_hits_single_batch():
+    """Adaylar tek batch'te puanlanmalı; sıra cross-encoder skoruna göre, eşitlikte ilk aşamaya göre."""
+    import ppt_to_vectors as pv
+
+    hits = [{"idx": i, "skor": 1.0 - i / 10, "metin": m}
+            for i, m in enumerate(["açık rıza", "rıza rıza şartları", "aktarım", "rıza"])]
+    capraz = _KelimeCapraz()
+    sonuc = pv.rerank_hits(capraz, "rıza", hits, 3)
+    assert capraz.batchler == [4]
+    assert [h["idx"] for h in sonuc] == [1, 0, 3]
+    assert sonuc[0]["skor"] == 2.0 and sonuc[0]["ilk_skor"] == pytest.approx(0.9)
+    assert pv.rerank_hits(capraz, "rıza", [], 3) == []
+
+
+def test_search_rerank_bounded_candidates(tmp_path, monkeypatch, caplog, capsys):
+    """search(rerank=N) ilk aşamadan N aday almalı, top_k'ya indirmeli ve aşama süresini loglamalı."""
+    import logging
+    import ppt_to_vectors as pv
+
+    chunks = _yasal_chunks()
+    pv.save(_fake_vectorize([])(chunks), chunks, tmp_path)
+    capraz = _KelimeCapraz()
+    monkeypatch.setattr(pv, "load_reranker", lambda *a, **k: capraz)
+
+    with caplog.at_level(logging.INFO, logger=pv.logger.name):
+        pv.search("veri 7499/33 özel", tmp_path, top_k=1, mode="bm25", rerank=3)
+    assert capraz.batchler == [3]
+    assert "Yeniden sıralama (3 aday → 1)" in caplog.text
+    assert "Özel nitelikli" in capsys.readouterr().out
+
+
+def test_search_daemon_reranks(kucuk_indeks):
+    """Sunucu "rerank" alanıyla adayları cross-encoder'dan geçirmeli."""
+    import threading
+    import numpy as np
+    import ppt_to_vectors as pv
+    from search_daemon import make_server, query_daemon
+
+    capraz = _KelimeCapraz()
+    server = make_server(kucuk_indeks, _SabitModel(np.array([1, 0], np.float32)),
+                         pv.MODEL_NAME, port=0, reranker=capraz)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        hits = query_daemon("aktarım", 1, pv.MODEL_NAME, kucuk_indeks, port=port, rerank=5)
+        assert [h["metin"] for h in hits] == ["Yurt dışına aktarım"]
+        assert capraz.batchler == [2]
+        hits = query_daemon("aktarım", 1, pv.MODEL_NAME, kucuk_indeks, port=port)
+        assert [h["metin"] for h in hits] == ["Açık rıza şartları"]
+        assert capraz.batchler == [2]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# ════════════════════════════════════════════════════════════════
+# 28 · DESTE / SLAYT YÖNLENDİRME TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def test_route_centroids_from_save(tmp_path):
+    """save() slayt/deste merkezlerini kurmalı; kopya satır her iki slaytta da yer almalı."""
+    import numpy as np
+    import ppt_to_vectors as pv
+    from ann_store import index_dir, read_index
+
+    chunks = _yasal_chunks() + [{"id": 5, "dosya": "Madde6.pptx", "slayt_no": 3, "parca_no": 2,
+                                 "metin": "Madde 12 ikinci parça, teknik tedbirler"}]
+    emb = _fake_vectorize([])(chunks)
+    pv.save(emb, chunks, tmp_path)
+    route = read_index(index_dir(tmp_path, "route"))
+
+    assert route["meta"]["dosyalar"] == ["Madde6.pptx", "VERBIS.pptx"]
+    assert route["deck_offsets"].tolist() == [0, 3, 5]
+    assert route["slayt_no"].tolist() == [1, 2, 3, 1, 2]
+    parcalar = [route["ids"][a:b].tolist()
+                for a, b in zip(route["slide_offsets"][:-1], route["slide_offsets"][1:])]
+    assert parcalar == [[2], [0], [4, 5], [0], [1]]
+
+    ortalama = emb[4] + emb[5]
+    assert np.allclose(route["slide_centroids"][2], ortalama / np.linalg.norm(ortalama), atol=1e-6)
+    deste = emb[[0, 1]].sum(axis=0)
+    assert np.allclose(route["deck_centroids"][1], deste / np.linalg.norm(deste), atol=1e-6)
+
+
+def test_route_search_scores_only_routed_chunks(sentetik_depo):
+    """Tüm desteler/slaytlar seçilince tam arama; küçük ayarlarla yalnızca seçilen slaytlar puanlanmalı."""
+    import numpy as np
+    import ppt_to_vectors as pv
+
+    emb, chunks = pv.load_index(sentetik_depo, mmap=True)
+    route = pv.load_ann_index("route", sentetik_depo, emb)
+    q = np.asarray(emb[700], dtype=np.float32)[None, :]
+
+    tam = [h["idx"] for h in pv.rank(emb, chunks, q, 10)]
+    hits = pv.rank(emb, chunks, q, 10, ann=route, knobs={"route_decks": 40, "route_slides": 2000})
+    assert [h["idx"] for h in hits] == tam
+
+    class _Kayitci:
+        """Puanlanan satırları kaydeden vectors sarmalayıcısı."""
+        shape = emb.shape
+
+        def __init__(self):
+            self.okunan = []
+
+        def __getitem__(self, key):
+            self.okunan.append(np.asarray(key))
+            return emb[key]
+
+    kayitci = _Kayitci()
+    hits = pv.rank(kayitci, chunks, q, 5, ann=route, knobs={"route_decks": 2, "route_slides": 20})
+    okunan = kayitci.okunan[0]
+    assert len(kayitci.okunan) == 1 and len(okunan) == 20       # slayt başına bir parça
+    assert len({chunks[i]["dosya"] for i in okunan.tolist()}) <= 2
+    skor = np.asarray(emb[okunan]) @ q[0]
+    assert [h["idx"] for h in hits] == okunan[np.argsort(-skor, kind="stable")][:5].tolist()
+
+
+# ════════════════════════════════════════════════════════════════
+# 29 · ÖRNEKLE ARAMA (--similar-to) TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def test_slide_rows_resolves_deck_and_slide(tmp_path):
+    """Deste adı tam ya da tek eşleşen parça olabilir; sütunlu ve JSON metadata aynı satırları vermeli."""
+    import ppt_to_vectors as pv
+
+    chunks = _yasal_chunks()
+    pv.save(_fake_vectorize([])(chunks), chunks, tmp_path)
+    _, kolonlar = pv.load_index(tmp_path, mmap=True)
+    for kaynak in (kolonlar, chunks):
+        assert pv.slide_rows(kaynak, "Madde6.pptx:2") == ("Madde6.pptx", 2, [3])
+        assert pv.slide_rows(kaynak, "verbıs:1") == ("VERBIS.pptx", 1, [0])
+    for hatali in ("Madde6.pptx", "Madde6.pptx:9", ".pptx:1", "yok:1"):
+        with pytest.raises(ValueError):
+            pv.slide_rows(chunks, hatali)
+
+
+def test_similar_to_uses_stored_vectors_without_model(sentetik_depo, capsys):
+    """Sorgu, slayt parçalarının ortalamasıdır; kaynak slayt çıkarılır ve model içe aktarılmaz."""
+    import sys
+    import numpy as np
+    import ppt_to_vectors as pv
+
+    onceki = "sentence_transformers" in sys.modules
+    hits = pv.similar_to("d14.pptx:1", sentetik_depo, top_k=5)
+    assert ("sentence_transformers" in sys.modules) == onceki
+    assert "d14.pptx · slayt 1 benzerleri" in capsys.readouterr().out
+
+    emb, chunks = pv.load_index(sentetik_depo)
+    q = emb[700] / np.linalg.norm(emb[700])
+    beklenen = [h["idx"] for h in pv.rank(emb, chunks, q[None, :], 6) if h["idx"] != 700][:5]
+    assert [h["idx"] for h in hits] == beklenen
+
+    filtreli = pv.similar_to("d14.pptx:1", sentetik_depo, top_k=3, dosya="d2.pptx")
+    assert filtreli and all(h["dosya"] == "d2.pptx" for h in filtreli)
+
+
+# ════════════════════════════════════════════════════════════════
+# 30 · kNN GRAFI (İLGİLİ SLAYTLAR) TESTLERİ
+# ════════════════════════════════════════════════════════════════
+
+def test_knn_graph_blocked_matches_brute_force(sentetik_depo):
+    """Köşegeni kesen küçük karolarla kurulan graf, tam N×N sıralamasıyla aynı komşuları vermeli."""
+    import numpy as np
+    import knn_graph
+    import ppt_to_vectors as pv
+
+    emb, chunks = pv.load_index(sentetik_depo)
+    ortak = np.array([c["ortak_vektor"] for c in chunks])
+    arrays, meta = knn_graph.build(emb, ortak, k=5, row_block=300, col_block=700)
+    assert arrays["neighbors"].dtype == np.int32 and arrays["scores"].dtype == np.float16
+    assert arrays["neighbors"].shape == (1990, 5) and meta["k"] == 5
+
+    tekil = np.unique(ortak)
+    s = emb[tekil] @ emb[tekil].T
+    np.fill_diagonal(s, -np.inf)
+    beklenen = tekil[np.argsort(-s, axis=1, kind="stable")[:, :5]]
+    assert (arrays["neighbors"] == beklenen).mean() > 0.999     # float eşitlikleri hariç
+    assert np.allclose(arrays["scores"][:, 0], s.max(axis=1), atol=1e-2)
+
+    # Kopya satır, ilk kopyanın komşularını kullanır
+    assert arrays["konum"][1995] == arrays["konum"][5] == 5
+    assert np.array_equal(knn_graph.neighbors_of(arrays, 1995)[0], beklenen[5])
+
+
+def test_related_slides_in_search_and_report(tmp_path, monkeypatch, capsys):
+    """Graf kurulunca arama çıktısı (parçalı depo dahil) ve KVKK raporu ilgili slaytları göstermeli."""
+    import types
+    import numpy as np
+    import kvkk_rapor
+    import ppt_to_vectors as pv
+
+    chunks = _yasal_chunks()
+    pv.save(_fake_vectorize([])(chunks), chunks, tmp_path)
+    pv.build_knn_graph(tmp_path, k=3)
+    emb, chunks = pv.load_index(tmp_path, mmap=True)
+    graf = pv.load_knn_graph(tmp_path, emb)
+
+    ilgili = pv.attach_related(graf, chunks, [{"idx": 0}])[0]["ilgili"]
+    slaytlar = [(d, n) for d, n, _ in ilgili]
+    assert ("VERBIS.pptx", 1) not in slaytlar and len(slaytlar) == len(set(slaytlar)) == 3
+
+    pv.search("Madde 12", tmp_path, top_k=1, mode="bm25")
+    assert "İlgili slaytlar: " in capsys.readouterr().out
+
+    # Parçalı depodan yoğun arama da aynı bağlantıları eklemeli
+    class _SabitModel:
+        def __init__(self, name):
+            pass
+
+        def encode(self, texts, **kwargs):
+            return np.asarray(emb[4])[None, :]
+
+    monkeypatch.setitem(sys.modules, "sentence_transformers",
+                        types.SimpleNamespace(SentenceTransformer=_SabitModel))
+    pv.build_shards(tmp_path, 2)
+    pv.search("Madde 12", tmp_path, top_k=1)
+    assert "İlgili slaytlar: " in capsys.readouterr().out
+
+    monkeypatch.setattr(kvkk_rapor, "VEKTORLER_DIR", tmp_path)
+    meta = kvkk_rapor.load_metadata()
+    graf = kvkk_rapor.load_related_graph(meta)
+    madde_map = kvkk_rapor.extract_article_mentions(meta["chunks"])
+    ref = madde_map[12][0]
+    assert ref["idx"] == 4
+    from knn_graph import related_slides
+    ref["ilgili"] = related_slides(graf, meta["chunks"], ref["idx"])
+    html = kvkk_rapor._render_madde_card(12, kvkk_rapor.KVKK_MADDELER[12], [ref], {})
+    assert "↔ İlgili:" in html
+
+    # vectors.npy değişince bayat graf kullanılmaz
+    pv.save(_fake_vectorize([])(chunks[:4]), list(chunks)[:4], tmp_path)
+    emb, _ = pv.load_index(tmp_path, mmap=True)
+    assert pv.load_knn_graph(tmp_path, emb) is None